@@ -1,5 +1,10 @@
+from django import forms
 from django.contrib import admin
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
+from airport import route_stats
 from airport.models import (
     Airport,
     Airplane,
@@ -8,14 +13,147 @@ from airport.models import (
     Ticket,
     Order,
     Flight,
+    FlightSchedule,
     Route
 )
+from airport.queries import estimated_count
+from airport.sync import touch_flights
 
-admin.site.register(Airport)
-admin.site.register(AirplaneType)
-admin.site.register(Crew)
-admin.site.register(Ticket)
-admin.site.register(Order)
-admin.site.register(Flight)
-admin.site.register(Route)
-admin.site.register(Airplane)
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that reads the size of huge unfiltered tables from statistics."""
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for tables with millions of rows.
+
+    Subclasses order by the primary key, which the changelist can read
+    a page of from its index, and have no ``date_hierarchy``: its date
+    drill-down runs DISTINCT queries over the whole table.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Airport)
+class AirportAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "closest_big_city")
+    search_fields = ("name", "closest_big_city")
+
+
+@admin.register(AirplaneType)
+class AirplaneTypeAdmin(admin.ModelAdmin):
+    search_fields = ("name",)
+
+
+@admin.register(Crew)
+class CrewAdmin(admin.ModelAdmin):
+    list_display = ("id", "first_name", "last_name")
+    search_fields = ("first_name", "last_name")
+
+
+@admin.register(Airplane)
+class AirplaneAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "airplane_type", "rows", "seats_in_row")
+    list_select_related = ("airplane_type",)
+    autocomplete_fields = ("airplane_type",)
+    search_fields = ("name",)
+
+
+@admin.register(Route)
+class RouteAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "destination", "distance")
+    list_select_related = ("source", "destination")
+    autocomplete_fields = ("source", "destination")
+    search_fields = ("source__name", "destination__name")
+
+    def get_queryset(self, request):
+        # Autocomplete results render Route.__str__ as well.
+        return super().get_queryset(request).select_related("source", "destination")
+
+
+@admin.register(FlightSchedule)
+class FlightScheduleAdmin(admin.ModelAdmin):
+    list_display = ("id", "route", "airplane", "departure_time", "weekdays", "valid_from", "valid_until")
+    list_select_related = ("route__source", "route__destination", "airplane")
+    autocomplete_fields = ("route", "airplane", "crew")
+
+
+class FlightAdminForm(forms.ModelForm):
+    class Meta:
+        model = Flight
+        fields = "__all__"
+
+    def clean(self):
+        """Refuse crew members who are on another flight at that time."""
+        cleaned_data = super().clean()
+        departure_time = cleaned_data.get("departure_time")
+        arrival_time = cleaned_data.get("arrival_time")
+        crew = cleaned_data.get("crew")
+        if departure_time and arrival_time and crew:
+            Flight.validate_crew(
+                crew,
+                Flight.objects.filter(
+                    arrival_time__gt=departure_time,
+                    departure_time__lt=arrival_time,
+                ).exclude(pk=self.instance.pk),
+                ValidationError,
+            )
+        return cleaned_data
+
+
+@admin.register(Flight)
+class FlightAdmin(LargeTableAdmin):
+    form = FlightAdminForm
+    list_display = ("id", "route", "airplane", "departure_time", "arrival_time")
+    list_select_related = ("route__source", "route__destination", "airplane")
+    autocomplete_fields = ("route", "airplane", "crew")
+    raw_id_fields = ("schedule",)
+    ordering = ("-id",)
+
+
+class TicketInline(admin.TabularInline):
+    model = Ticket
+    extra = 0
+    raw_id_fields = ("flight",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            "flight__route__source", "flight__route__destination"
+        )
+
+
+@admin.register(Order)
+class OrderAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "created_at")
+    list_select_related = ("user",)
+    raw_id_fields = ("user",)
+    ordering = ("-id",)
+    inlines = (TicketInline,)
+
+    def save_formset(self, request, form, formset, change):
+        super().save_formset(request, form, formset, change)
+        if formset.model is Ticket:
+            flight_ids = [ticket.flight_id for ticket in formset.new_objects]
+            route_stats.tickets_sold(flight_ids)
+            touch_flights(flight_ids)
+
+
+@admin.register(Ticket)
+class TicketAdmin(LargeTableAdmin):
+    list_display = ("id", "flight", "row", "seat", "order")
+    list_select_related = ("flight__route__source", "flight__route__destination", "order")
+    raw_id_fields = ("flight", "order")
+    ordering = ("-id",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if not change:
+            route_stats.tickets_sold([obj.flight_id])
+            touch_flights([obj.flight_id])
@@ -0,0 +1,241 @@
+"""
+Vectorized flight analytics.
+
+Every report reads only the columns it needs with ``values_list``, in
+chunks of ``ANALYTICS_CHUNK_SIZE`` rows, into NumPy arrays and aggregates
+them without a Python loop per row. Live and archived flights are read
+alike, so a report covers any period regardless of ``archive_flights``.
+
+Times are read as offsets from a reference instant computed by the
+database (``DurationField``), which converts to ``timedelta64`` without
+building a timezone-aware ``datetime`` per row.
+
+NumPy is imported by the functions rather than the module: views and
+signals import this module, and NumPy alone takes longer to import than
+the rest of the app, so it is only loaded once a report is requested.
+"""
+from itertools import islice
+
+from django.db.models import DurationField, ExpressionWrapper, F, Value
+
+from airport.models import ArchivedFlight, ArchivedTicket, Flight, Ticket
+from airport.queries import count_per_flight
+
+ANALYTICS_CHUNK_SIZE = 50_000
+FLIGHT_TIME_QUANTILES = (0.5, 0.9, 0.99)
+MICROSECONDS_PER_MINUTE = 60_000_000
+MICROSECONDS_PER_HOUR = 3_600_000_000
+
+
+def columns(querysets, fields, dtypes, chunk_size=ANALYTICS_CHUNK_SIZE):
+    """
+    Read ``fields`` of every queryset into one array per field.
+
+    Rows are fetched with a server-side cursor where the database has
+    one and converted ``chunk_size`` at a time, so the peak memory is the
+    arrays plus one chunk of tuples.
+    """
+    import numpy as np
+
+    parts = [[] for _ in fields]
+    for queryset in querysets:
+        rows = queryset.order_by().values_list(*fields).iterator(chunk_size=chunk_size)
+        while chunk := list(islice(rows, chunk_size)):
+            for part, values, dtype in zip(parts, zip(*chunk), dtypes):
+                part.append(np.array(values, dtype=dtype))
+
+    return [
+        np.concatenate(part) if part else np.empty(0, dtype=dtype)
+        for part, dtype in zip(parts, dtypes)
+    ]
+
+
+def _since(field, start):
+    return ExpressionWrapper(F(field) - Value(start), output_field=DurationField())
+
+
+def _flight_querysets(start, end):
+    """Live and archived flights departing in ``[start, end)``."""
+    return [
+        model.objects.filter(departure_time__gte=start, departure_time__lt=end)
+        for model in (Flight, ArchivedFlight)
+    ]
+
+
+def group_quantiles(keys, values, quantiles):
+    """
+    Linear-interpolated quantiles of ``values`` per distinct key.
+
+    Returns ``(keys, counts, means, table)`` where ``table[i, j]`` is
+    quantile ``j`` of group ``i``; same results as ``np.quantile`` per
+    group, from one sort of the whole array.
+    """
+    import numpy as np
+
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    unique_keys, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    means = np.add.reduceat(values, starts) / counts if len(keys) else np.empty(0)
+
+    positions = starts[:, None] + np.asarray(quantiles)[None, :] * (counts[:, None] - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.ceil(positions).astype(np.int64)
+    table = values[lower] + (values[upper] - values[lower]) * (positions - lower)
+    return unique_keys, counts, means, table
+
+
+def flight_time_report(start, end, route_ids=None, bins=20):
+    """Per-route flight time quantiles and an overall histogram, in minutes."""
+    import numpy as np
+
+    querysets = _flight_querysets(start, end)
+    if route_ids is not None:
+        querysets = [queryset.filter(route_id__in=route_ids) for queryset in querysets]
+    querysets = [
+        queryset.annotate(
+            duration=ExpressionWrapper(
+                F("arrival_time") - F("departure_time"), output_field=DurationField()
+            )
+        )
+        for queryset in querysets
+    ]
+    route_ids, durations = columns(
+        querysets, ("route_id", "duration"), (np.int64, "timedelta64[us]")
+    )
+    minutes = durations.astype(np.int64) / MICROSECONDS_PER_MINUTE
+
+    route_ids, counts, means, table = group_quantiles(
+        route_ids, minutes, FLIGHT_TIME_QUANTILES
+    )
+    counts_per_bin, edges = np.histogram(minutes, bins=bins)
+    return {
+        "routes": [
+            {
+                "route": int(route),
+                "flights": int(count),
+                "mean_minutes": round(float(mean), 2),
+                "p50_minutes": round(float(p50), 2),
+                "p90_minutes": round(float(p90), 2),
+                "p99_minutes": round(float(p99), 2),
+            }
+            for route, count, mean, (p50, p90, p99) in zip(route_ids, counts, means, table)
+        ],
+        "histogram": {
+            "edges": [round(edge, 2) for edge in edges.tolist()],
+            "counts": counts_per_bin.tolist(),
+        },
+    }
+
+
+def seat_heatmap(start, end, airplane_type_ids=None):
+    """
+    Popularity of every seat position over flights departing in the period.
+
+    ``sold[row][seat]`` counts tickets for that position and
+    ``occupancy[row][seat]`` divides it by the flights whose airplane has
+    that position at all, so small airplanes do not drag the back rows
+    of big ones down.
+    """
+    import numpy as np
+
+    flight_querysets = _flight_querysets(start, end)
+    ticket_querysets = [
+        model.objects.filter(
+            flight__departure_time__gte=start, flight__departure_time__lt=end
+        )
+        for model in (Ticket, ArchivedTicket)
+    ]
+    if airplane_type_ids is not None:
+        flight_querysets = [
+            queryset.filter(airplane__airplane_type_id__in=airplane_type_ids)
+            for queryset in flight_querysets
+        ]
+        ticket_querysets = [
+            queryset.filter(flight__airplane__airplane_type_id__in=airplane_type_ids)
+            for queryset in ticket_querysets
+        ]
+
+    flight_rows, flight_seats = columns(
+        flight_querysets, ("airplane__rows", "airplane__seats_in_row"), (np.int64, np.int64)
+    )
+    rows, seats = columns(ticket_querysets, ("row", "seat"), (np.int64, np.int64))
+    if not len(flight_rows):
+        return {"rows": 0, "seats_in_row": 0, "flights": 0, "sold": [], "occupancy": []}
+
+    max_rows, max_seats = int(flight_rows.max()), int(flight_seats.max())
+    sold = np.bincount(
+        (rows - 1) * max_seats + (seats - 1), minlength=max_rows * max_seats
+    ).reshape(max_rows, max_seats)
+
+    # Flights per airplane shape, then a reversed 2-D cumulative sum: a
+    # position (r, s) exists on every airplane with more than r rows and
+    # more than s seats in a row.
+    shapes = np.bincount(
+        (flight_rows - 1) * max_seats + (flight_seats - 1),
+        minlength=max_rows * max_seats,
+    ).reshape(max_rows, max_seats)
+    offered = shapes[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+    occupancy = np.divide(
+        sold, offered, out=np.zeros(sold.shape), where=offered > 0
+    )
+    return {
+        "rows": max_rows,
+        "seats_in_row": max_seats,
+        "flights": len(flight_rows),
+        "sold": sold.tolist(),
+        "occupancy": np.round(occupancy, 4).tolist(),
+    }
+
+
+def airplane_utilization(start, end):
+    """
+    Block hours, flights and load factor per airplane in ``[start, end)``.
+
+    Flights crossing the period boundaries count only their hours inside
+    it; ``utilization`` is the share of the period spent in the air.
+    """
+    import numpy as np
+
+    querysets = [
+        model.objects.filter(departure_time__lt=end, arrival_time__gt=start)
+        .annotate(
+            departure=_since("departure_time", start),
+            arrival=_since("arrival_time", start),
+            capacity=F("airplane__rows") * F("airplane__seats_in_row"),
+            tickets_sold=count_per_flight(tickets.objects.all()),
+        )
+        for model, tickets in ((Flight, Ticket), (ArchivedFlight, ArchivedTicket))
+    ]
+    airplane_ids, departures, arrivals, capacities, tickets_sold = columns(
+        querysets,
+        ("airplane_id", "departure", "arrival", "capacity", "tickets_sold"),
+        (np.int64, "timedelta64[us]", "timedelta64[us]", np.int64, np.int64),
+    )
+
+    period = int((end - start).total_seconds() * 1_000_000)
+    airborne = (
+        np.minimum(arrivals.astype(np.int64), period)
+        - np.maximum(departures.astype(np.int64), 0)
+    ) / MICROSECONDS_PER_HOUR
+
+    airplanes, index = np.unique(airplane_ids, return_inverse=True)
+    flights = np.bincount(index, minlength=len(airplanes))
+    hours = np.bincount(index, weights=airborne, minlength=len(airplanes))
+    seats = np.bincount(index, weights=capacities, minlength=len(airplanes))
+    sold = np.bincount(index, weights=tickets_sold, minlength=len(airplanes))
+    load_factor = np.divide(sold, seats, out=np.zeros(len(airplanes)), where=seats > 0)
+
+    return [
+        {
+            "airplane": int(airplane),
+            "flights": int(flight_count),
+            "hours": round(float(airplane_hours), 2),
+            "utilization": round(float(airplane_hours * MICROSECONDS_PER_HOUR / period), 4),
+            "seats": int(seat_count),
+            "tickets_sold": int(sold_count),
+            "load_factor": round(float(factor), 4),
+        }
+        for airplane, flight_count, airplane_hours, seat_count, sold_count, factor in zip(
+            airplanes, flights, hours, seats, sold, load_factor
+        )
+    ]
@@ -0,0 +1,93 @@
+"""
+Archival of departed flights.
+
+Flights that departed before a cutoff are copied, with their tickets and
+crew links, into the ``Archived*`` tables under their original ids and
+then removed from the hot tables, one batch per transaction. Orders stay
+in place, so a user's history keeps both live and archived tickets.
+
+The hot rows are removed with raw bulk deletes rather than
+``QuerySet.delete()``, which would load every ticket and fire per-ticket
+signals. Those only matter for flights that can still be on a board or
+a seat map, which departed flights are not; what the handlers would do
+for archived flights is done in bulk instead: tombstones for delta sync
+clients, and one route stats refresh per (route, airplane type, day)
+after commit.
+"""
+from django.db import transaction
+
+from airport import route_stats
+from airport.models import (
+    ArchivedFlight,
+    ArchivedFlightCrew,
+    ArchivedTicket,
+    Flight,
+    Ticket,
+    Tombstone,
+)
+
+
+def archive_batch(flight_ids):
+    """Move the given flights and everything hanging off them."""
+    with transaction.atomic():
+        ArchivedFlight.objects.bulk_create([
+            ArchivedFlight(**values)
+            for values in Flight.objects.filter(id__in=flight_ids).values(
+                "id",
+                "route_id",
+                "airplane_id",
+                "schedule_id",
+                "departure_time",
+                "arrival_time",
+            )
+        ])
+
+        crew_links = Flight.crew.through.objects.filter(flight_id__in=flight_ids)
+        ArchivedFlightCrew.objects.bulk_create([
+            ArchivedFlightCrew(flight_id=flight_id, crew_id=crew_id)
+            for flight_id, crew_id in crew_links.values_list("flight_id", "crew_id")
+        ])
+
+        tickets = Ticket.objects.filter(flight_id__in=flight_ids)
+        ArchivedTicket.objects.bulk_create(
+            [
+                ArchivedTicket(**values)
+                for values in tickets.values(
+                    "id", "row", "seat", "flight_id", "order_id"
+                )
+            ],
+            batch_size=5000,
+        )
+
+        stats_keys = set(route_stats.stored_stats_keys(flight_ids).values())
+        tickets._raw_delete(tickets.db)
+        crew_links._raw_delete(crew_links.db)
+        flights = Flight.objects.filter(id__in=flight_ids)
+        flights._raw_delete(flights.db)
+        Tombstone.objects.bulk_create([
+            Tombstone(model=Flight._meta.model_name, object_id=flight_id)
+            for flight_id in flight_ids
+        ])
+
+        def refresh():
+            for key in stats_keys:
+                route_stats.refresh_day(*key)
+
+        transaction.on_commit(refresh)
+
+
+def archive_flights(departed_before, batch_size=1000):
+    """Archive every flight departed before ``departed_before``."""
+    archived = 0
+
+    while True:
+        flight_ids = list(
+            Flight.objects.filter(departure_time__lt=departed_before)
+            .order_by("departure_time", "id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not flight_ids:
+            return archived
+
+        archive_batch(flight_ids)
+        archived += len(flight_ids)
@@ -0,0 +1,169 @@
+"""
+Batch endpoint: several GET sub-requests in one HTTP request.
+
+``POST /api/airport/batch/`` with ``{"requests": ["flight/12/", "flight/19/",
+"route/?source=3"]}`` answers every sub-request in order with its status
+and body. The batch is authenticated and throttled once; sub-requests run
+as the same user without repeating either: ``BatchAuthentication``, their
+only authenticator, hands them the batch's user and token. Being a
+POST of reads, the view is ``read_only_request``: replica routing
+treats it like a GET and does not pin the client to the primary. Detail lookups of the same
+resource are merged into one ``id__in`` query per resource; anything else
+is dispatched to its viewset as is.
+"""
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.exceptions import APIException, NotFound
+
+BATCH_PREFIX = "/api/airport/"
+BATCH_MAX_REQUESTS = 20
+
+
+class BatchAuthentication(BaseAuthentication):
+    """The user and token the batch was authenticated with."""
+
+    def authenticate(self, request):
+        return request.batch_credentials
+
+
+class SubRequest:
+    def __init__(self, index, path):
+        self.index = index
+        self.path = path
+        self.match = None
+
+    def resolve(self):
+        """Resolve to a viewset GET action; return False if there is none."""
+        url = urlsplit(self.path.lstrip("/"))
+        self.path_info = BATCH_PREFIX + url.path
+        self.query = url.query
+        if not self.path_info.endswith("/"):
+            self.path_info += "/"
+
+        try:
+            match = resolve(self.path_info)
+        except Resolver404:
+            return False
+
+        actions = getattr(match.func, "actions", None)
+        if match.namespace != "airport" or not actions or "get" not in actions:
+            return False
+
+        self.match = match
+        self.action = actions["get"]
+        return True
+
+    @property
+    def view_class(self):
+        return self.match.func.cls
+
+    @property
+    def mergeable(self):
+        return (
+            self.action == "retrieve"
+            and not self.query
+            and set(self.match.kwargs) == {"pk"}
+            and self.match.kwargs["pk"].isdigit()
+        )
+
+    def http_request(self, batch_request):
+        """A GET request for this path, authenticated as the batch user."""
+        request = HttpRequest()
+        request.method = "GET"
+        request.path = request.path_info = self.path_info
+        request.META = {
+            key: value
+            for key, value in batch_request.META.items()
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH")
+        }
+        request.META.update({
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": self.path_info,
+            "QUERY_STRING": self.query,
+        })
+        request.GET = QueryDict(self.query)
+        request.resolver_match = self.match
+        request.user = batch_request.user
+        request.batch_credentials = (batch_request.user, batch_request.auth)
+        return request
+
+
+def _initkwargs(sub_request):
+    return {
+        **sub_request.match.func.initkwargs,
+        "authentication_classes": (BatchAuthentication,),
+        "throttle_classes": (),
+    }
+
+
+def _dispatch(sub_request, batch_request):
+    view = sub_request.view_class.as_view(
+        sub_request.match.func.actions, **_initkwargs(sub_request)
+    )
+    response = view(
+        sub_request.http_request(batch_request), **sub_request.match.kwargs
+    )
+    return response.status_code, response.data
+
+
+def _retrieve_many(sub_requests, batch_request):
+    """Answer detail lookups of one viewset with a single ``id__in`` query."""
+    first = sub_requests[0]
+    view = first.view_class(**_initkwargs(first))
+    view.action_map = first.match.func.actions
+    view.action = "retrieve"
+    view.args, view.kwargs, view.headers = (), {}, {}
+    view.format_kwarg = None
+    view.request = request = view.initialize_request(
+        first.http_request(batch_request)
+    )
+
+    try:
+        view.initial(request)
+        ids = {int(sub_request.match.kwargs["pk"]) for sub_request in sub_requests}
+        queryset = view.filter_queryset(view.get_queryset())
+        objects = {obj.pk: obj for obj in queryset.filter(pk__in=ids)}
+    except APIException as exc:
+        response = view.handle_exception(exc)
+        return {
+            sub_request.index: (response.status_code, response.data)
+            for sub_request in sub_requests
+        }
+
+    results = {}
+    for sub_request in sub_requests:
+        try:
+            obj = objects.get(int(sub_request.match.kwargs["pk"]))
+            if obj is None:
+                raise NotFound()
+            view.check_object_permissions(request, obj)
+        except APIException as exc:
+            response = view.handle_exception(exc)
+            results[sub_request.index] = (response.status_code, response.data)
+        else:
+            results[sub_request.index] = (200, view.get_serializer(obj).data)
+    return results
+
+
+def run_batch(paths, batch_request):
+    """Return ``(status, body)`` for every path, in the same order."""
+    results = {}
+    merged = defaultdict(list)
+
+    for index, path in enumerate(paths):
+        sub_request = SubRequest(index, path)
+        if not sub_request.resolve():
+            results[index] = (404, {"detail": "Not found."})
+        elif sub_request.mergeable:
+            merged[sub_request.view_class].append(sub_request)
+        else:
+            results[index] = _dispatch(sub_request, batch_request)
+
+    for sub_requests in merged.values():
+        results.update(_retrieve_many(sub_requests, batch_request))
+
+    return [results[index] for index in range(len(paths))]
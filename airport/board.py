@@ -0,0 +1,189 @@
+"""
+Departures and arrivals boards for a single airport.
+
+For every airport and direction the flights of the next
+``BOARD_WINDOW_HOURS`` are read with one indexed query on
+``(route, departure_time)`` / ``(route, arrival_time)`` and kept in
+process memory for ``BOARD_CACHE_SECONDS``. While a window is cached it
+is patched in place from model signals: changed flights are moved in or
+out of it and booked or released tickets adjust the seat availability,
+so terminal screens polling the board do not hit the database.
+
+The lock only guards the windows in memory. A missing or expired window
+is queried outside it, once per airport and direction however many
+requests ask for it (``SingleFlight``), so a slow query for one board
+never holds up the others. A window queried while a change arrived may
+have missed that change and is not cached. Callers get copies of the
+rows, which they may keep or modify.
+"""
+import threading
+from bisect import insort
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from airport.coalescing import SingleFlight
+from airport.models import Flight, Ticket
+from airport.queries import count_per_flight
+
+BOARD_WINDOW_HOURS = 24
+BOARD_CACHE_SECONDS = 30
+
+DEPARTURES = "departures"
+ARRIVALS = "arrivals"
+
+# direction: (airport key of a row, time key of a row)
+DIRECTIONS = {
+    DEPARTURES: ("source_id", "departure_time"),
+    ARRIVALS: ("destination_id", "arrival_time"),
+}
+
+
+def board_rows(queryset):
+    return list(
+        queryset.annotate(
+            source_id=F("route__source_id"),
+            destination_id=F("route__destination_id"),
+            source=F("route__source__name"),
+            destination=F("route__destination__name"),
+            airplane_name=F("airplane__name"),
+            airplane_capacity=F("airplane__rows") * F("airplane__seats_in_row"),
+            tickets_available=(
+                F("airplane__rows") * F("airplane__seats_in_row")
+                - count_per_flight(Ticket.objects)
+            ),
+        ).values(
+            "id",
+            "departure_time",
+            "arrival_time",
+            "source_id",
+            "destination_id",
+            "source",
+            "destination",
+            "airplane_name",
+            "airplane_capacity",
+            "tickets_available",
+        )
+    )
+
+
+class BoardWindow:
+    def __init__(self, direction, airport_id, start):
+        self.airport_key, self.time_key = DIRECTIONS[direction]
+        self.airport_id = airport_id
+        self.start = start
+        self.end = start + timedelta(
+            hours=BOARD_WINDOW_HOURS, seconds=BOARD_CACHE_SECONDS
+        )
+        self.expires_at = start + timedelta(seconds=BOARD_CACHE_SECONDS)
+        self.rows = board_rows(
+            Flight.objects.filter(**{
+                f"route__{self.airport_key}": airport_id,
+                f"{self.time_key}__gte": self.start,
+                f"{self.time_key}__lt": self.end,
+            }).order_by(self.time_key, "id")
+        )
+
+    def _sort_key(self, row):
+        return row[self.time_key], row["id"]
+
+    def discard(self, flight_id):
+        self.rows = [row for row in self.rows if row["id"] != flight_id]
+
+    def insert(self, row):
+        if (
+            row[self.airport_key] == self.airport_id
+            and self.start <= row[self.time_key] < self.end
+        ):
+            insort(self.rows, row, key=self._sort_key)
+
+    def adjust_tickets(self, flight_id, delta):
+        for row in self.rows:
+            if row["id"] == flight_id:
+                row["tickets_available"] += delta
+
+    def upcoming(self, now, hours, limit):
+        end = now + timedelta(hours=hours)
+        return [
+            dict(row) for row in self.rows if now <= row[self.time_key] < end
+        ][:limit]
+
+
+class AirportBoard:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows = {}
+        self._loads = SingleFlight()
+        # Bumped by every change, so a load can tell it may have missed one.
+        self._changes = 0
+
+    def clear(self):
+        with self._lock:
+            self._windows.clear()
+
+    def get(self, airport_id, direction, hours=6, limit=10):
+        """Return the next ``limit`` flights within ``hours`` from now."""
+        now = timezone.now()
+        key = (airport_id, direction)
+
+        with self._lock:
+            window = self._windows.get(key)
+            if window is not None and window.expires_at > now:
+                return window.upcoming(now, hours, limit)
+
+        window = self._loads.do(key, lambda: self._load(key, now))
+        with self._lock:
+            return window.upcoming(now, hours, limit)
+
+    def _load(self, key, now):
+        """Query the window of ``key`` without the lock, then cache it."""
+        airport_id, direction = key
+        with self._lock:
+            changes = self._changes
+
+        window = BoardWindow(direction, airport_id, now)
+
+        with self._lock:
+            if self._changes == changes:
+                self._windows[key] = window
+        return window
+
+    def _live_windows(self):
+        """Drop expired windows and return the rest; call with the lock."""
+        now = timezone.now()
+        self._windows = {
+            key: window
+            for key, window in self._windows.items()
+            if window.expires_at > now
+        }
+        return self._windows.values()
+
+    def flight_changed(self, flight_id):
+        with self._lock:
+            self._changes += 1
+            if not self._windows:
+                return
+
+        rows = board_rows(Flight.objects.filter(id=flight_id))
+
+        with self._lock:
+            for window in self._live_windows():
+                window.discard(flight_id)
+                for row in rows:
+                    window.insert(dict(row))
+
+    def flight_deleted(self, flight_id):
+        with self._lock:
+            self._changes += 1
+            for window in self._live_windows():
+                window.discard(flight_id)
+
+    def tickets_changed(self, flight_id, delta):
+        with self._lock:
+            self._changes += 1
+            for window in self._live_windows():
+                window.adjust_tickets(flight_id, delta)
+
+
+airport_board = AirportBoard()
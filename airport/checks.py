@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Version stamps, seat holds, replica stickiness and throttles live in
+    the default cache, so every worker and management command has to see
+    the same one.
+    """
+    if settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Set REDIS_URL (or configure a shared CACHES backend) when "
+                "running more than one worker, otherwise workers serve "
+                "stale reference data and miss each other's seat holds."
+            ),
+            id="airport.W001",
+        )
+    ]
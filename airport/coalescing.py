@@ -0,0 +1,84 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many clients ask for the same hot flight at once, the first request
+(the leader) computes the response data and every identical request that
+arrives while it is running waits for that result instead of running the
+same queries again. Nothing is kept after the leader finishes, so this
+never serves data older than a request already in progress.
+
+Waiting happens on a ``threading.Event``: under WSGI every request has
+its own thread, and under ASGI Django runs sync views in worker threads,
+never on the event loop, so a follower never blocks the loop.
+"""
+import threading
+
+from django.conf import settings
+
+from airport_service.db_router import reads_from_replica
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, compute):
+        """Return ``compute()``, sharing one run among concurrent callers of ``key``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.followers += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = compute()
+            return call.result
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+flight_reads = SingleFlight()
+
+
+def request_key(request):
+    """
+    Requests with equal keys get byte-identical responses: same URL and
+    query string, same renderer and the same database to read from.
+    """
+    return (
+        request.get_host(),
+        request.get_full_path(),
+        request.accepted_renderer.format,
+        reads_from_replica(),
+    )
+
+
+def coalesced(request, compute):
+    """Run ``compute()`` once for all concurrent identical ``request``s."""
+    if not getattr(settings, "REQUEST_COALESCING", True):
+        return compute()
+    return flight_reads.do(request_key(request), compute)
@@ -0,0 +1,100 @@
+"""
+Bulk validation of proposed flight schedules.
+
+Existing flights that could clash with any proposal are read in two
+queries (one per resource kind) and put, together with the proposals, in
+an interval tree per airplane and per crew member. Every proposal is then
+checked against its resources' trees only, so thousands of proposals are
+validated in one pass without a query per flight.
+"""
+from airport.intervals import IntervalTree
+from airport.models import Flight
+
+AIRPLANE = "airplane"
+CREW = "crew"
+
+
+def _resources(proposal):
+    yield AIRPLANE, proposal["airplane"]
+    for crew_id in proposal.get("crew", ()):
+        yield CREW, crew_id
+
+
+def find_schedule_conflicts(proposals):
+    """
+    Return every clash of ``proposals`` with existing flights or with
+    each other.
+
+    A proposal is a dict with ``airplane``, ``crew`` (ids),
+    ``departure_time``, ``arrival_time`` and an optional ``flight`` id when
+    it reschedules an existing flight, whose stored times are then ignored.
+    """
+    if not proposals:
+        return []
+
+    window_start = min(proposal["departure_time"] for proposal in proposals)
+    window_end = max(proposal["arrival_time"] for proposal in proposals)
+    rescheduled = [
+        proposal["flight"] for proposal in proposals if proposal.get("flight")
+    ]
+    airplane_ids = {proposal["airplane"] for proposal in proposals}
+    crew_ids = {
+        crew_id for proposal in proposals for crew_id in proposal.get("crew", ())
+    }
+
+    intervals = {}
+    existing = Flight.objects.filter(
+        arrival_time__gt=window_start, departure_time__lt=window_end
+    ).exclude(id__in=rescheduled)
+
+    for flight_id, airplane_id, departure_time, arrival_time in (
+        existing.filter(airplane_id__in=airplane_ids)
+        .order_by()
+        .values_list("id", "airplane_id", "departure_time", "arrival_time")
+    ):
+        intervals.setdefault((AIRPLANE, airplane_id), []).append(
+            (departure_time, arrival_time, ("flight", flight_id))
+        )
+
+    for flight_id, crew_id, departure_time, arrival_time in (
+        Flight.crew.through.objects
+        .filter(crew_id__in=crew_ids, flight__in=existing)
+        .values_list(
+            "flight_id", "crew_id",
+            "flight__departure_time", "flight__arrival_time",
+        )
+    ):
+        intervals.setdefault((CREW, crew_id), []).append(
+            (departure_time, arrival_time, ("flight", flight_id))
+        )
+
+    for index, proposal in enumerate(proposals):
+        for resource in _resources(proposal):
+            intervals.setdefault(resource, []).append((
+                proposal["departure_time"],
+                proposal["arrival_time"],
+                ("proposal", index),
+            ))
+
+    trees = {
+        resource: IntervalTree(resource_intervals)
+        for resource, resource_intervals in intervals.items()
+    }
+
+    conflicts = []
+    for index, proposal in enumerate(proposals):
+        for resource in _resources(proposal):
+            for kind, other in trees[resource].overlapping(
+                proposal["departure_time"], proposal["arrival_time"]
+            ):
+                if (kind, other) == ("proposal", index):
+                    continue
+                conflicts.append({
+                    "index": index,
+                    "resource": resource[0],
+                    "resource_id": resource[1],
+                    "flight": other if kind == "flight" else None,
+                    "proposal": other if kind == "proposal" else None,
+                })
+
+    return conflicts
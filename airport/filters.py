@@ -0,0 +1,260 @@
+"""
+Typed query parameter filters for list endpoints.
+
+A viewset declares its filters once, e.g.
+
+    FLIGHT_FILTERS = QueryFilters(
+        airplane=IdsFilter("airplane_id", "Filter by airplane ids (ex. ?airplane=1,2)"),
+        departure_after=TimeFilter("departure_time", "gte", "..."),
+    )
+
+``FLIGHT_FILTERS.apply(queryset, request)`` compiles the request's query
+parameters into predicates and filters by them, answering a malformed
+value with 400 rather than a server error; ``FLIGHT_FILTERS.parameters``
+documents the same parameters in the schema. Parameters of a report
+rather than a queryset, such as the analytics period, are filters
+without a field, read with ``values(request)``.
+
+Every predicate compares a bare column with constants, so the database
+can use an index on that column. A day is the half-open range from its
+midnight to the next one in the current time zone rather than
+``column__date``, which wraps the column in a function and rules the
+index out. Predicates also test model instances that are not stored,
+such as the virtual departures of recurring schedules.
+"""
+import operator
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+
+MAX_FILTER_IDS = 100
+# Largest value of a bigint column; a larger id overflows the query.
+MAX_ID = 2**63 - 1
+
+OPERATORS = {
+    "exact": operator.eq,
+    "in": lambda value, values: value in values,
+    "gte": operator.ge,
+    "lte": operator.le,
+    "lt": operator.lt,
+}
+
+
+class Predicate(namedtuple("Predicate", ["path", "operator", "value"])):
+    """``path`` (a field, or relation__field) ``operator`` ``value``."""
+
+    def q(self):
+        return Q(**{f"{self.path}__{self.operator}": self.value})
+
+    def matches(self, instance):
+        value = instance
+        for name in self.path.split("__"):
+            value = getattr(value, name)
+        return OPERATORS[self.operator](value, self.value)
+
+
+class ExistsPredicate(namedtuple("ExistsPredicate", ["queryset"])):
+    """Rows for which ``queryset``, correlated by ``OuterRef``, is not empty."""
+
+    def q(self):
+        return Q(Exists(self.queryset))
+
+
+class QueryFilter:
+    type = OpenApiTypes.STR
+    many = False
+
+    def __init__(self, field, description):
+        self.field = field
+        self.description = description
+
+    def parameter(self, name):
+        return OpenApiParameter(
+            name,
+            type=self.type,
+            many=self.many,
+            explode=False if self.many else None,
+            description=self.description,
+        )
+
+    def parse(self, name, value):
+        raise NotImplementedError
+
+    def predicates(self, value):
+        raise NotImplementedError
+
+
+class IdsFilter(QueryFilter):
+    """One id or a comma-separated list of ids."""
+
+    type = OpenApiTypes.INT
+    many = True
+
+    def parse(self, name, value):
+        try:
+            ids = sorted({int(part) for part in value.split(",") if part.strip()})
+        except ValueError:
+            raise ValidationError({name: "A comma-separated list of ids is required."})
+        if not ids or ids[0] < 1:
+            raise ValidationError({name: "Ids must be positive integers."})
+        if ids[-1] > MAX_ID:
+            raise ValidationError({name: f"Ids must be at most {MAX_ID}."})
+        if len(ids) > MAX_FILTER_IDS:
+            raise ValidationError({name: f"At most {MAX_FILTER_IDS} ids are allowed."})
+        return ids
+
+    def predicates(self, ids):
+        if len(ids) == 1:
+            return [Predicate(self.field, "exact", ids[0])]
+        return [Predicate(self.field, "in", ids)]
+
+
+class IntFilter(QueryFilter):
+    """An integer within ``minimum..maximum``."""
+
+    type = OpenApiTypes.INT
+
+    def __init__(self, field, description, minimum=1, maximum=MAX_ID):
+        super().__init__(field, description)
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def parse(self, name, value):
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValidationError({name: "A valid integer is required."})
+        if not self.minimum <= number <= self.maximum:
+            raise ValidationError({
+                name: f"Must be between {self.minimum} and {self.maximum}."
+            })
+        return number
+
+    def predicates(self, number):
+        return [Predicate(self.field, "exact", number)]
+
+
+class RelatedIdsFilter(IdsFilter):
+    """
+    Rows with at least one related ``model`` row whose ``field`` is one of
+    the ids, e.g. orders with a ticket on one of the flights. An EXISTS
+    subquery, so the rows are not repeated once per match.
+    """
+
+    def __init__(self, model, link, field, description):
+        super().__init__(field, description)
+        self.model = model
+        self.link = link
+
+    def predicates(self, ids):
+        related = self.model.objects.filter(
+            **{self.link: OuterRef("pk"), f"{self.field}__in": ids}
+        )
+        return [ExistsPredicate(related)]
+
+
+class DayFilter(QueryFilter):
+    """A ``YYYY-MM-DD`` day of a date and time column."""
+
+    type = OpenApiTypes.DATE
+
+    def parse(self, name, value):
+        day = parse_day(name, value)
+        return (
+            timezone.make_aware(datetime.combine(day, time.min)),
+            timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)),
+        )
+
+    def predicates(self, bounds):
+        start, end = bounds
+        return [Predicate(self.field, "gte", start), Predicate(self.field, "lt", end)]
+
+
+class DateFilter(QueryFilter):
+    """A ``YYYY-MM-DD`` bound of a date column."""
+
+    type = OpenApiTypes.DATE
+
+    def __init__(self, field, lookup, description):
+        super().__init__(field, description)
+        self.lookup = lookup
+
+    def parse(self, name, value):
+        return parse_day(name, value)
+
+    def predicates(self, day):
+        return [Predicate(self.field, self.lookup, day)]
+
+
+class TimeFilter(DateFilter):
+    """
+    A bound of a date and time column: an ISO 8601 date and time, or a
+    day meaning its midnight, in the current time zone unless given.
+    """
+
+    type = OpenApiTypes.DATETIME
+
+    def parse(self, name, value):
+        try:
+            moment = parse_datetime(value)
+        except ValueError:
+            moment = None
+        if moment is None:
+            try:
+                moment = datetime.combine(parse_day(name, value), time.min)
+            except ValidationError:
+                raise ValidationError({
+                    name: "Use YYYY-MM-DD or an ISO 8601 date and time."
+                })
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+
+def parse_day(name, value):
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise ValidationError({name: "Date has wrong format. Use YYYY-MM-DD."})
+    return day
+
+
+class QueryFilters:
+    def __init__(self, **filters):
+        self.filters = filters
+
+    @property
+    def parameters(self):
+        return [
+            query_filter.parameter(name)
+            for name, query_filter in self.filters.items()
+        ]
+
+    def values(self, request, names=None):
+        """Parsed values of the request's filter parameters, or of ``names``."""
+        values = {}
+        for name, query_filter in self.filters.items():
+            value = request.query_params.get(name)
+            if value and (names is None or name in names):
+                values[name] = query_filter.parse(name, value)
+        return values
+
+    def predicates(self, request, names=None):
+        """Predicates of the request's filter parameters, or of ``names``."""
+        predicates = []
+        for name, value in self.values(request, names).items():
+            predicates += self.filters[name].predicates(value)
+        return predicates
+
+    def apply(self, queryset, request, names=None):
+        for predicate in self.predicates(request, names):
+            queryset = queryset.filter(predicate.q())
+        return queryset
@@ -0,0 +1,310 @@
+"""
+Great-circle distances and a nearest-airport index.
+
+Route distances are computed from the coordinates of both airports in
+batches: the coordinates are read into NumPy arrays and the haversine
+formula runs over all routes at once. Like ``airport.analytics``, these
+functions import NumPy themselves, so it stays out of startup.
+
+``airport_geo_index`` answers "nearest airports to this point" from a
+k-d tree over the airports' positions as 3-D unit vectors. The straight
+line (chord) between two unit vectors grows with the great-circle
+distance, so the tree needs no special cases for the poles or the
+antimeridian. Like ``airport.search``, the tree is loaded on first use,
+updated one airport at a time from model signals after commit and
+reloaded from the primary when another process bumps the shared version
+stamp. Inserts go straight into the tree; removed airports are only
+marked dead, and the tree is rebuilt balanced once dead nodes outnumber
+live ones or inserts have made it too deep.
+"""
+import heapq
+import math
+import threading
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from airport.analytics import columns
+from airport.models import Airport, Route
+from airport_service.db_router import PRIMARY_DATABASE
+
+EARTH_RADIUS_KM = 6371.0
+VERSION_CACHE_KEY = "airport-geo:version"
+ROUTE_DISTANCE_BATCH_SIZE = 1000
+
+POINT, AIRPORT_ID, AXIS, LEFT, RIGHT, ALIVE = range(6)
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    haversine = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(haversine))
+
+
+def great_circle_km(lat1, lon1, lat2, lon2):
+    """``haversine_km`` over NumPy arrays of coordinates in degrees."""
+    import numpy as np
+
+    lat1, lon1, lat2, lon2 = (np.radians(values) for values in (lat1, lon1, lat2, lon2))
+    haversine = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+
+
+def route_distance(source, destination):
+    """Rounded distance between two airports, or None without coordinates."""
+    if source.latitude is None or destination.latitude is None:
+        return None
+    return max(1, round(haversine_km(
+        source.latitude, source.longitude, destination.latitude, destination.longitude
+    )))
+
+
+def update_route_distances(routes=None):
+    """
+    Recompute ``distance`` of ``routes`` (default: all) whose airports
+    both have coordinates; return the number of routes changed.
+    """
+    import numpy as np
+
+    routes = (Route.objects.all() if routes is None else routes).filter(
+        source__latitude__isnull=False, destination__latitude__isnull=False
+    )
+    route_ids, distances, *coordinates = columns(
+        [routes],
+        (
+            "id",
+            "distance",
+            "source__latitude",
+            "source__longitude",
+            "destination__latitude",
+            "destination__longitude",
+        ),
+        (np.int64, np.int64, np.float64, np.float64, np.float64, np.float64),
+    )
+    computed = np.maximum(np.rint(great_circle_km(*coordinates)), 1).astype(np.int64)
+    changed = computed != distances
+
+    now = timezone.now()
+    Route.objects.bulk_update(
+        [
+            Route(id=route_id, distance=distance, updated_at=now)
+            for route_id, distance in zip(
+                route_ids[changed].tolist(), computed[changed].tolist()
+            )
+        ],
+        ["distance", "updated_at"],
+        batch_size=ROUTE_DISTANCE_BATCH_SIZE,
+    )
+    return int(changed.sum())
+
+
+def update_airport_route_distances(airport_id):
+    return update_route_distances(
+        Route.objects.filter(Q(source_id=airport_id) | Q(destination_id=airport_id))
+    )
+
+
+def unit_vector(latitude, longitude):
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    return (
+        math.cos(latitude) * math.cos(longitude),
+        math.cos(latitude) * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+def km_to_chord(km):
+    return 2 * math.sin(min(km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class AirportGeoIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._loaded = False
+            self._version = None
+            self._airports = {}
+            self._nodes = {}
+            self._root = None
+            self._dead = 0
+            self._depth = 0
+
+    def _ensure_loaded(self):
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        if self._loaded and version == self._version:
+            return
+
+        self.clear()
+        airports = Airport.objects.using(PRIMARY_DATABASE).filter(
+            latitude__isnull=False
+        )
+        for airport in airports.only(
+            "id", "name", "closest_big_city", "latitude", "longitude"
+        ):
+            self._airports[airport.id] = self._copy(airport)
+        self._rebuild()
+        self._loaded = True
+        self._version = version
+
+    @staticmethod
+    def _copy(airport):
+        return Airport(
+            id=airport.id,
+            name=airport.name,
+            closest_big_city=airport.closest_big_city,
+            latitude=airport.latitude,
+            longitude=airport.longitude,
+        )
+
+    def _rebuild(self):
+        """Build a balanced tree over the live airports."""
+        self._nodes = {}
+        self._dead = 0
+        self._depth = 0
+        points = [
+            (unit_vector(airport.latitude, airport.longitude), airport_id)
+            for airport_id, airport in self._airports.items()
+        ]
+        self._root = self._build(points, 0)
+
+    def _build(self, points, depth):
+        if not points:
+            return None
+
+        self._depth = max(self._depth, depth + 1)
+        axis = depth % 3
+        points.sort(key=lambda point: point[0][axis])
+        middle = len(points) // 2
+        point, airport_id = points[middle]
+        node = [point, airport_id, axis, None, None, True]
+        self._nodes[airport_id] = node
+        node[LEFT] = self._build(points[:middle], depth + 1)
+        node[RIGHT] = self._build(points[middle + 1:], depth + 1)
+        return node
+
+    def _insert(self, airport_id, point):
+        depth, parent, node = 0, None, self._root
+        while node is not None:
+            parent = node
+            side = LEFT if point[node[AXIS]] < node[POINT][node[AXIS]] else RIGHT
+            node = node[side]
+            depth += 1
+
+        node = [point, airport_id, depth % 3, None, None, True]
+        self._nodes[airport_id] = node
+        self._depth = max(self._depth, depth + 1)
+        if parent is None:
+            self._root = node
+        else:
+            parent[side] = node
+
+    def _remove(self, airport_id):
+        self._airports.pop(airport_id, None)
+        node = self._nodes.pop(airport_id, None)
+        if node is not None:
+            node[ALIVE] = False
+            self._dead += 1
+
+    def _rebalance_if_needed(self):
+        live = len(self._nodes)
+        if self._dead > live or self._depth > 2 * max(live, 1).bit_length() + 8:
+            self._rebuild()
+
+    def _sync_version(self):
+        """Bump the shared version after a local change."""
+        try:
+            version = cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.add(VERSION_CACHE_KEY, 1)
+            version = cache.get(VERSION_CACHE_KEY)
+
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+        else:
+            self._loaded = False
+
+    def update(self, airport):
+        with self._lock:
+            if self._loaded:
+                self._remove(airport.id)
+                if airport.latitude is not None:
+                    self._airports[airport.id] = self._copy(airport)
+                    self._insert(
+                        airport.id, unit_vector(airport.latitude, airport.longitude)
+                    )
+                self._rebalance_if_needed()
+            self._sync_version()
+
+    def delete(self, airport_id):
+        with self._lock:
+            if self._loaded:
+                self._remove(airport_id)
+                self._rebalance_if_needed()
+            self._sync_version()
+
+    def nearest(self, latitude, longitude, limit=10, radius_km=None):
+        """
+        Return up to ``limit`` ``(airport, distance_km)`` pairs closest to
+        the point, nearest first, optionally within ``radius_km``.
+        """
+        query = unit_vector(latitude, longitude)
+        bound = km_to_chord(radius_km) ** 2 if radius_km is not None else math.inf
+
+        with self._lock:
+            self._ensure_loaded()
+
+            # Max-heap of the best candidates as (-squared chord, airport id).
+            best = []
+            stack = [(self._root, 0.0)]
+            while stack:
+                node, floor = stack.pop()
+                worst = -best[0][0] if len(best) == limit else bound
+                if node is None or floor > worst:
+                    continue
+
+                point = node[POINT]
+                if node[ALIVE]:
+                    distance = (
+                        (query[0] - point[0]) ** 2
+                        + (query[1] - point[1]) ** 2
+                        + (query[2] - point[2]) ** 2
+                    )
+                    if distance <= worst:
+                        if len(best) < limit:
+                            heapq.heappush(best, (-distance, node[AIRPORT_ID]))
+                        else:
+                            heapq.heapreplace(best, (-distance, node[AIRPORT_ID]))
+
+                # The far side is at least ``difference`` away along the
+                # splitting axis; it is searched after the near side has
+                # tightened ``worst``.
+                difference = query[node[AXIS]] - point[node[AXIS]]
+                near, far = (
+                    (node[LEFT], node[RIGHT]) if difference < 0
+                    else (node[RIGHT], node[LEFT])
+                )
+                stack.append((far, max(floor, difference * difference)))
+                stack.append((near, floor))
+
+            return [
+                (self._airports[airport_id], chord_to_km(math.sqrt(-distance)))
+                for distance, airport_id in sorted(best, reverse=True)
+            ]
+
+
+airport_geo_index = AirportGeoIndex()
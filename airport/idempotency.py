@@ -0,0 +1,95 @@
+"""
+``Idempotency-Key`` support for endpoints that must not run twice.
+
+The first request with a key runs the view and stores its fingerprint
+and response in the same transaction as the work itself, so a key is
+either absent or fully answered: a failed request leaves nothing behind
+and can be retried. A retry with the same key and body gets the stored
+response without touching the booking tables; the same key with a
+different body is refused. Concurrent duplicates collide on the unique
+``(user, key)`` constraint and the loser replays the winner's response.
+"""
+import hashlib
+import json
+from functools import wraps
+
+from django.db import IntegrityError
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from airport.models import IdempotencyKey
+from airport_service.sqlite import immediate_atomic
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+
+
+def request_fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(
+        f"{request.method} {request.path}\n{body}".encode()
+    ).hexdigest()
+
+
+def replay(record, fingerprint):
+    if record.fingerprint != fingerprint:
+        raise ValidationError({
+            IDEMPOTENCY_HEADER: "This key was already used for a different request."
+        })
+
+    return Response(
+        record.response,
+        status=record.status_code,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def idempotent(view_method):
+    """Make a viewset action honour the ``Idempotency-Key`` header."""
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            raise ValidationError({IDEMPOTENCY_HEADER: "Key is too long."})
+
+        fingerprint = request_fingerprint(request)
+        keys = IdempotencyKey.objects.filter(user=request.user, key=key)
+        record = keys.first()
+        if record is not None:
+            return replay(record, fingerprint)
+
+        try:
+            # The block always ends with a write, so take the write lock
+            # up front on SQLite.
+            with immediate_atomic():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code < 300:
+                    IdempotencyKey.objects.create(
+                        user=request.user,
+                        key=key,
+                        fingerprint=fingerprint,
+                        status_code=response.status_code,
+                        response=response.data,
+                    )
+        except IntegrityError:
+            # A concurrent request with the same key committed first; if
+            # not, the error came from the view itself.
+            record = keys.first()
+            if record is None:
+                raise
+            return replay(record, fingerprint)
+
+        return response
+
+    return wrapper
+
+
+def expire_idempotency_keys(created_before):
+    """Delete keys created before ``created_before``; return the count."""
+    deleted, _ = IdempotencyKey.objects.filter(
+        created_at__lt=created_before
+    ).delete()
+    return deleted
@@ -0,0 +1,71 @@
+"""Static centered interval tree for overlap queries on half-open ranges."""
+
+
+class IntervalTree:
+    """
+    Answer "which intervals overlap ``[start, end)``" in ``O(log n + k)``.
+
+    Built once from ``(start, end, key)`` tuples; every node keeps the
+    intervals containing its center sorted by start and by end, so a query
+    only scans the intervals it reports.
+    """
+
+    def __init__(self, intervals):
+        intervals = [
+            (start, end, key) for start, end, key in intervals if start < end
+        ]
+        self._root = self._build(intervals) if intervals else None
+
+    def _build(self, intervals):
+        # The median start always lands in ``here``, so every level shrinks.
+        starts = sorted(start for start, _, _ in intervals)
+        center = starts[len(starts) // 2]
+        left, right, here = [], [], []
+
+        for interval in intervals:
+            start, end, _ = interval
+            if end <= center:
+                left.append(interval)
+            elif start > center:
+                right.append(interval)
+            else:
+                here.append(interval)
+
+        return (
+            center,
+            sorted(here, key=lambda interval: interval[0]),
+            sorted(here, key=lambda interval: interval[1], reverse=True),
+            self._build(left) if left else None,
+            self._build(right) if right else None,
+        )
+
+    def overlapping(self, start, end):
+        """Return the keys of all intervals overlapping ``[start, end)``."""
+        found = []
+        nodes = [self._root] if self._root else []
+
+        while nodes:
+            center, by_start, by_end, left, right = nodes.pop()
+
+            if end <= center:
+                for interval_start, _, key in by_start:
+                    if interval_start >= end:
+                        break
+                    found.append(key)
+                if left:
+                    nodes.append(left)
+            elif start > center:
+                for _, interval_end, key in by_end:
+                    if interval_end <= start:
+                        break
+                    found.append(key)
+                if right:
+                    nodes.append(right)
+            else:
+                found.extend(key for _, _, key in by_start)
+                if left:
+                    nodes.append(left)
+                if right:
+                    nodes.append(right)
+
+        return found
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.archive import archive_flights
+
+
+class Command(BaseCommand):
+    """Django command to move long-departed flights to the archive tables."""
+
+    help = "Archive flights that departed more than --days days ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=90)
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        archived = archive_flights(cutoff, batch_size=options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {archived} flights departed before {cutoff:%Y-%m-%d}."
+        ))
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from airport.models import ArchivedFlight, Flight
+from airport.route_stats import backfill
+
+
+class Command(BaseCommand):
+    """Django command to rebuild the daily route load-factor statistics."""
+
+    help = (
+        "Rebuild daily route statistics between --from and --to "
+        "(default: the whole flight history)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="first_day", type=date.fromisoformat)
+        parser.add_argument("--to", dest="last_day", type=date.fromisoformat)
+
+    def handle(self, *args, **options):
+        first_day, last_day = options["first_day"], options["last_day"]
+        if first_day is None or last_day is None:
+            bounds = [
+                model.objects.aggregate(
+                    first=Min("departure_time"), last=Max("departure_time")
+                )
+                for model in (Flight, ArchivedFlight)
+            ]
+            firsts = [bound["first"] for bound in bounds if bound["first"]]
+            lasts = [bound["last"] for bound in bounds if bound["last"]]
+            today = timezone.now().date()
+            first_day = first_day or (min(firsts).date() if firsts else today)
+            last_day = last_day or (max(lasts).date() if lasts else today)
+
+        rows = backfill(first_day, last_day)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {rows} daily route statistics from {first_day} to {last_day}."
+        ))
@@ -0,0 +1,161 @@
+import math
+import statistics
+import time
+from collections import defaultdict
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from airport.analytics import airplane_utilization, flight_time_report, seat_heatmap
+from airport.models import ArchivedFlight, ArchivedTicket, Flight, Ticket
+from airport.route_stats import day_range
+
+
+def orm_flight_times(start, end):
+    """Per-route flight time quantiles with a loop over model instances."""
+    minutes = defaultdict(list)
+    for model in (Flight, ArchivedFlight):
+        for flight in model.objects.filter(departure_time__gte=start, departure_time__lt=end):
+            minutes[flight.route_id].append(flight.flight_time.total_seconds() / 60)
+
+    routes = []
+    for route_id, values in sorted(minutes.items()):
+        if len(values) > 1:
+            cuts = statistics.quantiles(values, n=100, method="inclusive")
+            p50, p90, p99 = cuts[49], cuts[89], cuts[98]
+        else:
+            p50 = p90 = p99 = values[0]
+        routes.append({
+            "route": route_id,
+            "flights": len(values),
+            "mean_minutes": round(statistics.fmean(values), 2),
+            "p50_minutes": round(p50, 2),
+            "p90_minutes": round(p90, 2),
+            "p99_minutes": round(p99, 2),
+        })
+    return routes
+
+
+def orm_seat_heatmap(start, end):
+    """Tickets sold and seats offered per position, one instance at a time."""
+    sold = defaultdict(int)
+    offered = defaultdict(int)
+    for model in (Flight, ArchivedFlight):
+        flights = model.objects.filter(
+            departure_time__gte=start, departure_time__lt=end
+        ).select_related("airplane")
+        for flight in flights:
+            for row in range(flight.airplane.rows):
+                for seat in range(flight.airplane.seats_in_row):
+                    offered[row, seat] += 1
+    for model in (Ticket, ArchivedTicket):
+        tickets = model.objects.filter(
+            flight__departure_time__gte=start, flight__departure_time__lt=end
+        )
+        for ticket in tickets:
+            sold[ticket.row - 1, ticket.seat - 1] += 1
+    return {position: sold[position] / count for position, count in offered.items()}
+
+
+def orm_utilization(start, end):
+    """Airborne hours and tickets per airplane, one instance at a time."""
+    hours = defaultdict(float)
+    tickets_sold = defaultdict(int)
+    for model in (Flight, ArchivedFlight):
+        flights = model.objects.filter(
+            departure_time__lt=end, arrival_time__gt=start
+        ).prefetch_related("tickets")
+        for flight in flights:
+            airborne = min(flight.arrival_time, end) - max(flight.departure_time, start)
+            hours[flight.airplane_id] += airborne.total_seconds() / 3600
+            tickets_sold[flight.airplane_id] += len(flight.tickets.all())
+    return {
+        airplane_id: (round(hours[airplane_id], 2), tickets_sold[airplane_id])
+        for airplane_id in hours
+    }
+
+
+def agree(orm, vectorized):
+    """Compare two reports, allowing for floats summed in another order."""
+    if isinstance(orm, dict):
+        return all(
+            agree(value, vectorized.get(key, 0)) for key, value in orm.items()
+        )
+    if isinstance(orm, (list, tuple)):
+        return len(orm) == len(vectorized) and all(map(agree, orm, vectorized))
+    return math.isclose(orm, vectorized, abs_tol=0.011)
+
+
+class Command(BaseCommand):
+    """Django command to compare the analytics reports with ORM loops."""
+
+    help = (
+        "Time every analytics report against a loop over model instances "
+        "for departures between --from and --to (default: the whole "
+        "flight history) and check that both agree."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="first_day", type=date.fromisoformat)
+        parser.add_argument("--to", dest="last_day", type=date.fromisoformat)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        first_day, last_day = options["first_day"], options["last_day"]
+        if first_day is None or last_day is None:
+            bounds = [
+                model.objects.aggregate(
+                    first=Min("departure_time"), last=Max("departure_time")
+                )
+                for model in (Flight, ArchivedFlight)
+            ]
+            firsts = [bound["first"] for bound in bounds if bound["first"]]
+            lasts = [bound["last"] for bound in bounds if bound["last"]]
+            if not firsts:
+                raise CommandError("No flights to analyse, see generate_data.")
+            first_day = first_day or min(firsts).date()
+            last_day = last_day or max(lasts).date()
+        start, end = day_range(first_day, last_day)
+
+        def vectorized_flight_times():
+            return flight_time_report(start, end)["routes"]
+
+        def vectorized_heatmap():
+            report = seat_heatmap(start, end)
+            return {
+                (row, seat): occupancy
+                for row, seats in enumerate(report["occupancy"])
+                for seat, occupancy in enumerate(seats)
+            }
+
+        def vectorized_utilization():
+            return {
+                item["airplane"]: (item["hours"], item["tickets_sold"])
+                for item in airplane_utilization(start, end)
+            }
+
+        self.stdout.write(f"Departures from {first_day} to {last_day}:")
+        for name, orm, vectorized in (
+            ("flight_times", orm_flight_times, vectorized_flight_times),
+            ("seat_heatmap", orm_seat_heatmap, vectorized_heatmap),
+            ("utilization", orm_utilization, vectorized_utilization),
+        ):
+            orm_seconds, orm_result = self.best_of(options["rounds"], orm, start, end)
+            numpy_seconds, numpy_result = self.best_of(options["rounds"], vectorized)
+            same = agree(orm_result, numpy_result)
+            self.stdout.write(
+                f"{name:<13} orm={orm_seconds * 1000:.0f}ms "
+                f"numpy={numpy_seconds * 1000:.0f}ms "
+                f"speedup={orm_seconds / numpy_seconds:.1f}x "
+                f"results={'match' if same else 'DIFFER'}"
+            )
+
+    @staticmethod
+    def best_of(rounds, function, *args):
+        timings = []
+        for _ in range(max(rounds, 1)):
+            started = time.perf_counter()
+            result = function(*args)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
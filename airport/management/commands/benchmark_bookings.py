@@ -0,0 +1,146 @@
+import statistics
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.models import Airplane, AirplaneType, Flight, Order, Route
+from airport.views import OrderViewSet
+
+
+def use_database(engine, options):
+    """Make new connections to the default database use ``engine``."""
+    connections.close_all()
+    database = connections.settings[DEFAULT_DB_ALIAS]
+    database["ENGINE"], database["OPTIONS"] = engine, options
+    del connections[DEFAULT_DB_ALIAS]
+
+
+class Command(BaseCommand):
+    """Django command to compare concurrent booking on default and tuned SQLite."""
+
+    help = (
+        "Book seats from --threads threads at once, each placing --orders "
+        "orders of --tickets tickets, with SQLite's default settings and "
+        "with the high-concurrency ones, and compare throughput and failures."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--orders", type=int, default=20)
+        parser.add_argument("--tickets", type=int, default=2)
+
+    def handle(self, *args, **options):
+        database = connections.settings[DEFAULT_DB_ALIAS]
+        if connections[DEFAULT_DB_ALIAS].vendor != "sqlite":
+            raise CommandError("Benchmarks the SQLite database of settings/local.py.")
+
+        route = Route.objects.first()
+        airplane_type = AirplaneType.objects.first()
+        user = get_user_model().objects.filter(is_active=True).first()
+        if route is None or airplane_type is None or user is None:
+            raise CommandError(
+                "Needs a route, an airplane type and a user, see generate_data."
+            )
+
+        configurations = (
+            ("default", "django.db.backends.sqlite3", {}),
+            ("tuned", "airport_service.sqlite", {"pragmas": settings.SQLITE_HIGH_CONCURRENCY_PRAGMAS}),
+        )
+        original = database["ENGINE"], database["OPTIONS"]
+        airplane = Airplane.objects.create(
+            name="Booking benchmark",
+            rows=options["threads"] * options["orders"],
+            seats_in_row=options["tickets"],
+            airplane_type=airplane_type,
+        )
+        try:
+            for offset, (name, engine, database_options) in enumerate(configurations):
+                use_database(engine, database_options)
+                if not database_options:
+                    # WAL is stored in the database file; undo it for the
+                    # default run.
+                    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                        cursor.execute("PRAGMA journal_mode = delete")
+
+                departure = timezone.now() + timedelta(days=365 + offset)
+                flight = Flight.objects.create(
+                    route=route,
+                    airplane=airplane,
+                    departure_time=departure,
+                    arrival_time=departure + timedelta(hours=2),
+                )
+                self.report(name, self.book(flight, user, options))
+        finally:
+            use_database(*original)
+            if not original[1]:
+                with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode = delete")
+            Order.objects.filter(tickets__flight__airplane=airplane).delete()
+            airplane.delete()
+
+    def book(self, flight, user, options):
+        view = OrderViewSet.as_view({"post": "create"}, throttle_classes=())
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(options["threads"])
+        latencies, failures = [], []
+
+        def client(first_row):
+            barrier.wait()
+            try:
+                for row in range(first_row, first_row + options["orders"]):
+                    request = factory.post(
+                        "/api/airport/orders/",
+                        {
+                            "tickets": [
+                                {"row": row, "seat": seat, "flight": flight.id}
+                                for seat in range(1, options["tickets"] + 1)
+                            ]
+                        },
+                        format="json",
+                        HTTP_IDEMPOTENCY_KEY=str(uuid.uuid4()),
+                    )
+                    force_authenticate(request, user=user)
+                    started = time.perf_counter()
+                    try:
+                        response = view(request)
+                    except OperationalError as error:
+                        failures.append(str(error))
+                        continue
+                    if response.status_code == 201:
+                        latencies.append(time.perf_counter() - started)
+                    else:
+                        failures.append(str(response.status_code))
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=client, args=(1 + index * options["orders"],))
+            for index in range(options["threads"])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, failures, time.perf_counter() - started
+
+    def report(self, name, result):
+        latencies, failures, elapsed = result
+        latencies.sort()
+        line = f"{name:<8} booked={len(latencies)} failed={len(failures)} orders/s={len(latencies) / elapsed:.1f}"
+        if latencies:
+            line += (
+                f" p50={statistics.median(latencies) * 1000:.0f}ms"
+                f" p99={latencies[int(len(latencies) * 0.99)] * 1000:.0f}ms"
+            )
+        self.stdout.write(line)
+        for error in sorted(set(failures)):
+            self.stdout.write(f"         {failures.count(error)} x {error}")
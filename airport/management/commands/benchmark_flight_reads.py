@@ -0,0 +1,73 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from airport.coalescing import flight_reads
+from airport.models import Flight
+from airport.views import FlightViewSet
+
+
+class Command(BaseCommand):
+    """Django command to reproduce a thundering herd of flight detail reads."""
+
+    help = (
+        "Fire --clients concurrent GET /flight/<id>/ requests at once, "
+        "with and without request coalescing, and compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--flight", type=int, help="Defaults to the latest flight.")
+        parser.add_argument("--clients", type=int, default=200)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def handle(self, *args, **options):
+        flight_id = options["flight"] or Flight.objects.values_list("id", flat=True).first()
+        user = get_user_model().objects.filter(is_active=True).first()
+        if flight_id is None or user is None:
+            raise CommandError("Needs at least one flight and one user, see generate_data.")
+
+        view = FlightViewSet.as_view({"get": "retrieve"}, throttle_classes=())
+        for coalescing in (False, True):
+            with override_settings(REQUEST_COALESCING=coalescing):
+                for _ in range(options["rounds"]):
+                    self.herd(view, flight_id, user, options["clients"], coalescing)
+
+    def herd(self, view, flight_id, user, clients, coalescing):
+        factory = APIRequestFactory()
+        barrier = threading.Barrier(clients)
+        leaders = flight_reads.leaders
+
+        def client(_):
+            request = factory.get(f"/api/airport/flight/{flight_id}/")
+            force_authenticate(request, user)
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                response = view(request, pk=flight_id)
+                response.render()
+                return time.perf_counter() - started, response.status_code
+            finally:
+                connections.close_all()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            results = list(executor.map(client, range(clients)))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        failed = sum(status_code != 200 for _, status_code in results)
+        computations = flight_reads.leaders - leaders if coalescing else clients
+        self.stdout.write(
+            f"coalescing={'on ' if coalescing else 'off'} clients={clients} "
+            f"computations={computations} failed={failed} "
+            f"wall={elapsed * 1000:.0f}ms "
+            f"p50={statistics.median(latencies) * 1000:.1f}ms "
+            f"p99={latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f}ms"
+        )
@@ -0,0 +1,143 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from airport_service.schema import schema_store
+
+COLD_START_TARGET_MS = 1000
+
+# Only needed for image uploads, analytics, distance batches or schema
+# generation; none of them may be imported before the first request.
+DEFERRED_MODULES = (
+    "PIL",
+    "numpy",
+    "drf_spectacular.generators",
+    "drf_spectacular.views",
+)
+
+COLD_START_SCRIPT = """
+import io, json, sys, time
+
+started = time.perf_counter()
+from airport_service.wsgi import application
+loaded = time.perf_counter()
+
+statuses = []
+environ = {
+    "REQUEST_METHOD": "GET",
+    "PATH_INFO": sys.argv[1],
+    "QUERY_STRING": "",
+    "SERVER_NAME": "localhost",
+    "SERVER_PORT": "80",
+    "wsgi.input": io.BytesIO(),
+    "wsgi.url_scheme": "http",
+}
+b"".join(application(environ, lambda status, headers: statuses.append(status)))
+served = time.perf_counter()
+
+json.dump({
+    "startup": loaded - started,
+    "first_request": served - loaded,
+    "status": statuses[0],
+    "modules": sorted(sys.modules),
+}, sys.stdout)
+"""
+
+
+def cold_start(path):
+    """
+    Start a fresh interpreter, import the WSGI application and serve one
+    request to ``path``. Return the timings in seconds, the modules then
+    loaded and the ``-X importtime`` self time of each module in µs.
+    """
+    env = {**os.environ, "OPENAPI_SCHEMA_DIR": str(settings.OPENAPI_SCHEMA_DIR)}
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", COLD_START_SCRIPT, path],
+        capture_output=True,
+        text=True,
+        cwd=settings.BASE_DIR,
+        env=env,
+    )
+    total = time.perf_counter() - started
+    if process.returncode:
+        raise CommandError(f"Cold start failed:\n{process.stderr[-2000:]}")
+
+    result = json.loads(process.stdout)
+    result["total"] = total
+    result["imports"] = {}
+    for line in process.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            own, _, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                result["imports"][name.strip()] = int(own)
+    return result
+
+
+class Command(BaseCommand):
+    """Django command to measure how long a new process takes to serve."""
+
+    help = (
+        "Start --runs fresh processes that import the WSGI application and "
+        "serve one request, report startup, first request and import times, "
+        "and fail when the median total exceeds --max-ms or a module that "
+        "should be deferred is imported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/api/airport/flight/")
+        parser.add_argument("--max-ms", type=float, default=COLD_START_TARGET_MS)
+        parser.add_argument("--top", type=int, default=10)
+
+    def handle(self, *args, **options):
+        # What build_schema does while deploying, so that no run pays for
+        # generating the schema.
+        schema_store.get("json")
+
+        runs = [cold_start(options["path"]) for _ in range(max(options["runs"], 1))]
+
+        self.stdout.write(f"{'run':<5}{'process':>10}{'startup':>10}{'request':>10}  status")
+        for index, run in enumerate(runs, 1):
+            self.stdout.write(
+                f"{index:<5}{run['total'] * 1000:>8.0f}ms"
+                f"{run['startup'] * 1000:>8.0f}ms"
+                f"{run['first_request'] * 1000:>8.0f}ms  {run['status']}"
+            )
+
+        packages = defaultdict(list)
+        for run in runs:
+            totals = defaultdict(int)
+            for name, microseconds in run["imports"].items():
+                totals[name.partition(".")[0]] += microseconds
+            for package, microseconds in totals.items():
+                packages[package].append(microseconds)
+        self.stdout.write("Median import time by package:")
+        for package, microseconds in sorted(
+            packages.items(), key=lambda item: -statistics.median(item[1])
+        )[:options["top"]]:
+            self.stdout.write(f"  {package:<28}{statistics.median(microseconds) / 1000:>8.1f}ms")
+
+        loaded = sorted(
+            module
+            for module in DEFERRED_MODULES
+            if any(module in run["modules"] for run in runs)
+        )
+        if loaded:
+            raise CommandError(f"Imported before the first request: {', '.join(loaded)}.")
+
+        median = statistics.median(run["total"] for run in runs) * 1000
+        if median > options["max_ms"]:
+            raise CommandError(
+                f"Median cold start {median:.0f}ms exceeds the target of {options['max_ms']:.0f}ms."
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Median cold start {median:.0f}ms (target {options['max_ms']:.0f}ms)."
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from airport_service.schema import code_version, schema_store
+
+
+class Command(BaseCommand):
+    """Django command to precompute the OpenAPI schema served by the API."""
+
+    help = (
+        "Generate the OpenAPI schema of the current code and store it, "
+        "with gzipped copies, in OPENAPI_SCHEMA_DIR."
+    )
+
+    def handle(self, *args, **options):
+        documents = schema_store.rebuild()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored schema version {code_version()} "
+            f"({len(documents['yaml'].body)} bytes of YAML)."
+        ))
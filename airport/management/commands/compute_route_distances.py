@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from airport.geo import update_route_distances
+
+
+class Command(BaseCommand):
+    """Django command to recompute route distances from airport coordinates."""
+
+    help = (
+        "Set the distance of every route whose airports both have "
+        "coordinates to the great-circle distance between them."
+    )
+
+    def handle(self, *args, **options):
+        changed = update_route_distances()
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {changed} route distances."))
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.idempotency import IDEMPOTENCY_KEY_TTL_HOURS, expire_idempotency_keys
+
+
+class Command(BaseCommand):
+    """Django command to delete stored responses of old idempotency keys."""
+
+    help = "Delete idempotency keys created more than --hours hours ago."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=IDEMPOTENCY_KEY_TTL_HOURS)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        expired = expire_idempotency_keys(cutoff)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {expired} idempotency keys created before {cutoff:%Y-%m-%d %H:%M}."
+        ))
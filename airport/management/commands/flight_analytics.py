@@ -0,0 +1,46 @@
+import json
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from airport.analytics import airplane_utilization, flight_time_report, seat_heatmap
+from airport.route_stats import day_range
+
+REPORTS = ("flight_times", "seat_heatmap", "utilization")
+
+
+class Command(BaseCommand):
+    """Django command to print a flight analytics report as JSON."""
+
+    help = (
+        "Print flight time quantiles per route, the seat popularity heatmap "
+        "or airplane utilization for departures between --from and --to "
+        "(default: the last 30 days)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("report", choices=REPORTS)
+        parser.add_argument("--from", dest="first_day", type=date.fromisoformat)
+        parser.add_argument("--to", dest="last_day", type=date.fromisoformat)
+        parser.add_argument("--route", type=int, action="append")
+        parser.add_argument("--airplane-type", type=int, action="append")
+        parser.add_argument("--bins", type=int, default=20)
+
+    def handle(self, *args, **options):
+        last_day = options["last_day"] or timezone.now().date()
+        first_day = options["first_day"] or last_day - timedelta(days=29)
+        if first_day > last_day:
+            raise CommandError("--from must not be later than --to.")
+        start, end = day_range(first_day, last_day)
+
+        if options["report"] == "flight_times":
+            report = flight_time_report(
+                start, end, route_ids=options["route"], bins=options["bins"]
+            )
+        elif options["report"] == "seat_heatmap":
+            report = seat_heatmap(start, end, airplane_type_ids=options["airplane_type"])
+        else:
+            report = airplane_utilization(start, end)
+
+        self.stdout.write(json.dumps(report, indent=2))
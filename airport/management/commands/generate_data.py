@@ -0,0 +1,406 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from airport.models import (
+    Airport,
+    Airplane,
+    AirplaneType,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport.geo import haversine_km
+from airport.reference import reference_cache
+from airport.route_stats import backfill
+
+AIRPLANE_TYPES = (
+    # name, rows, seats_in_row, relative frequency
+    ("Embraer E190", 25, 4, 3),
+    ("Airbus A320", 30, 6, 6),
+    ("Boeing 737-800", 32, 6, 6),
+    ("Airbus A321neo", 37, 6, 3),
+    ("Boeing 787-9", 42, 9, 2),
+    ("Airbus A380", 60, 10, 1),
+)
+
+SYLLABLES = (
+    "ka", "ro", "li", "an", "ve", "to", "mi", "sa", "del", "bur",
+    "gen", "har", "os", "ber", "lin", "mar", "no", "pra", "vi", "ze",
+)
+
+FIRST_NAMES = (
+    "Anna", "Oleh", "Maria", "Ivan", "Sofia", "Taras", "Olena", "Dmytro",
+    "Iryna", "Andrii", "Kateryna", "Mykola", "Yulia", "Serhii", "Nadia",
+)
+
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko",
+    "Melnyk", "Boyko", "Kovalchuk", "Oliinyk", "Lysenko", "Moroz",
+)
+
+CRUISE_SPEED_KMH = 800
+TAXI_MINUTES = 30
+USER_EMAIL_TEMPLATE = "synthetic-{seed}-{index}@example.com"
+
+
+def _city_name(rng, used):
+    name = "".join(
+        rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))
+    ).capitalize()
+    candidate, suffix = name, 1
+    while candidate in used:
+        suffix += 1
+        candidate = f"{name} {suffix}"
+    used.add(candidate)
+    return candidate
+
+
+def _init_worker():
+    """Prepare a forked or spawned worker process for database access."""
+    django.setup()
+    connections.close_all()
+
+
+def generate_tickets_chunk(chunk_index, flights, user_ids, seed,
+                           load_factor, batch_size):
+    """
+    Sell seats on a chunk of flights.
+
+    ``flights`` is a list of ``(flight_id, rows, seats_in_row)`` tuples.
+    Every chunk has its own seeded RNG, so the result does not depend on
+    how many workers the chunks were spread over.
+    """
+    rng = random.Random(f"{seed}-tickets-{chunk_index}")
+    spread = min(0.1, load_factor, 1 - load_factor)
+    orders = []
+    order_seats = []
+
+    for flight_id, rows, seats_in_row in flights:
+        capacity = rows * seats_in_row
+        flight_load = min(1.0, max(0.0, rng.gauss(load_factor, spread)))
+        places = rng.sample(range(capacity), round(capacity * flight_load))
+
+        while places:
+            size = min(len(places), rng.choice((1, 1, 1, 2, 2, 3, 4)))
+            orders.append(Order(user_id=rng.choice(user_ids)))
+            order_seats.append([
+                (flight_id, place // seats_in_row + 1,
+                 place % seats_in_row + 1)
+                for place in places[:size]
+            ])
+            del places[:size]
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders, batch_size=batch_size)
+        tickets = [
+            Ticket(order_id=order.id, flight_id=flight_id, row=row, seat=seat)
+            for order, seats in zip(orders, order_seats)
+            for flight_id, row, seat in seats
+        ]
+        Ticket.objects.bulk_create(tickets, batch_size=batch_size)
+
+    return len(orders), len(tickets)
+
+
+class Command(BaseCommand):
+    """
+    Django command to fill the database with a seeded synthetic dataset.
+
+    Airports are linked in a hub-and-spoke network, every airplane flies
+    an uninterrupted rotation (it departs from the airport where its
+    previous flight landed, after a turnaround) and seats are sold up to
+    the requested load factor.
+    """
+
+    help = "Generate a realistic, reproducible dataset for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--airports", type=int, default=60)
+        parser.add_argument(
+            "--hub-ratio", type=float, default=0.1,
+            help="Share of airports that act as hubs.",
+        )
+        parser.add_argument("--airplanes", type=int, default=50)
+        parser.add_argument("--crew", type=int, default=300)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument(
+            "--days", type=int, default=30,
+            help="Length of the flight schedule in days.",
+        )
+        parser.add_argument(
+            "--start", type=str, default=None,
+            help="First schedule day, YYYY-MM-DD (default: today).",
+        )
+        parser.add_argument(
+            "--load-factor", type=float, default=0.8,
+            help="Average share of seats sold on every flight.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--chunk-size", type=int, default=200,
+            help="Number of flights whose tickets are generated per task.",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=1,
+            help="Worker processes used to generate orders and tickets.",
+        )
+
+    def handle(self, *args, **options):
+        if options["airports"] < 2:
+            raise CommandError("At least two airports are required.")
+        if not 0 <= options["load_factor"] <= 1:
+            raise CommandError("--load-factor must be between 0 and 1.")
+
+        self.seed = options["seed"]
+        self.batch_size = options["batch_size"]
+        self.rng = random.Random(self.seed)
+
+        if options["start"]:
+            start_day = datetime.strptime(options["start"], "%Y-%m-%d").date()
+        else:
+            start_day = timezone.now().date()
+        start = timezone.make_aware(
+            datetime.combine(start_day, time.min), dt_timezone.utc
+        )
+
+        airports, coordinates = self.create_airports(
+            options["airports"], options["hub_ratio"]
+        )
+        routes = self.create_routes(airports, coordinates)
+        airplanes = self.create_airplanes(options["airplanes"])
+        crew = self.create_crew(options["crew"])
+        flights = self.create_flights(
+            airplanes, routes, crew, start, start + timedelta(days=options["days"])
+        )
+        user_ids = self.create_users(options["users"])
+        orders_count, tickets_count = self.create_tickets(
+            flights,
+            user_ids,
+            options["load_factor"],
+            options["chunk_size"],
+            options["workers"],
+        )
+        # Bulk inserts send no signals, so build the statistics in one go
+        # and tell running servers to reload their reference data.
+        backfill(start_day, start_day + timedelta(days=options["days"]))
+        reference_cache.changed()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {len(airports)} airports, {len(routes)} routes, "
+            f"{len(airplanes)} airplanes, {len(flights)} flights, "
+            f"{orders_count} orders and {tickets_count} tickets."
+        ))
+
+    def create_airports(self, count, hub_ratio):
+        hubs_count = max(1, round(count * hub_ratio))
+        used_names = set()
+        airports = []
+        coordinates = []
+
+        for index in range(count):
+            city = _city_name(self.rng, used_names)
+            kind = "International" if index < hubs_count else "Regional"
+            latitude = round(self.rng.uniform(35, 60), 6)
+            longitude = round(self.rng.uniform(-10, 40), 6)
+            airports.append(Airport(
+                name=f"{city} {kind} Airport",
+                closest_big_city=city,
+                latitude=latitude,
+                longitude=longitude,
+            ))
+            coordinates.append((latitude, longitude))
+
+        Airport.objects.bulk_create(airports, batch_size=self.batch_size)
+        self.hubs_count = hubs_count
+        self.hub_ids = [airport.id for airport in airports[:hubs_count]]
+        return airports, coordinates
+
+    def create_routes(self, airports, coordinates):
+        """
+        Connect hubs with each other and every spoke with a few hubs.
+
+        Spokes pick hubs with probability proportional to the hub's
+        current degree, which gives the heavy-tailed degree distribution
+        seen in real airline networks.
+        """
+        hubs = list(range(self.hubs_count))
+        degree = {hub: 1 for hub in hubs}
+        pairs = set()
+
+        for source in hubs:
+            for destination in hubs:
+                if source != destination:
+                    pairs.add((source, destination))
+
+        for spoke in range(self.hubs_count, len(airports)):
+            links = min(len(hubs), 1 + int(self.rng.expovariate(1.5)))
+            chosen = set()
+            while len(chosen) < links:
+                chosen.add(self.rng.choices(
+                    hubs, weights=[degree[hub] for hub in hubs]
+                )[0])
+            for hub in chosen:
+                degree[hub] += 1
+                pairs.update(((spoke, hub), (hub, spoke)))
+
+        routes = []
+        for source, destination in sorted(pairs):
+            distance = haversine_km(*coordinates[source], *coordinates[destination])
+            routes.append(Route(
+                source=airports[source],
+                destination=airports[destination],
+                distance=max(1, round(distance)),
+            ))
+
+        Route.objects.bulk_create(routes, batch_size=self.batch_size)
+        return routes
+
+    def create_airplanes(self, count):
+        airplane_types = {
+            name: AirplaneType.objects.get_or_create(name=name)[0]
+            for name, *_ in AIRPLANE_TYPES
+        }
+        weights = [frequency for *_, frequency in AIRPLANE_TYPES]
+        airplanes = []
+
+        for index in range(count):
+            name, rows, seats_in_row, _ = self.rng.choices(
+                AIRPLANE_TYPES, weights=weights
+            )[0]
+            airplanes.append(Airplane(
+                name=f"{name} #{index + 1}",
+                rows=rows,
+                seats_in_row=seats_in_row,
+                airplane_type=airplane_types[name],
+            ))
+
+        Airplane.objects.bulk_create(airplanes, batch_size=self.batch_size)
+        return airplanes
+
+    def create_crew(self, count):
+        crew = [
+            Crew(
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+            )
+            for _ in range(count)
+        ]
+        Crew.objects.bulk_create(crew, batch_size=self.batch_size)
+        return crew
+
+    def create_flights(self, airplanes, routes, crew, start, end):
+        """
+        Fly every airplane through the network until ``end``.
+
+        Each airplane owns a fixed crew team, so neither airplanes nor
+        crew members are ever scheduled on overlapping flights.
+        """
+        routes_from = {}
+        for route in routes:
+            routes_from.setdefault(route.source_id, []).append(route)
+
+        team_size = max(1, min(6, len(crew) // max(1, len(airplanes))))
+        flights = []
+        flight_crews = []
+
+        for index, airplane in enumerate(airplanes):
+            team = crew[index * team_size:(index + 1) * team_size]
+            location = self.rng.choice(self.hub_ids)
+            current = start + timedelta(minutes=self.rng.randint(0, 6 * 60))
+
+            while True:
+                route = self.rng.choice(routes_from[location])
+                departure = current + timedelta(
+                    minutes=self.rng.randint(45, 120)
+                )
+                duration = timedelta(
+                    minutes=route.distance / CRUISE_SPEED_KMH * 60
+                    + TAXI_MINUTES
+                )
+                arrival = departure + duration
+                if arrival > end:
+                    break
+
+                flights.append(Flight(
+                    route=route,
+                    airplane=airplane,
+                    departure_time=departure,
+                    arrival_time=arrival,
+                ))
+                flight_crews.append(team)
+                location = route.destination_id
+                current = arrival
+
+        Flight.objects.bulk_create(flights, batch_size=self.batch_size)
+        Flight.crew.through.objects.bulk_create(
+            [
+                Flight.crew.through(flight_id=flight.id, crew_id=member.id)
+                for flight, team in zip(flights, flight_crews)
+                for member in team
+            ],
+            batch_size=self.batch_size,
+        )
+        return flights
+
+    def create_users(self, count):
+        password = make_password("password")
+        user_model = get_user_model()
+        emails = [
+            USER_EMAIL_TEMPLATE.format(seed=self.seed, index=index)
+            for index in range(count)
+        ]
+        user_model.objects.bulk_create(
+            [user_model(email=email, password=password) for email in emails],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        return list(
+            user_model.objects
+            .filter(email__in=emails)
+            .order_by("id")
+            .values_list("id", flat=True)
+        )
+
+    def create_tickets(self, flights, user_ids, load_factor,
+                       chunk_size, workers):
+        if not user_ids:
+            return 0, 0
+
+        rows = [
+            (flight.id, flight.airplane.rows, flight.airplane.seats_in_row)
+            for flight in flights
+        ]
+        chunks = [
+            (index, rows[start:start + chunk_size], user_ids, self.seed,
+             load_factor, self.batch_size)
+            for index, start in enumerate(range(0, len(rows), chunk_size))
+        ]
+
+        if workers <= 1:
+            results = [generate_tickets_chunk(*chunk) for chunk in chunks]
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker
+            ) as executor:
+                futures = [
+                    executor.submit(generate_tickets_chunk, *chunk)
+                    for chunk in chunks
+                ]
+                results = [future.result() for future in futures]
+
+        return (
+            sum(orders for orders, _ in results),
+            sum(tickets for _, tickets in results),
+        )
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.models import FlightSchedule
+from airport.recurring import MATERIALIZATION_DAYS, materialize_schedule
+
+
+class Command(BaseCommand):
+    """Django command to create the flights of recurring schedules."""
+
+    help = "Materialize scheduled flights for the rolling horizon."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=MATERIALIZATION_DAYS,
+            help="Horizon in days from today.",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        until = today + timedelta(days=options["days"])
+        created_total = skipped_total = 0
+
+        schedules = (
+            FlightSchedule.objects
+            .filter(valid_until__gte=today, valid_from__lte=until)
+            .prefetch_related("crew")
+        )
+        for schedule in schedules:
+            created, skipped = materialize_schedule(schedule, until)
+            created_total += created
+            skipped_total += skipped
+            if skipped:
+                self.stdout.write(self.style.WARNING(
+                    f"Schedule {schedule.id}: skipped {skipped} departures "
+                    "with a busy airplane or crew."
+                ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialized {created_total} flights until {until}."
+        ))
@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from airport.sync import TOMBSTONE_RETENTION_DAYS, purge_tombstones
+
+
+class Command(BaseCommand):
+    """Django command to drop deletion records delta sync no longer needs."""
+
+    help = "Delete tombstones older than the sync token retention period."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+        purged = purge_tombstones(cutoff)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Purged {purged} tombstones deleted before {cutoff:%Y-%m-%d}."
+        ))
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ("airport_airport_name_trgm", "name"),
+    ("airport_airport_city_trgm", "closest_big_city"),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Back name and city lookups (including ``icontains``, which compares
+    ``UPPER(column)``) with pg_trgm GIN indexes. Other databases keep
+    relying on the in-memory search index.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for index_name, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON airport_airport "
+            f"USING gin (UPPER({column}) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    for index_name, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0004_airplane_image"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0005_airport_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["route", "departure_time"], name="airport_fli_route_i_baa295_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["route", "arrival_time"], name="airport_fli_route_i_e9d491_idx"),
+        ),
+    ]
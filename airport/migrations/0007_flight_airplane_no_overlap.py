@@ -0,0 +1,94 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:14
+
+from django.db import migrations, models
+
+CONSTRAINT_NAME = "airport_flight_airplane_no_overlap"
+REPORTED_OVERLAPS = 20
+
+
+def overlapping_flights(connection, limit=REPORTED_OVERLAPS):
+    """``(airplane_id, flight_id, other_flight_id)`` of overlapping flights."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT a.airplane_id, a.id, b.id FROM airport_flight a "
+            "JOIN airport_flight b ON b.airplane_id = a.airplane_id "
+            "AND b.id > a.id "
+            "AND b.departure_time < a.arrival_time "
+            "AND a.departure_time < b.arrival_time "
+            "ORDER BY a.airplane_id, a.id, b.id LIMIT %s",
+            [limit],
+        )
+        return cursor.fetchall()
+
+
+def check_no_overlapping_flights(apps, schema_editor):
+    """
+    The constraint cannot be added while one airplane has overlapping
+    flights; list them instead of failing inside ALTER TABLE.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    overlaps = overlapping_flights(schema_editor.connection)
+    if overlaps:
+        pairs = "\n".join(
+            f"  airplane {airplane_id}: flights {flight_id} and {other_id}"
+            for airplane_id, flight_id, other_id in overlaps
+        )
+        raise RuntimeError(
+            "Cannot forbid overlapping flights of one airplane: these "
+            f"flights overlap (at most {REPORTED_OVERLAPS} shown):\n{pairs}\n"
+            "Reschedule them or move them to another airplane, then run "
+            "migrate again."
+        )
+
+
+def add_airplane_exclusion_constraint(apps, schema_editor):
+    """
+    Let PostgreSQL reject overlapping flights of one airplane even when
+    two requests pass validation concurrently. Other databases rely on
+    ``Flight.validate_schedule`` alone.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    schema_editor.execute(
+        f"ALTER TABLE airport_flight ADD CONSTRAINT {CONSTRAINT_NAME} "
+        "EXCLUDE USING gist (airplane_id WITH =, "
+        "tstzrange(departure_time, arrival_time) WITH &&)"
+    )
+
+
+def drop_airplane_exclusion_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        f"ALTER TABLE airport_flight DROP CONSTRAINT IF EXISTS {CONSTRAINT_NAME}"
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0006_flight_board_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(
+                fields=["airplane", "arrival_time"],
+                name="airport_fli_airplan_515d4d_idx",
+            ),
+        ),
+        migrations.RunPython(
+            check_no_overlapping_flights,
+            migrations.RunPython.noop,
+        ),
+        migrations.RunPython(
+            add_airplane_exclusion_constraint,
+            drop_airplane_exclusion_constraint,
+        ),
+    ]
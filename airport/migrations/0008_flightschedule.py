@@ -0,0 +1,53 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0007_flight_airplane_no_overlap"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlightSchedule",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("departure_time", models.TimeField()),
+                ("duration", models.DurationField()),
+                ("weekdays", models.CharField(help_text="ISO weekdays the flight operates on, e.g. 12345 for Mon-Fri.", max_length=7)),
+                ("valid_from", models.DateField()),
+                ("valid_until", models.DateField()),
+                ("materialized_until", models.DateField(blank=True, editable=False, null=True)),
+            ],
+            options={
+                "ordering": ["valid_from", "departure_time"],
+            },
+        ),
+        migrations.AddField(
+            model_name="flightschedule",
+            name="airplane",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="schedules", to="airport.airplane"),
+        ),
+        migrations.AddField(
+            model_name="flightschedule",
+            name="crew",
+            field=models.ManyToManyField(blank=True, to="airport.crew"),
+        ),
+        migrations.AddField(
+            model_name="flightschedule",
+            name="route",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="schedules", to="airport.route"),
+        ),
+        migrations.AddField(
+            model_name="flight",
+            name="schedule",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="flights", to="airport.flightschedule"),
+        ),
+        migrations.AddConstraint(
+            model_name="flight",
+            constraint=models.UniqueConstraint(fields=("schedule", "departure_time"), name="unique_scheduled_departure"),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0008_flightschedule"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedFlight",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("departure_time", models.DateTimeField()),
+                ("arrival_time", models.DateTimeField()),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+                ("airplane", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_flights", to="airport.airplane")),
+            ],
+            options={
+                "ordering": ["-departure_time"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedTicket",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("row", models.IntegerField()),
+                ("seat", models.IntegerField()),
+                ("flight", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="tickets", to="airport.archivedflight")),
+                ("order", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_tickets", to="airport.order")),
+            ],
+            options={
+                "ordering": ["row", "seat"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ArchivedFlightCrew",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("crew", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="airport.crew")),
+                ("flight", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to="airport.archivedflight")),
+            ],
+            options={
+                "unique_together": {("flight", "crew")},
+            },
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="crew",
+            field=models.ManyToManyField(blank=True, through="airport.ArchivedFlightCrew", to="airport.crew"),
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="route",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="archived_flights", to="airport.route"),
+        ),
+        migrations.AddField(
+            model_name="archivedflight",
+            name="schedule",
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="archived_flights", to="airport.flightschedule"),
+        ),
+    ]
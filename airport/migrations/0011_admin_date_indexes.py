@@ -0,0 +1,22 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0010_delta_sync"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="order",
+            name="created_at",
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["departure_time"], name="airport_fli_departu_abe547_idx"),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:35
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0012_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RouteDailyStats",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("flights", models.PositiveIntegerField(default=0)),
+                ("capacity", models.PositiveIntegerField(default=0)),
+                ("tickets_sold", models.PositiveIntegerField(default=0)),
+                ("airplane_type", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="daily_stats", to="airport.airplanetype")),
+                ("route", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="daily_stats", to="airport.route")),
+            ],
+            options={
+                "ordering": ["date", "route"],
+                "indexes": [models.Index(fields=["date"], name="airport_rou_date_791013_idx")],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="routedailystats",
+            constraint=models.UniqueConstraint(fields=("route", "airplane_type", "date"), name="unique_route_daily_stats"),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0013_route_daily_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="airport",
+            name="latitude",
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)]),
+        ),
+        migrations.AddField(
+            model_name="airport",
+            name="longitude",
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)]),
+        ),
+        migrations.AddConstraint(
+            model_name="airport",
+            constraint=models.CheckConstraint(check=models.Q(models.Q(("latitude__isnull", True), ("longitude__isnull", True)), models.Q(("latitude__isnull", False), ("longitude__isnull", False)), _connector="OR"), name="airport_coordinates_both_or_neither"),
+        ),
+    ]
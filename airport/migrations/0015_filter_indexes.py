@@ -0,0 +1,29 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("airport", "0014_airport_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["arrival_time"], name="airport_fli_arrival_a12903_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="flight",
+            index=models.Index(fields=["airplane", "departure_time"], name="airport_fli_airplan_da655c_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="route",
+            index=models.Index(fields=["destination", "source"], name="airport_rou_destina_1f4df6_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="ticket",
+            index=models.Index(fields=["order", "flight"], name="airport_tic_order_i_a650f4_idx"),
+        ),
+    ]
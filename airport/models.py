@@ -1,15 +1,21 @@
 import os
 import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
 
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.conf import settings
 from django.utils.text import slugify
 
+# PostgreSQL exclusion constraint added by migration 0007.
+AIRPLANE_OVERLAP_CONSTRAINT = "airport_flight_airplane_no_overlap"
+
 
 class Crew(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     @property
     def full_name(self):
@@ -21,6 +27,7 @@ class Crew(models.Model):
 
 class AirplaneType(models.Model):
     name = models.CharField(max_length=255, unique=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.name
@@ -39,6 +46,7 @@ class Airplane(models.Model):
     seats_in_row = models.IntegerField()
     airplane_type = models.ForeignKey("AirplaneType", on_delete=models.CASCADE, related_name="airplanes")
     image = models.ImageField(null=True, upload_to=airplane_image_file_path)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["name"]
@@ -54,6 +62,28 @@ class Airplane(models.Model):
 class Airport(models.Model):
     name = models.CharField(max_length=255)
     closest_big_city = models.CharField(max_length=255)
+    latitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)],
+    )
+    longitude = models.FloatField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)],
+    )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                check=(
+                    models.Q(latitude__isnull=True, longitude__isnull=True)
+                    | models.Q(latitude__isnull=False, longitude__isnull=False)
+                ),
+                name="airport_coordinates_both_or_neither",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -63,9 +93,11 @@ class Route(models.Model):
     source = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="routes_from")
     destination = models.ForeignKey(Airport, on_delete=models.CASCADE, related_name="routes_to")
     distance = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("source", "destination")
+        indexes = [models.Index(fields=["destination", "source"])]
 
     def clean(self):
         if self.source == self.destination:
@@ -81,28 +113,176 @@ class Route(models.Model):
         return f"{self.source.name} -> {self.destination.name}"
 
 
+class FlightSchedule(models.Model):
+    """
+    A flight repeated on some weekdays, e.g. route 12 with airplane 4 at
+    08:15 (UTC) Mon-Fri from April to October. Concrete ``Flight`` rows
+    are created from it on demand, see ``airport.recurring``.
+    """
+
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="schedules")
+    airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE, related_name="schedules")
+    departure_time = models.TimeField()
+    duration = models.DurationField()
+    weekdays = models.CharField(
+        max_length=7,
+        help_text="ISO weekdays the flight operates on, e.g. 12345 for Mon-Fri.",
+    )
+    valid_from = models.DateField()
+    valid_until = models.DateField()
+    crew = models.ManyToManyField(Crew, blank=True)
+    materialized_until = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["valid_from", "departure_time"]
+
+    def clean(self):
+        if (
+            not self.weekdays
+            or not set(self.weekdays) <= set("1234567")
+            or len(set(self.weekdays)) != len(self.weekdays)
+        ):
+            raise ValidationError({
+                "weekdays": "Weekdays must be distinct digits from 1 (Monday) to 7 (Sunday)."
+            })
+        if self.valid_until < self.valid_from:
+            raise ValidationError({
+                "valid_until": "Schedule must end on or after its first day."
+            })
+        if self.duration <= timedelta(0):
+            raise ValidationError({"duration": "Duration must be positive."})
+
+    def occurrences(self, first_day, last_day):
+        """Yield ``(day, departure_time, arrival_time)`` between both days."""
+        day = max(first_day, self.valid_from)
+        last_day = min(last_day, self.valid_until)
+
+        while day <= last_day:
+            if str(day.isoweekday()) in self.weekdays:
+                departure_time = datetime.combine(
+                    day, self.departure_time, tzinfo=dt_timezone.utc
+                )
+                yield day, departure_time, departure_time + self.duration
+            day += timedelta(days=1)
+
+    def __str__(self):
+        return f"{self.route} at {self.departure_time} on {self.weekdays}"
+
+
 class Flight(models.Model):
     route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="flights")
     airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE, related_name="flights")
     departure_time = models.DateTimeField()
     arrival_time = models.DateTimeField()
     crew = models.ManyToManyField(Crew, blank=True)
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="flights",
+    )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["-departure_time"]
+        indexes = [
+            models.Index(fields=["departure_time"]),
+            models.Index(fields=["arrival_time"]),
+            models.Index(fields=["route", "departure_time"]),
+            models.Index(fields=["route", "arrival_time"]),
+            models.Index(fields=["airplane", "departure_time"]),
+            models.Index(fields=["airplane", "arrival_time"]),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["schedule", "departure_time"],
+                name="unique_scheduled_departure",
+            ),
+        ]
 
     @property
     def flight_time(self):
         """Returns the flight duration as a timedelta object."""
         return self.arrival_time - self.departure_time
 
+    @staticmethod
+    def validate_schedule(
+        departure_time,
+        arrival_time,
+        airplane,
+        crew,
+        error_to_raise,
+        flight_id=None,
+    ):
+        """
+        Check that the airplane and every crew member are free between
+        departure and arrival; ``flight_id`` is the flight being updated.
+        """
+        if arrival_time <= departure_time:
+            raise error_to_raise(
+                {
+                    "arrival_time": "Arrival time must be later "
+                    "than departure time."
+                }
+            )
+
+        overlapping = Flight.objects.filter(
+            arrival_time__gt=departure_time,
+            departure_time__lt=arrival_time,
+        ).exclude(pk=flight_id)
+
+        busy_flight = (
+            overlapping.filter(airplane=airplane)
+            .values_list("id", flat=True)
+            .first()
+        )
+        if busy_flight:
+            raise error_to_raise(
+                {
+                    "airplane": f"Airplane is already assigned to flight "
+                    f"{busy_flight} at that time."
+                }
+            )
+
+        if crew:
+            Flight.validate_crew(crew, overlapping, error_to_raise)
+
+    @staticmethod
+    def validate_crew(crew, overlapping, error_to_raise):
+        busy_crew = (
+            Flight.crew.through.objects
+            .filter(crew__in=crew, flight__in=overlapping)
+            .values_list("crew_id", "flight_id")
+            .first()
+        )
+        if busy_crew:
+            crew_id, flight_id = busy_crew
+            raise error_to_raise(
+                {
+                    "crew": f"Crew member {crew_id} is already assigned "
+                    f"to flight {flight_id} at that time."
+                }
+            )
+
+    def clean(self):
+        if self.departure_time and self.arrival_time and self.airplane_id:
+            Flight.validate_schedule(
+                self.departure_time,
+                self.arrival_time,
+                self.airplane_id,
+                (),
+                ValidationError,
+                flight_id=self.pk,
+            )
+
     def __str__(self):
         return (f"{self.route.source.name} ({self.departure_time}) -> "
                 f"{self.route.destination.name} ({self.arrival_time})")
 
 
 class Order(models.Model):
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
@@ -169,3 +349,139 @@ class Ticket(models.Model):
     class Meta:
         unique_together = ("flight", "row", "seat")
         ordering = ["row", "seat"]
+        indexes = [models.Index(fields=["order", "flight"])]
+
+
+class RouteDailyStats(models.Model):
+    """
+    Seats flown and sold per route, airplane type and departure day
+    (UTC), kept up to date by ``airport.route_stats``.
+    """
+
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="daily_stats")
+    airplane_type = models.ForeignKey(AirplaneType, on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    flights = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(default=0)
+    tickets_sold = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["date", "route"]
+        indexes = [models.Index(fields=["date"])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["route", "airplane_type", "date"],
+                name="unique_route_daily_stats",
+            ),
+        ]
+
+    @property
+    def load_factor(self):
+        return self.tickets_sold / self.capacity if self.capacity else 0.0
+
+    def __str__(self):
+        return f"{self.route_id} / {self.airplane_type_id} on {self.date}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    The response to a request sent with an ``Idempotency-Key`` header,
+    replayed when the client retries it (see ``airport.idempotency``).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="unique_idempotency_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.user_id})"
+
+
+class Tombstone(models.Model):
+    """
+    Records a deleted row so that delta sync clients (see ``airport.sync``)
+    learn about deletions as well as changes.
+    """
+
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["model", "deleted_at"])]
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted at {self.deleted_at}"
+
+
+class ArchivedFlight(models.Model):
+    """
+    A flight that departed long ago, moved out of ``Flight`` by
+    ``airport.archive`` under its original id.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    route = models.ForeignKey(Route, on_delete=models.CASCADE, related_name="archived_flights")
+    airplane = models.ForeignKey(Airplane, on_delete=models.CASCADE, related_name="archived_flights")
+    departure_time = models.DateTimeField()
+    arrival_time = models.DateTimeField()
+    crew = models.ManyToManyField(Crew, blank=True, through="ArchivedFlightCrew")
+    schedule = models.ForeignKey(
+        FlightSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="archived_flights",
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-departure_time"]
+
+    @property
+    def flight_time(self):
+        return self.arrival_time - self.departure_time
+
+    def __str__(self):
+        return (f"{self.route.source.name} ({self.departure_time}) -> "
+                f"{self.route.destination.name} ({self.arrival_time})")
+
+
+class ArchivedFlightCrew(models.Model):
+    flight = models.ForeignKey(ArchivedFlight, on_delete=models.CASCADE)
+    crew = models.ForeignKey(Crew, on_delete=models.CASCADE)
+
+    class Meta:
+        unique_together = ("flight", "crew")
+
+
+class ArchivedTicket(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    row = models.IntegerField()
+    seat = models.IntegerField()
+    flight = models.ForeignKey(
+        ArchivedFlight, on_delete=models.CASCADE, related_name="tickets"
+    )
+    order = models.ForeignKey(
+        Order, on_delete=models.CASCADE, related_name="archived_tickets"
+    )
+
+    def __str__(self):
+        return (
+            f"{str(self.flight)} (row: {self.row}, seat: {self.seat})"
+        )
+
+    class Meta:
+        ordering = ["row", "seat"]
@@ -0,0 +1,68 @@
+"""
+Read path for a user's order history.
+
+A page of orders is loaded with a fixed number of queries: the orders,
+their live and archived tickets joined with flight and route, and one
+statement per table computing seat availability and crew size for every
+flight on the page. Airports and airplanes come from ``reference_cache``.
+"""
+from django.db.models import Prefetch
+
+from airport.models import Airplane, ArchivedTicket, Ticket
+from airport.queries import flight_stats
+from airport.reference import reference_cache
+
+TICKET_FLIGHT_RELATIONS = ("flight__route",)
+
+
+def order_history_queryset(queryset):
+    return queryset.prefetch_related(
+        Prefetch(
+            "tickets",
+            queryset=Ticket.objects.select_related(*TICKET_FLIGHT_RELATIONS),
+        ),
+        Prefetch(
+            "archived_tickets",
+            queryset=ArchivedTicket.objects.select_related(
+                *TICKET_FLIGHT_RELATIONS
+            ),
+        ),
+    )
+
+
+def _attach(flights, archived):
+    if not flights:
+        return
+
+    stats = flight_stats({flight.id for flight in flights}, archived=archived)
+    for flight in flights:
+        tickets_taken, number_of_crew = stats[flight.id]
+        airplane = reference_cache.get(Airplane, flight.airplane_id)
+        flight.tickets_available = airplane.capacity - tickets_taken
+        flight.number_of_crew = number_of_crew
+
+
+def attach_flight_stats(orders):
+    """
+    Set ``history_tickets`` (live and archived tickets) on every order and
+    ``tickets_available`` / ``number_of_crew`` on the flight of every such
+    ticket; ``orders`` must come from ``order_history_queryset``.
+    """
+    for order in orders:
+        order.history_tickets = sorted(
+            [*order.tickets.all(), *order.archived_tickets.all()],
+            key=lambda ticket: (ticket.row, ticket.seat),
+        )
+
+    _attach(
+        [ticket.flight for order in orders for ticket in order.tickets.all()],
+        archived=False,
+    )
+    _attach(
+        [
+            ticket.flight
+            for order in orders
+            for ticket in order.archived_tickets.all()
+        ],
+        archived=True,
+    )
@@ -0,0 +1,78 @@
+"""Query helpers shared by the read paths of the ``airport`` app."""
+from django.db import connections
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from airport.models import (
+    ArchivedFlight,
+    ArchivedFlightCrew,
+    ArchivedTicket,
+    Flight,
+    Ticket,
+)
+
+
+def count_per_flight(queryset):
+    """Correlated count of ``queryset`` rows belonging to the outer flight."""
+    return Coalesce(
+        Subquery(
+            queryset.filter(flight_id=OuterRef("pk"))
+            .order_by()
+            .values("flight_id")
+            .annotate(count=Count("*"))
+            .values("count"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def flight_stats(flight_ids, archived=False):
+    """
+    Return ``{flight_id: (tickets_taken, number_of_crew)}`` for live
+    flights, or for archived ones when ``archived`` is set.
+    """
+    if archived:
+        flights, tickets, crew_links = (
+            ArchivedFlight.objects, ArchivedTicket.objects, ArchivedFlightCrew.objects
+        )
+    else:
+        flights, tickets, crew_links = (
+            Flight.objects, Ticket.objects, Flight.crew.through.objects
+        )
+
+    return {
+        flight_id: (tickets_taken, number_of_crew)
+        for flight_id, tickets_taken, number_of_crew in (
+            flights.filter(id__in=flight_ids)
+            .order_by()
+            .annotate(
+                tickets_taken=count_per_flight(tickets),
+                number_of_crew=count_per_flight(crew_links),
+            )
+            .values_list("id", "tickets_taken", "number_of_crew")
+        )
+    }
+
+
+def estimated_count(queryset, exact_below=100_000):
+    """
+    Row count of ``queryset`` that avoids ``COUNT(*)`` on big tables.
+
+    An unfiltered queryset on PostgreSQL is counted from the planner's
+    statistics (``pg_class.reltuples``); filtered querysets, other
+    databases and tables estimated below ``exact_below`` rows are counted
+    exactly.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql" and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= exact_below:
+            return row[0]
+
+    return queryset.count()
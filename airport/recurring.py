@@ -0,0 +1,185 @@
+"""
+Lazy materialization of recurring flight schedules.
+
+Concrete ``Flight`` rows exist only for a rolling horizon (see the
+``materialize_flights`` management command) and for departures somebody
+books: a ticket may name a schedule and a departure day instead of a
+flight, and the order creates that flight. Departures further out are
+listed as virtual, unsaved ``Flight`` instances built from the schedule;
+only those up to ``VIRTUAL_DAYS`` ahead can be materialized.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from airport.conflicts import find_schedule_conflicts
+from airport.models import Flight
+
+MATERIALIZATION_DAYS = 14
+VIRTUAL_DAYS = 180
+
+
+def _first_open_day(schedule, day):
+    if schedule.materialized_until and schedule.materialized_until >= day:
+        return schedule.materialized_until + timedelta(days=1)
+    return day
+
+
+def materialize_schedule(schedule, until):
+    """
+    Create the flights of ``schedule`` up to the ``until`` day.
+
+    Departures whose airplane or crew is already busy are skipped.
+    Returns the number of created and skipped departures.
+    """
+    first_day = _first_open_day(schedule, timezone.now().date())
+    until = min(until, schedule.valid_until)
+    if until < first_day:
+        return 0, 0
+
+    crew_ids = [member.id for member in schedule.crew.all()]
+    occurrences = list(schedule.occurrences(first_day, until))
+    booked = set(
+        Flight.objects.filter(
+            schedule=schedule,
+            departure_time__in=[departure for _, departure, _ in occurrences],
+        ).values_list("departure_time", flat=True)
+    )
+    occurrences = [
+        occurrence for occurrence in occurrences
+        if occurrence[1] not in booked
+    ]
+    busy = {
+        conflict["index"]
+        for conflict in find_schedule_conflicts([
+            {
+                "airplane": schedule.airplane_id,
+                "crew": crew_ids,
+                "departure_time": departure_time,
+                "arrival_time": arrival_time,
+            }
+            for _, departure_time, arrival_time in occurrences
+        ])
+        if conflict["flight"] is not None
+    }
+    flights = [
+        Flight(
+            schedule=schedule,
+            route_id=schedule.route_id,
+            airplane_id=schedule.airplane_id,
+            departure_time=departure_time,
+            arrival_time=arrival_time,
+        )
+        for index, (_, departure_time, arrival_time) in enumerate(occurrences)
+        if index not in busy
+    ]
+
+    with transaction.atomic():
+        Flight.objects.bulk_create(flights, ignore_conflicts=True)
+        if crew_ids and flights:
+            flight_ids = Flight.objects.filter(
+                schedule=schedule,
+                departure_time__in=[flight.departure_time for flight in flights],
+            ).values_list("id", flat=True)
+            Flight.crew.through.objects.bulk_create(
+                [
+                    Flight.crew.through(flight_id=flight_id, crew_id=crew_id)
+                    for flight_id in flight_ids
+                    for crew_id in crew_ids
+                ],
+                ignore_conflicts=True,
+            )
+        schedule.materialized_until = until
+        schedule.save(update_fields=["materialized_until"])
+
+    return len(flights), len(busy)
+
+
+def validate_occurrence(schedule, day, error_to_raise, field="date"):
+    """Check that ``day`` is a departure of ``schedule`` that may be materialized."""
+    today = timezone.now().date()
+    if not today <= day <= today + timedelta(days=VIRTUAL_DAYS):
+        raise error_to_raise(
+            {field: f"Only departures in the next {VIRTUAL_DAYS} days can be booked."}
+        )
+    if not any(schedule.occurrences(day, day)):
+        raise error_to_raise(
+            {field: "The schedule does not operate on this day."}
+        )
+
+
+def materialize_occurrence(schedule, day, error_to_raise, field="date"):
+    """Return the flight of ``schedule`` on ``day``, creating it if needed."""
+    validate_occurrence(schedule, day, error_to_raise, field)
+    occurrences = list(schedule.occurrences(day, day))
+    _, departure_time, arrival_time = occurrences[0]
+
+    flight = Flight.objects.filter(
+        schedule=schedule, departure_time=departure_time
+    ).first()
+    if flight:
+        return flight
+
+    crew = list(schedule.crew.all())
+    Flight.validate_schedule(
+        departure_time,
+        arrival_time,
+        schedule.airplane_id,
+        crew,
+        error_to_raise,
+    )
+    with transaction.atomic():
+        flight, created = Flight.objects.get_or_create(
+            schedule=schedule,
+            departure_time=departure_time,
+            defaults={
+                "route_id": schedule.route_id,
+                "airplane_id": schedule.airplane_id,
+                "arrival_time": arrival_time,
+            },
+        )
+        if created:
+            flight.crew.set(crew)
+
+    return flight
+
+
+def virtual_departures(schedules, start, end):
+    """
+    Build unsaved flights for departures of ``schedules`` between
+    ``start`` and ``end`` that have no concrete ``Flight`` yet.
+    """
+    schedules = list(schedules)
+    existing = set(
+        Flight.objects.filter(
+            schedule__in=schedules,
+            departure_time__gte=start,
+            departure_time__lt=end,
+        ).values_list("schedule_id", "departure_time")
+    )
+
+    flights = []
+    for schedule in schedules:
+        first_day = _first_open_day(schedule, start.date())
+        for _, departure_time, arrival_time in schedule.occurrences(
+            first_day, end.date()
+        ):
+            if (
+                not start <= departure_time < end
+                or (schedule.id, departure_time) in existing
+            ):
+                continue
+
+            flight = Flight(
+                schedule=schedule,
+                route=schedule.route,
+                airplane=schedule.airplane,
+                departure_time=departure_time,
+                arrival_time=arrival_time,
+            )
+            flight.tickets_available = schedule.airplane.capacity
+            flight.number_of_crew = len(schedule.crew.all())
+            flights.append(flight)
+
+    return flights
@@ -0,0 +1,151 @@
+"""
+In-process cache of reference rows: airports, airplane types, airplanes
+and crew.
+
+Flight and route responses mostly need names and sizes of these rows,
+which change rarely. ``reference_cache`` keeps them in memory keyed by
+primary key, so ``ReferenceField`` renders them from the foreign key
+column instead of joining their tables into every flight query.
+
+A model's table is loaded in full on first use. Saving or deleting a row
+evicts it at once, and after commit bumps a version stamp shared through
+the Django cache, which reaches other workers and management commands
+only when ``CACHES`` is shared (e.g. Redis); other processes notice the
+stamp within
+``REFERENCE_RECHECK_SECONDS`` and reload. Tables are always loaded from
+the primary: a replica may not have the change behind a new stamp yet,
+and rows read from it would stay cached until the next one. Looking up a row that is not in
+memory, e.g. one created a moment ago, reloads its table, so a page of
+new rows costs one query rather than one per row. Bulk writes send no
+signals: call ``reference_cache.changed()`` after them.
+"""
+import threading
+import time
+
+from django.core.cache import cache
+from drf_spectacular.extensions import OpenApiSerializerFieldExtension
+from rest_framework import serializers
+
+from airport.models import Airplane, AirplaneType, Airport, Crew
+from airport_service.db_router import PRIMARY_DATABASE
+
+VERSION_CACHE_KEY = "reference:version"
+REFERENCE_RECHECK_SECONDS = 1.0
+
+REFERENCE_FIELDS = {
+    Airport: ("id", "name", "closest_big_city"),
+    AirplaneType: ("id", "name"),
+    Airplane: ("id", "name", "rows", "seats_in_row", "image", "airplane_type_id"),
+    Crew: ("id", "first_name", "last_name"),
+}
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._tables = {}
+            self._version = None
+            self._checked_at = 0.0
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self._checked_at < REFERENCE_RECHECK_SECONDS:
+            return
+
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        with self._lock:
+            if version != self._version:
+                self._tables = {}
+                self._version = version
+            self._checked_at = now
+
+    def _load(self, model):
+        rows = model.objects.using(PRIMARY_DATABASE).only(*REFERENCE_FIELDS[model])
+        table = {row.pk: row for row in rows}
+        self._tables[model] = table
+        return table
+
+    def get(self, model, pk):
+        """The row of ``model`` with primary key ``pk``, or None."""
+        self._check_version()
+        table = self._tables.get(model)
+        if table is None or pk not in table:
+            with self._lock:
+                table = self._tables.get(model)
+                if table is None or pk not in table:
+                    table = self._load(model)
+        return table.get(pk)
+
+    def evict(self, model, pk):
+        table = self._tables.get(model)
+        if table is not None:
+            table.pop(pk, None)
+
+    def changed(self, model=None, pk=None):
+        """
+        Publish a committed change: evict the row locally and bump the
+        shared version. Without arguments every table is reloaded.
+        """
+        with self._lock:
+            if model is None:
+                self._tables = {}
+            else:
+                self.evict(model, pk)
+
+            try:
+                version = cache.incr(VERSION_CACHE_KEY)
+            except ValueError:
+                cache.add(VERSION_CACHE_KEY, 1)
+                version = cache.get(VERSION_CACHE_KEY)
+
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+            else:
+                self._version = None
+                self._checked_at = 0.0
+
+
+reference_cache = ReferenceCache()
+
+
+class ReferenceField(serializers.Field):
+    """
+    Read-only field resolving a foreign key through ``reference_cache``.
+
+    ``source`` names the key column, e.g. ``airplane_id``. The field
+    renders ``attribute`` of the cached row with ``child`` (a
+    ``CharField`` by default), or the whole row when ``attribute`` is
+    None and ``child`` is a serializer.
+    """
+
+    def __init__(self, model, attribute=None, child=None, **kwargs):
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+        self.model = model
+        self.attribute = attribute
+        self.child = serializers.CharField() if child is None else child
+
+    def bind(self, field_name, parent):
+        super().bind(field_name, parent)
+        self.child.bind(field_name="", parent=self)
+
+    def get_attribute(self, instance):
+        pk = super().get_attribute(instance)
+        row = None if pk is None else reference_cache.get(self.model, pk)
+        if row is None or self.attribute is None:
+            return row
+        return getattr(row, self.attribute)
+
+    def to_representation(self, value):
+        return self.child.to_representation(value)
+
+
+class ReferenceFieldExtension(OpenApiSerializerFieldExtension):
+    target_class = ReferenceField
+
+    def map_serializer_field(self, auto_schema, direction):
+        return auto_schema._map_serializer_field(self.target.child, direction)
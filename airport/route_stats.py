@@ -0,0 +1,205 @@
+"""
+Daily load factor per route and airplane type.
+
+``RouteDailyStats`` holds one row per route, airplane type and departure
+day (UTC) with the flights, seats and tickets sold, so the stats endpoint
+reads a handful of rows instead of aggregating tickets over the whole
+history. Rows are maintained after commit: an order adds its tickets
+with one ``UPDATE`` per row they count in (``tickets_sold``), a released
+ticket subtracts one; a created, moved or deleted flight recomputes the
+days it touches. Archived flights keep
+counting. ``backfill`` rebuilds any date range from scratch, with one
+``GROUP BY`` per source table, and repairs whatever the incremental path
+missed (bulk inserts, a crash between commit and update).
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+from airport.models import (
+    ArchivedFlight,
+    ArchivedTicket,
+    Flight,
+    RouteDailyStats,
+    Ticket,
+)
+
+BACKFILL_CHUNK_DAYS = 31
+
+
+def day_range(first_day, last_day):
+    """UTC datetimes bounding ``first_day``..``last_day``, both included."""
+    return (
+        datetime.combine(first_day, time(), tzinfo=dt_timezone.utc),
+        datetime.combine(last_day + timedelta(days=1), time(), tzinfo=dt_timezone.utc),
+    )
+
+
+def stats_key(flight):
+    """``(route_id, airplane_type_id, date)`` of the row counting ``flight``."""
+    return (
+        flight.route_id,
+        flight.airplane.airplane_type_id,
+        flight.departure_time.astimezone(dt_timezone.utc).date(),
+    )
+
+
+def stored_stats_keys(flight_ids):
+    """``stats_key`` of each stored flight of ``flight_ids``, by id."""
+    return {
+        flight_id: (
+            route_id,
+            airplane_type_id,
+            departure_time.astimezone(dt_timezone.utc).date(),
+        )
+        for flight_id, route_id, airplane_type_id, departure_time in (
+            Flight.objects.filter(pk__in=flight_ids).values_list(
+                "id", "route_id", "airplane__airplane_type_id", "departure_time"
+            )
+        )
+    }
+
+
+def stored_stats_key(flight_id):
+    """``stats_key`` of a flight as currently stored, or None."""
+    return stored_stats_keys([flight_id]).get(flight_id)
+
+
+def refresh_day(route_id, airplane_type_id, date):
+    """Recompute one row from the live and archived flights."""
+    start, end = day_range(date, date)
+    totals = {"flights": 0, "capacity": 0, "tickets_sold": 0}
+
+    for flight_model, ticket_model in (
+        (Flight, Ticket),
+        (ArchivedFlight, ArchivedTicket),
+    ):
+        flights = flight_model.objects.filter(
+            route_id=route_id,
+            airplane__airplane_type_id=airplane_type_id,
+            departure_time__gte=start,
+            departure_time__lt=end,
+        )
+        aggregate = flights.aggregate(
+            flights=Count("id"),
+            capacity=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+        )
+        totals["flights"] += aggregate["flights"]
+        totals["capacity"] += aggregate["capacity"] or 0
+        totals["tickets_sold"] += ticket_model.objects.filter(flight__in=flights).count()
+
+    if not totals["flights"]:
+        RouteDailyStats.objects.filter(
+            route_id=route_id, airplane_type_id=airplane_type_id, date=date
+        ).delete()
+        return
+
+    RouteDailyStats.objects.update_or_create(
+        route_id=route_id,
+        airplane_type_id=airplane_type_id,
+        date=date,
+        defaults=totals,
+    )
+
+
+def tickets_changed(key, delta):
+    """Add ``delta`` sold tickets to the row of ``key``."""
+    route_id, airplane_type_id, date = key
+    updated = RouteDailyStats.objects.filter(
+        route_id=route_id, airplane_type_id=airplane_type_id, date=date
+    ).update(tickets_sold=F("tickets_sold") + delta)
+    if not updated:
+        refresh_day(*key)
+
+
+def tickets_sold(flight_ids):
+    """
+    Count one sold ticket per item of ``flight_ids`` after commit: one
+    query for their keys, then one ``UPDATE`` per key.
+    """
+    keys = stored_stats_keys(set(flight_ids))
+    sold = Counter(keys[flight_id] for flight_id in flight_ids)
+
+    def count():
+        for key, delta in sold.items():
+            tickets_changed(key, delta)
+
+    transaction.on_commit(count)
+
+
+def _grouped(flight_model, ticket_model, start, end):
+    flights = (
+        flight_model.objects.filter(departure_time__gte=start, departure_time__lt=end)
+        .order_by()
+        .values(
+            "route_id",
+            airplane_type_id=F("airplane__airplane_type_id"),
+            day=TruncDate("departure_time", tzinfo=dt_timezone.utc),
+        )
+        .annotate(
+            flights=Count("id"),
+            capacity=Sum(F("airplane__rows") * F("airplane__seats_in_row")),
+        )
+    )
+    tickets = (
+        ticket_model.objects.filter(
+            flight__departure_time__gte=start, flight__departure_time__lt=end
+        )
+        .order_by()
+        .values(
+            route_id=F("flight__route_id"),
+            airplane_type_id=F("flight__airplane__airplane_type_id"),
+            day=TruncDate("flight__departure_time", tzinfo=dt_timezone.utc),
+        )
+        .annotate(tickets_sold=Count("id"))
+    )
+    return flights, tickets
+
+
+def backfill(first_day, last_day):
+    """Rebuild every row between both days; return the number of rows."""
+    written = 0
+    chunk_start = first_day
+
+    while chunk_start <= last_day:
+        chunk_end = min(chunk_start + timedelta(days=BACKFILL_CHUNK_DAYS - 1), last_day)
+        start, end = day_range(chunk_start, chunk_end)
+        rows = defaultdict(lambda: {"flights": 0, "capacity": 0, "tickets_sold": 0})
+
+        for flight_model, ticket_model in (
+            (Flight, Ticket),
+            (ArchivedFlight, ArchivedTicket),
+        ):
+            flights, tickets = _grouped(flight_model, ticket_model, start, end)
+            for row in flights:
+                totals = rows[(row["route_id"], row["airplane_type_id"], row["day"])]
+                totals["flights"] += row["flights"]
+                totals["capacity"] += row["capacity"]
+            for row in tickets:
+                totals = rows[(row["route_id"], row["airplane_type_id"], row["day"])]
+                totals["tickets_sold"] += row["tickets_sold"]
+
+        with transaction.atomic():
+            RouteDailyStats.objects.filter(
+                date__gte=chunk_start, date__lte=chunk_end
+            ).delete()
+            RouteDailyStats.objects.bulk_create(
+                [
+                    RouteDailyStats(
+                        route_id=route_id,
+                        airplane_type_id=airplane_type_id,
+                        date=date,
+                        **totals,
+                    )
+                    for (route_id, airplane_type_id, date), totals in rows.items()
+                    if totals["flights"]
+                ],
+                batch_size=1000,
+            )
+        written += sum(1 for totals in rows.values() if totals["flights"])
+        chunk_start = chunk_end + timedelta(days=1)
+
+    return written
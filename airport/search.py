@@ -0,0 +1,207 @@
+"""
+In-memory autocomplete index over airport names and cities.
+
+Every word of ``Airport.name`` and ``Airport.closest_big_city`` is kept in
+a sorted word list for prefix lookups and in a trigram inverted index for
+typo-tolerant lookups, so a query only touches words sharing a prefix or
+a trigram with it instead of scanning the whole table.
+
+The index is loaded from the database on first use and then updated one
+airport at a time from model signals, after the transaction commits. A
+version stamp in the Django cache lets other processes notice changes
+they did not make and reload, provided ``CACHES`` is shared between them.
+Reloads read the primary, which already has the change behind the stamp.
+"""
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+
+from airport.models import Airport
+from airport_service.db_router import PRIMARY_DATABASE
+
+VERSION_CACHE_KEY = "airport-search:version"
+MIN_SIMILARITY = 0.3
+
+
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return "".join(
+        char if char.isalnum() else " " for char in text.lower()
+    ).split()
+
+
+def trigrams(word):
+    """Trigrams of ``word`` padded like PostgreSQL's pg_trgm does."""
+    padded = f"  {word} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class AirportSearchIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._loaded = False
+            self._version = None
+            self._airports = {}
+            self._airport_phrases = {}
+            self._airport_words = {}
+            self._word_airports = {}
+            self._words = []
+            self._trigram_words = {}
+            self._word_trigrams = {}
+
+    def _ensure_loaded(self):
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        if self._loaded and version == self._version:
+            return
+
+        self.clear()
+        airports = Airport.objects.using(PRIMARY_DATABASE).only(
+            "id", "name", "closest_big_city"
+        )
+        for airport in airports:
+            self._add(airport)
+        self._loaded = True
+        self._version = version
+
+    def _add(self, airport):
+        name = normalize(airport.name)
+        city = normalize(airport.closest_big_city)
+        words = set(name) | set(city)
+        self._airports[airport.id] = Airport(
+            id=airport.id,
+            name=airport.name,
+            closest_big_city=airport.closest_big_city,
+        )
+        self._airport_phrases[airport.id] = (" ".join(name), " ".join(city))
+        self._airport_words[airport.id] = words
+
+        for word in words:
+            airport_ids = self._word_airports.setdefault(word, set())
+            if not airport_ids:
+                insort(self._words, word)
+                self._word_trigrams[word] = trigrams(word)
+                for trigram in self._word_trigrams[word]:
+                    self._trigram_words.setdefault(trigram, set()).add(word)
+            airport_ids.add(airport.id)
+
+    def _remove(self, airport_id):
+        self._airports.pop(airport_id, None)
+        self._airport_phrases.pop(airport_id, None)
+
+        for word in self._airport_words.pop(airport_id, ()):
+            airport_ids = self._word_airports[word]
+            airport_ids.discard(airport_id)
+            if airport_ids:
+                continue
+
+            del self._word_airports[word]
+            del self._words[bisect_left(self._words, word)]
+            for trigram in self._word_trigrams.pop(word):
+                self._trigram_words[trigram].discard(word)
+                if not self._trigram_words[trigram]:
+                    del self._trigram_words[trigram]
+
+    def _sync_version(self):
+        """Bump the shared version after a local change."""
+        try:
+            version = cache.incr(VERSION_CACHE_KEY)
+        except ValueError:
+            cache.add(VERSION_CACHE_KEY, 1)
+            version = cache.get(VERSION_CACHE_KEY)
+
+        if self._version is not None and version == self._version + 1:
+            self._version = version
+        else:
+            self._loaded = False
+
+    def update(self, airport):
+        with self._lock:
+            if self._loaded:
+                self._remove(airport.id)
+                self._add(airport)
+            self._sync_version()
+
+    def delete(self, airport_id):
+        with self._lock:
+            if self._loaded:
+                self._remove(airport_id)
+            self._sync_version()
+
+    def _word_scores(self, query_word):
+        """Map every indexed word matching ``query_word`` to a score."""
+        scores = {}
+
+        start = bisect_left(self._words, query_word)
+        for word in self._words[start:]:
+            if not word.startswith(query_word):
+                break
+            scores[word] = 1.0 if word == query_word else 0.9
+
+        query_trigrams = trigrams(query_word)
+        shared = {}
+        for trigram in query_trigrams:
+            for word in self._trigram_words.get(trigram, ()):
+                shared[word] = shared.get(word, 0) + 1
+
+        for word, count in shared.items():
+            similarity = count / (
+                len(query_trigrams) + len(self._word_trigrams[word]) - count
+            )
+            if similarity >= MIN_SIMILARITY:
+                scores[word] = max(scores.get(word, 0), similarity * 0.8)
+
+        return scores
+
+    def search(self, query, limit=10):
+        """Return up to ``limit`` airports best matching ``query``."""
+        query_words = normalize(query)
+        if not query_words:
+            return []
+
+        with self._lock:
+            self._ensure_loaded()
+
+            totals = None
+            for query_word in query_words:
+                best = {}
+                for word, score in self._word_scores(query_word).items():
+                    for airport_id in self._word_airports[word]:
+                        best[airport_id] = max(best.get(airport_id, 0), score)
+
+                if totals is None:
+                    totals = best
+                else:
+                    totals = {
+                        airport_id: totals[airport_id] + score
+                        for airport_id, score in best.items()
+                        if airport_id in totals
+                    }
+
+            phrase = " ".join(query_words)
+            ranked = []
+            for airport_id, total in totals.items():
+                score = total / len(query_words)
+                if any(
+                    text.startswith(phrase)
+                    for text in self._airport_phrases[airport_id]
+                ):
+                    score += 0.5
+                ranked.append(
+                    (-score, self._airports[airport_id].name, airport_id)
+                )
+
+            return [
+                self._airports[airport_id]
+                for _, _, airport_id in heapq.nsmallest(limit, ranked)
+            ]
+
+
+airport_index = AirportSearchIndex()
@@ -0,0 +1,73 @@
+"""
+Compact seat-map encodings for flight detail.
+
+``taken_places`` lists every sold seat as ``{"row": r, "seat": s}``, so
+its size grows with the tickets sold. With ``?seat_map=bitmap`` or
+``?seat_map=rle`` flight detail sends ``seat_map`` instead, whose size
+depends on the airplane only. Both number the seats row-major from 0:
+seat ``s`` of row ``r`` (both from 1) is
+``index = (r - 1) * seats_in_row + (s - 1)``.
+
+``bitmap``: ``data`` is base64 of ``ceil(rows * seats_in_row / 8)``
+bytes; seat ``index`` is taken when bit ``7 - index % 8`` of byte
+``index // 8`` is set, i.e. most significant bit first. Decode with::
+
+    taken = base64.b64decode(seat_map["data"])
+    is_taken = taken[index // 8] >> (7 - index % 8) & 1
+
+``rle``: ``data`` holds run lengths that alternate between free and
+taken seats, starting with free (so it may start with 0) and adding
+up to ``rows * seats_in_row``; ``[10, 2, 168]`` means seats 10 and 11
+are taken. Decode with::
+
+    is_taken = []
+    for position, length in enumerate(seat_map["data"]):
+        is_taken += [position % 2 == 1] * length
+"""
+import base64
+
+LIST = "list"
+BITMAP = "bitmap"
+RLE = "rle"
+
+COMPACT_SEAT_MAP_ENCODINGS = (BITMAP, RLE)
+SEAT_MAP_ENCODINGS = (LIST, *COMPACT_SEAT_MAP_ENCODINGS)
+
+
+def seat_indexes(seats_in_row, places):
+    """Row-major indexes of ``(row, seat)`` pairs, sorted."""
+    return sorted((row - 1) * seats_in_row + seat - 1 for row, seat in places)
+
+
+def encode_bitmap(rows, seats_in_row, places):
+    bitmap = bytearray(-(-rows * seats_in_row // 8))
+    for index in seat_indexes(seats_in_row, places):
+        bitmap[index // 8] |= 0x80 >> index % 8
+    return base64.b64encode(bitmap).decode()
+
+
+def encode_rle(rows, seats_in_row, places):
+    runs, position = [], 0
+    for index in seat_indexes(seats_in_row, places):
+        if runs and index == position and len(runs) % 2 == 0:
+            runs[-1] += 1
+        else:
+            runs += [index - position, 1]
+        position = index + 1
+    free = rows * seats_in_row - position
+    if free or not runs:
+        runs.append(free)
+    return runs
+
+
+ENCODERS = {BITMAP: encode_bitmap, RLE: encode_rle}
+
+
+def encode_seat_map(encoding, rows, seats_in_row, places):
+    """``seat_map`` of a flight in ``encoding``, ``places`` being its taken seats."""
+    return {
+        "encoding": encoding,
+        "rows": rows,
+        "seats_in_row": seats_in_row,
+        "data": ENCODERS[encoding](rows, seats_in_row, places),
+    }
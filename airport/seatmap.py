@@ -0,0 +1,212 @@
+"""
+Live seat-map changes.
+
+The booking path publishes ``booked``, ``released`` and ``held`` events to
+``seat_map_broadcaster``; every subscriber (an open SSE stream, see
+``airport.streams``) gets them through its own bounded buffer. A watcher
+that falls behind by more than ``SEAT_MAP_BUFFER_SIZE`` events is told to
+reload the snapshot instead of slowing the publisher down.
+
+Seat holds keep a seat for one user for ``SEAT_HOLD_SECONDS`` while they
+fill in the order. They live in the Django cache: one key per seat, which
+is authoritative, one best-effort list per flight for snapshots and one
+per user, which caps a user at ``MAX_SEAT_HOLDS_PER_USER`` held seats.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+
+from django.core.cache import cache
+
+from airport.models import Flight, Ticket
+
+SEAT_MAP_BUFFER_SIZE = 256
+SEAT_HOLD_SECONDS = 300
+MAX_SEAT_HOLDS_PER_USER = 10
+
+BOOKED = "booked"
+RELEASED = "released"
+HELD = "held"
+
+
+class Subscription:
+    """Events of one flight for one watcher, consumed on its event loop."""
+
+    def __init__(self, flight_id, loop, buffer_size):
+        self.flight_id = flight_id
+        self._loop = loop
+        self._buffer_size = buffer_size
+        self._events = deque()
+        self._overflowed = False
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+
+    def push(self, event):
+        """Queue ``event``; safe to call from any thread."""
+        with self._lock:
+            if len(self._events) >= self._buffer_size:
+                self._events.clear()
+                self._overflowed = True
+            else:
+                self._events.append(event)
+
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The watcher's event loop is already closed.
+            pass
+
+    async def next_events(self, timeout):
+        """
+        Wait up to ``timeout`` seconds and return ``(events, overflowed)``.
+
+        ``overflowed`` means events were dropped and the watcher should
+        start again from a snapshot.
+        """
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return [], False
+
+        self._wakeup.clear()
+        with self._lock:
+            events = list(self._events)
+            overflowed = self._overflowed
+            self._events.clear()
+            self._overflowed = False
+        return events, overflowed
+
+
+class SeatMapBroadcaster:
+    def __init__(self, buffer_size=SEAT_MAP_BUFFER_SIZE):
+        self._buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+
+    def subscribe(self, flight_id):
+        """Subscribe the running event loop to changes of ``flight_id``."""
+        subscription = Subscription(
+            flight_id, asyncio.get_running_loop(), self._buffer_size
+        )
+        with self._lock:
+            self._subscriptions.setdefault(flight_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.flight_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self._subscriptions.pop(subscription.flight_id, None)
+
+    def subscriber_count(self, flight_id):
+        with self._lock:
+            return len(self._subscriptions.get(flight_id, ()))
+
+    def publish(self, flight_id, event_type, row, seat):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(flight_id, ()))
+
+        event = {"type": event_type, "row": row, "seat": seat}
+        for subscription in subscriptions:
+            subscription.push(event)
+
+
+seat_map_broadcaster = SeatMapBroadcaster()
+
+
+def _hold_key(flight_id, row, seat):
+    return f"seat-hold:{flight_id}:{row}:{seat}"
+
+
+def _flight_holds_key(flight_id):
+    return f"seat-holds:{flight_id}"
+
+
+def _user_holds_key(user_id):
+    return f"seat-holds-user:{user_id}"
+
+
+def _active_holds(holds):
+    now = time.time()
+    return {place: expires_at for place, expires_at in holds.items() if expires_at > now}
+
+
+def user_holds(user_id):
+    """The ``(flight_id, row, seat)`` places ``user_id`` holds."""
+    return set(_active_holds(cache.get(_user_holds_key(user_id), {})))
+
+
+def hold_seat(flight_id, row, seat, user_id):
+    """Hold a seat for ``user_id``; return False if someone else holds it."""
+    key = _hold_key(flight_id, row, seat)
+    if not cache.add(key, user_id, SEAT_HOLD_SECONDS):
+        if cache.get(key) != user_id:
+            return False
+        cache.set(key, user_id, SEAT_HOLD_SECONDS)
+
+    holds = cache.get(_flight_holds_key(flight_id), {})
+    holds[(row, seat)] = time.time() + SEAT_HOLD_SECONDS
+    cache.set(_flight_holds_key(flight_id), holds, SEAT_HOLD_SECONDS)
+
+    holds = _active_holds(cache.get(_user_holds_key(user_id), {}))
+    holds[(flight_id, row, seat)] = time.time() + SEAT_HOLD_SECONDS
+    cache.set(_user_holds_key(user_id), holds, SEAT_HOLD_SECONDS)
+
+    seat_map_broadcaster.publish(flight_id, HELD, row, seat)
+    return True
+
+
+def seat_holder(flight_id, row, seat):
+    return cache.get(_hold_key(flight_id, row, seat))
+
+
+def release_hold(flight_id, row, seat):
+    key = _hold_key(flight_id, row, seat)
+    user_id = cache.get(key)
+    cache.delete(key)
+    if user_id is not None:
+        holds = _active_holds(cache.get(_user_holds_key(user_id), {}))
+        holds.pop((flight_id, row, seat), None)
+        cache.set(_user_holds_key(user_id), holds, SEAT_HOLD_SECONDS)
+
+
+def held_places(flight_id):
+    now = time.time()
+    return [
+        {"row": row, "seat": seat}
+        for (row, seat), expires_at in sorted(
+            cache.get(_flight_holds_key(flight_id), {}).items()
+        )
+        if expires_at > now
+    ]
+
+
+def seat_map_snapshot(flight_id):
+    """Return the full seat map of a flight, or None if it does not exist."""
+    airplane = (
+        Flight.objects.filter(id=flight_id)
+        .values("airplane__rows", "airplane__seats_in_row")
+        .first()
+    )
+    if airplane is None:
+        return None
+
+    taken_places = [
+        {"row": row, "seat": seat}
+        for row, seat in Ticket.objects.filter(flight_id=flight_id)
+        .order_by("row", "seat")
+        .values_list("row", "seat")
+    ]
+    taken = {(place["row"], place["seat"]) for place in taken_places}
+    return {
+        "flight": flight_id,
+        "rows": airplane["airplane__rows"],
+        "seats_in_row": airplane["airplane__seats_in_row"],
+        "taken_places": taken_places,
+        "held_places": [
+            place for place in held_places(flight_id)
+            if (place["row"], place["seat"]) not in taken
+        ],
+    }
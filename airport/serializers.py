@@ -1,8 +1,15 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
+from airport import route_stats
+from airport.batch import BATCH_MAX_REQUESTS
+from airport.geo import route_distance
 from airport.models import (
+    AIRPLANE_OVERLAP_CONSTRAINT,
     Airport,
     Airplane,
     AirplaneType,
@@ -10,24 +17,40 @@ from airport.models import (
     Ticket,
     Order,
     Flight,
-    Route
+    FlightSchedule,
+    Route,
+    RouteDailyStats,
 )
+from airport.queries import count_per_flight
+from airport.recurring import materialize_occurrence, validate_occurrence
+from airport.reference import ReferenceField, reference_cache
+from airport.seat_encoding import COMPACT_SEAT_MAP_ENCODINGS, encode_seat_map
+from airport.seatmap import MAX_SEAT_HOLDS_PER_USER, seat_holder, user_holds
+from airport.sparse import SparseFieldsSerializerMixin
+from airport.sync import touch_flights
+from airport_service.sqlite import immediate_atomic
 
 
-class CrewSerializer(serializers.ModelSerializer):
+class CrewSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Crew
         fields = ("id", "first_name", "last_name", "full_name")
 
+    def to_representation(self, instance):
+        # Nested crew is prefetched as bare ids, see FlightDetailSerializer.
+        if "first_name" in instance.get_deferred_fields():
+            instance = reference_cache.get(Crew, instance.pk) or instance
+        return super().to_representation(instance)
 
-class AirplaneTypeSerializer(serializers.ModelSerializer):
+
+class AirplaneTypeSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = AirplaneType
         fields = ("id", "name")
 
 
-class AirplaneReadSerializer(serializers.ModelSerializer):
-    airplane_type = serializers.CharField(source="airplane_type.name", read_only=True)
+class AirplaneReadSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
+    airplane_type = ReferenceField(AirplaneType, "name", source="airplane_type_id")
 
     class Meta:
         model = Airplane
@@ -46,48 +69,135 @@ class AirplaneImageSerializer(serializers.ModelSerializer):
         fields = ("id", "image")
 
 
-class AirportSerializer(serializers.ModelSerializer):
+class AirportSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     routes_to = serializers.SerializerMethodField()
 
     class Meta:
         model = Airport
-        fields = ("id", "name", "closest_big_city", "routes_to")
+        fields = ("id", "name", "closest_big_city", "latitude", "longitude", "routes_to")
+        prefetch_related = {
+            "routes_to": (
+                Prefetch(
+                    "routes_from",
+                    queryset=Route.objects.select_related("destination"),
+                ),
+            ),
+        }
 
     def get_routes_to(self, obj):
         routes = obj.routes_from.all()
         return [route.destination.name for route in routes]
 
+    def validate(self, attrs):
+        if (attrs.get("latitude") is None) != (attrs.get("longitude") is None):
+            raise ValidationError(
+                "Latitude and longitude must be given together."
+            )
+        return attrs
+
+
+class AirportSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Airport
+        fields = ("id", "name", "closest_big_city")
+
+
+class AirportNearestSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    closest_big_city = serializers.CharField()
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    distance_km = serializers.FloatField()
+
 
 class RouteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Route
         fields = ("id", "source", "destination", "distance")
+        extra_kwargs = {
+            "distance": {
+                "required": False,
+                "help_text": "Computed when both airports have coordinates.",
+            },
+        }
 
     def validate(self, attrs):
+        distance = route_distance(attrs["source"], attrs["destination"])
+        if distance is not None:
+            attrs["distance"] = distance
+        elif "distance" not in attrs:
+            raise ValidationError({
+                "distance": "Required unless both airports have coordinates."
+            })
+
         route = Route(**attrs)
         route.clean()
         return attrs
 
 
-class RouteReadSerializer(RouteSerializer):
-    source = serializers.CharField(source="source.name", read_only=True)
-    destination = serializers.CharField(source="destination.name", read_only=True)
+class RouteReadSerializer(SparseFieldsSerializerMixin, RouteSerializer):
+    source = ReferenceField(Airport, "name", source="source_id")
+    destination = ReferenceField(Airport, "name", source="destination_id")
 
 
 class TicketSerializer(serializers.ModelSerializer):
+    """
+    A ticket on ``flight``, or on the departure of ``schedule`` on
+    ``departure_date``, whose flight the order creates if needed.
+    """
+
+    schedule = serializers.PrimaryKeyRelatedField(
+        queryset=FlightSchedule.objects.select_related("airplane"),
+        write_only=True,
+        required=False,
+    )
+    departure_date = serializers.DateField(write_only=True, required=False)
+
     def validate(self, attrs):
         data = super(TicketSerializer, self).validate(attrs=attrs)
+        flight = attrs.get("flight")
+        if flight is None:
+            schedule = attrs.get("schedule")
+            if schedule is None or "departure_date" not in attrs:
+                raise ValidationError(
+                    {"flight": "Give a flight, or a schedule and a departure_date."}
+                )
+            validate_occurrence(
+                schedule, attrs["departure_date"], ValidationError, "departure_date"
+            )
+            airplane = schedule.airplane
+        else:
+            airplane = flight.airplane
+
         Ticket.validate_ticket(
             attrs["row"],
             attrs["seat"],
-            attrs["flight"].airplane,
+            airplane,
             ValidationError
         )
+
+        if flight is not None:
+            self.validate_seat_is_free(flight, attrs["row"], attrs["seat"])
         return data
 
+    def validate_seat_is_free(self, flight, row, seat):
+        if flight.tickets.filter(row=row, seat=seat).exists():
+            raise ValidationError({"seat": "This seat is already taken."})
+
+        request = self.context.get("request")
+        holder = seat_holder(flight.id, row, seat)
+        if holder is not None and (request is None or holder != request.user.id):
+            raise ValidationError(
+                {"seat": "This seat is held by another passenger."}
+            )
+
     class Meta:
         model = Ticket
-        fields = ("id", "row", "seat", "flight")
+        fields = ("id", "row", "seat", "flight", "schedule", "departure_date")
+        extra_kwargs = {"flight": {"required": False}}
+        # The flight may not exist yet, so the seat is checked in validate.
+        validators = []
 
 
 class TicketSeatsSerializer(TicketSerializer):
@@ -96,28 +206,229 @@ class TicketSeatsSerializer(TicketSerializer):
         fields = ("row", "seat")
 
 
+# Names come from ``reference_cache``, see ``CrewSerializer``.
+CREW_IDS = Prefetch("crew", queryset=Crew.objects.only("id"))
+
+
 class FlightSerializer(serializers.ModelSerializer):
     class Meta:
         model = Flight
         fields = ("id", "route", "airplane", "departure_time", "arrival_time", "flight_time", "crew")
 
+    def validate(self, attrs):
+        data = super(FlightSerializer, self).validate(attrs=attrs)
+
+        def current(name):
+            if name in attrs:
+                return attrs[name]
+            return getattr(self.instance, name)
+
+        if "crew" in attrs:
+            crew = attrs["crew"]
+        elif self.instance:
+            crew = self.instance.crew.all()
+        else:
+            crew = []
+
+        Flight.validate_schedule(
+            current("departure_time"),
+            current("arrival_time"),
+            current("airplane"),
+            crew,
+            ValidationError,
+            flight_id=self.instance.pk if self.instance else None,
+        )
+        return data
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super(FlightSerializer, self).save(**kwargs)
+        except IntegrityError as error:
+            if AIRPLANE_OVERLAP_CONSTRAINT not in str(error):
+                raise
+            raise ValidationError(
+                {"airplane": "Airplane is already assigned to another flight at that time."}
+            )
+
 
-class FlightListSerializer(FlightSerializer):
+class FlightScheduleSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FlightSchedule
+        fields = (
+            "id",
+            "route",
+            "airplane",
+            "departure_time",
+            "duration",
+            "weekdays",
+            "valid_from",
+            "valid_until",
+            "crew",
+            "materialized_until",
+        )
+
+    def validate(self, attrs):
+        data = super(FlightScheduleSerializer, self).validate(attrs=attrs)
+        schedule = FlightSchedule(
+            **{key: value for key, value in attrs.items() if key != "crew"}
+        )
+        schedule.clean()
+        return data
+
+
+class FlightScheduleOccurrenceSerializer(serializers.Serializer):
+    date = serializers.DateField()
+
+
+class SeatHoldSerializer(serializers.Serializer):
+    row = serializers.IntegerField()
+    seat = serializers.IntegerField()
+
+    def validate(self, attrs):
+        flight = self.context["flight"]
+        if flight.departure_time <= timezone.now():
+            raise ValidationError({"flight": "This flight has already departed."})
+        Ticket.validate_ticket(
+            attrs["row"], attrs["seat"], flight.airplane, ValidationError
+        )
+        if flight.tickets.filter(row=attrs["row"], seat=attrs["seat"]).exists():
+            raise ValidationError({"seat": "This seat is already taken."})
+
+        holds = user_holds(self.context["request"].user.id)
+        place = (flight.id, attrs["row"], attrs["seat"])
+        if place not in holds and len(holds) >= MAX_SEAT_HOLDS_PER_USER:
+            raise ValidationError(
+                {"seat": f"You cannot hold more than {MAX_SEAT_HOLDS_PER_USER} seats."}
+            )
+        return attrs
+
+
+class ProposedFlightSerializer(serializers.Serializer):
+    flight = serializers.IntegerField(required=False)
+    airplane = serializers.IntegerField()
+    crew = serializers.ListField(child=serializers.IntegerField(), required=False)
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+
+    def validate(self, attrs):
+        if attrs["arrival_time"] <= attrs["departure_time"]:
+            raise ValidationError(
+                {"arrival_time": "Arrival time must be later than departure time."}
+            )
+        return attrs
+
+
+class ScheduleValidationSerializer(serializers.Serializer):
+    flights = ProposedFlightSerializer(many=True, allow_empty=False)
+
+
+class ScheduleConflictSerializer(serializers.Serializer):
+    index = serializers.IntegerField()
+    resource = serializers.ChoiceField(choices=("airplane", "crew"))
+    resource_id = serializers.IntegerField()
+    flight = serializers.IntegerField(allow_null=True)
+    proposal = serializers.IntegerField(allow_null=True)
+
+
+class ScheduleValidationResultSerializer(serializers.Serializer):
+    valid = serializers.BooleanField()
+    conflicts = ScheduleConflictSerializer(many=True)
+
+
+class RouteDailyStatsSerializer(serializers.ModelSerializer):
+    load_factor = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = RouteDailyStats
+        fields = (
+            "route",
+            "airplane_type",
+            "date",
+            "flights",
+            "capacity",
+            "tickets_sold",
+            "load_factor",
+        )
+
+
+class RouteFlightTimesSerializer(serializers.Serializer):
+    route = serializers.IntegerField()
+    flights = serializers.IntegerField()
+    mean_minutes = serializers.FloatField()
+    p50_minutes = serializers.FloatField()
+    p90_minutes = serializers.FloatField()
+    p99_minutes = serializers.FloatField()
+
+
+class HistogramSerializer(serializers.Serializer):
+    edges = serializers.ListField(child=serializers.FloatField())
+    counts = serializers.ListField(child=serializers.IntegerField())
+
+
+class FlightTimeReportSerializer(serializers.Serializer):
+    routes = RouteFlightTimesSerializer(many=True)
+    histogram = HistogramSerializer()
+
+
+class SeatHeatmapSerializer(serializers.Serializer):
+    rows = serializers.IntegerField()
+    seats_in_row = serializers.IntegerField()
+    flights = serializers.IntegerField()
+    sold = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField())
+    )
+    occupancy = serializers.ListField(
+        child=serializers.ListField(child=serializers.FloatField())
+    )
+
+
+class AirplaneUtilizationSerializer(serializers.Serializer):
+    airplane = serializers.IntegerField()
+    flights = serializers.IntegerField()
+    hours = serializers.FloatField()
+    utilization = serializers.FloatField()
+    seats = serializers.IntegerField()
+    tickets_sold = serializers.IntegerField()
+    load_factor = serializers.FloatField()
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    requests = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=BATCH_MAX_REQUESTS,
+        help_text="GET paths relative to /api/airport/, e.g. flight/12/ or route/?source=3",
+    )
+
+
+class BatchResponseItemSerializer(serializers.Serializer):
+    path = serializers.CharField()
+    status = serializers.IntegerField()
+    body = serializers.JSONField()
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    responses = BatchResponseItemSerializer(many=True)
+
+
+class FlightListSerializer(SparseFieldsSerializerMixin, FlightSerializer):
     route = RouteReadSerializer(many=False, read_only=True)
-    airplane_name = serializers.CharField(
-        source="airplane.name", read_only=True
+    airplane_name = ReferenceField(Airplane, "name", source="airplane_id")
+    airplane_capacity = ReferenceField(
+        Airplane, "capacity", child=serializers.IntegerField(), source="airplane_id"
     )
-    airplane_capacity = serializers.IntegerField(
-        source="airplane.capacity", read_only=True
+    airplane_image = ReferenceField(
+        Airplane, "image", child=serializers.ImageField(), source="airplane_id"
     )
-    airplane_image = serializers.ImageField(source="airplane.image", read_only=True)
-    tickets_available = serializers.IntegerField(read_only=True)
+    tickets_available = serializers.SerializerMethodField()
     number_of_crew = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Flight
         fields = (
             "id",
+            "schedule",
             "route",
             "departure_time",
             "arrival_time",
@@ -127,12 +438,46 @@ class FlightListSerializer(FlightSerializer):
             "tickets_available",
             "number_of_crew"
         )
+        expandable_fields = {
+            "crew": (CrewSerializer, {"many": True, "read_only": True}),
+        }
+        select_related = {"route": ("route",)}
+        prefetch_related = {"crew": (CREW_IDS,)}
+        annotations = {
+            "tickets_available": {
+                "tickets_taken": count_per_flight(Ticket.objects.all()),
+            },
+            "number_of_crew": {
+                "number_of_crew": count_per_flight(Flight.crew.through.objects.all()),
+            },
+        }
+
+    def get_tickets_available(self, flight) -> int:
+        # Order history and virtual flights set ``tickets_available``.
+        if hasattr(flight, "tickets_taken"):
+            capacity = reference_cache.get(Airplane, flight.airplane_id).capacity
+            return capacity - flight.tickets_taken
+        return flight.tickets_available
+
+
+class SeatMapSerializer(serializers.Serializer):
+    encoding = serializers.ChoiceField(choices=COMPACT_SEAT_MAP_ENCODINGS)
+    rows = serializers.IntegerField()
+    seats_in_row = serializers.IntegerField()
+    data = serializers.JSONField(
+        help_text=(
+            "bitmap: base64, seat (r, s) is taken when bit "
+            "7 - i % 8 of byte i // 8 is set, i = (r - 1) * seats_in_row + s - 1. "
+            "rle: run lengths of free and taken seats in that order, "
+            "starting with free."
+        )
+    )
 
 
-class FlightDetailSerializer(serializers.ModelSerializer):
+class FlightDetailSerializer(SparseFieldsSerializerMixin, serializers.ModelSerializer):
     route = RouteReadSerializer(many=False, read_only=True)
     flight_time = serializers.CharField(read_only=True)
-    airplane = AirplaneReadSerializer(many=False, read_only=True)
+    airplane = ReferenceField(Airplane, child=AirplaneReadSerializer(), source="airplane_id")
     taken_places = TicketSeatsSerializer(source="tickets", many=True, read_only=True)
     crew = CrewSerializer(many=True, read_only=True)
 
@@ -148,6 +493,47 @@ class FlightDetailSerializer(serializers.ModelSerializer):
             "taken_places",
             "crew"
         )
+        select_related = {"route": ("route",)}
+        prefetch_related = {"taken_places": ("tickets",), "crew": (CREW_IDS,)}
+
+
+class FlightSeatMapDetailSerializer(FlightDetailSerializer):
+    """Flight detail with the taken seats as ``seat_map``, see ``airport.seat_encoding``."""
+
+    seat_map = serializers.SerializerMethodField()
+
+    class Meta(FlightDetailSerializer.Meta):
+        fields = tuple(
+            "seat_map" if name == "taken_places" else name
+            for name in FlightDetailSerializer.Meta.fields
+        )
+        prefetch_related = {"crew": (CREW_IDS,)}
+
+    @extend_schema_field(SeatMapSerializer)
+    def get_seat_map(self, flight):
+        airplane = reference_cache.get(Airplane, flight.airplane_id)
+        return encode_seat_map(
+            self.context["seat_map"],
+            airplane.rows,
+            airplane.seats_in_row,
+            flight.tickets.values_list("row", "seat"),
+        )
+
+
+class AirportBoardFlightSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    departure_time = serializers.DateTimeField()
+    arrival_time = serializers.DateTimeField()
+    source = serializers.CharField()
+    destination = serializers.CharField()
+    airplane_name = serializers.CharField()
+    airplane_capacity = serializers.IntegerField()
+    tickets_available = serializers.IntegerField()
+
+
+class AirportBoardSerializer(serializers.Serializer):
+    departures = AirportBoardFlightSerializer(many=True)
+    arrivals = AirportBoardFlightSerializer(many=True)
 
 
 class TicketListSerializer(TicketSerializer):
@@ -162,13 +548,25 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = ("id", "tickets", "created_at")
 
     def create(self, validated_data):
-        with transaction.atomic():
+        with immediate_atomic():
             tickets_data = validated_data.pop("tickets")
             order = Order.objects.create(**validated_data)
             for ticket_data in tickets_data:
+                schedule = ticket_data.pop("schedule", None)
+                departure_date = ticket_data.pop("departure_date", None)
+                if ticket_data.get("flight") is None:
+                    ticket_data["flight"] = materialize_occurrence(
+                        schedule, departure_date, ValidationError, "departure_date"
+                    )
+                    self.fields["tickets"].child.validate_seat_is_free(
+                        ticket_data["flight"], ticket_data["row"], ticket_data["seat"]
+                    )
                 Ticket.objects.create(order=order, **ticket_data)
+            flight_ids = [ticket_data["flight"].id for ticket_data in tickets_data]
+            route_stats.tickets_sold(flight_ids)
+            touch_flights(flight_ids)
             return order
 
 
 class OrderListSerializer(OrderSerializer):
-    tickets = TicketListSerializer(many=True, read_only=True)
+    tickets = TicketListSerializer(source="history_tickets", many=True, read_only=True)
@@ -0,0 +1,241 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from airport.board import airport_board
+from airport.models import (
+    Airplane,
+    AirplaneType,
+    Airport,
+    Crew,
+    Flight,
+    Order,
+    Route,
+    Ticket,
+)
+from airport import route_stats
+from airport.reference import reference_cache
+from airport.geo import airport_geo_index, update_airport_route_distances
+from airport.search import airport_index
+from airport.sync import record_deletion, touch_flights
+from airport.seatmap import (
+    BOOKED,
+    RELEASED,
+    release_hold,
+    seat_map_broadcaster,
+)
+
+
+@receiver(post_save, sender=Airport)
+def update_airport_search_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: airport_index.update(instance))
+
+
+@receiver(post_delete, sender=Airport)
+def delete_from_airport_search_index(sender, instance, **kwargs):
+    airport_id = instance.id
+    transaction.on_commit(lambda: airport_index.delete(airport_id))
+
+
+@receiver(post_save, sender=Airport)
+def update_airport_geo_index(sender, instance, created, **kwargs):
+    transaction.on_commit(lambda: airport_geo_index.update(instance))
+    if not created and instance.latitude is not None:
+        airport_id = instance.id
+        transaction.on_commit(lambda: update_airport_route_distances(airport_id))
+
+
+@receiver(post_delete, sender=Airport)
+def delete_from_airport_geo_index(sender, instance, **kwargs):
+    airport_id = instance.id
+    transaction.on_commit(lambda: airport_geo_index.delete(airport_id))
+
+
+@receiver(post_save, sender=AirplaneType)
+@receiver(post_save, sender=Airplane)
+@receiver(post_save, sender=Airport)
+@receiver(post_save, sender=Crew)
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Crew)
+def update_reference_cache(sender, instance, **kwargs):
+    pk = instance.pk
+    reference_cache.evict(sender, pk)
+    transaction.on_commit(lambda: reference_cache.changed(sender, pk))
+
+
+@receiver(post_save, sender=Flight)
+def update_airport_boards(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: airport_board.flight_changed(flight_id))
+
+
+@receiver(post_delete, sender=Flight)
+def delete_from_airport_boards(sender, instance, **kwargs):
+    flight_id = instance.id
+    transaction.on_commit(lambda: airport_board.flight_deleted(flight_id))
+
+
+@receiver(post_save, sender=Ticket)
+def book_seat_on_airport_boards(sender, instance, created, **kwargs):
+    if created:
+        flight_id = instance.flight_id
+        transaction.on_commit(
+            lambda: airport_board.tickets_changed(flight_id, -1)
+        )
+
+
+@receiver(post_delete, sender=Ticket)
+def release_seat_on_airport_boards(sender, instance, **kwargs):
+    flight_id = instance.flight_id
+    transaction.on_commit(lambda: airport_board.tickets_changed(flight_id, 1))
+
+
+@receiver(post_save, sender=Ticket)
+def publish_booked_seat(sender, instance, created, **kwargs):
+    if created:
+        flight_id, row, seat = instance.flight_id, instance.row, instance.seat
+
+        def publish():
+            release_hold(flight_id, row, seat)
+            seat_map_broadcaster.publish(flight_id, BOOKED, row, seat)
+
+        transaction.on_commit(publish)
+
+
+@receiver(post_delete, sender=Ticket)
+def publish_released_seat(sender, instance, **kwargs):
+    flight_id, row, seat = instance.flight_id, instance.row, instance.seat
+    transaction.on_commit(
+        lambda: seat_map_broadcaster.publish(flight_id, RELEASED, row, seat)
+    )
+
+
+@receiver(pre_save, sender=Flight)
+def remember_route_stats_key(sender, instance, **kwargs):
+    instance._route_stats_key = (
+        route_stats.stored_stats_key(instance.pk) if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Flight)
+def refresh_route_stats_of_flight(sender, instance, **kwargs):
+    keys = {route_stats.stats_key(instance), instance._route_stats_key} - {None}
+
+    def refresh():
+        for key in keys:
+            route_stats.refresh_day(*key)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_delete, sender=Flight)
+def refresh_route_stats_of_deleted_flight(sender, instance, **kwargs):
+    key = route_stats.stats_key(instance)
+    transaction.on_commit(lambda: route_stats.refresh_day(*key))
+
+
+@receiver(post_delete, sender=Ticket)
+def count_released_ticket(sender, instance, origin=None, **kwargs):
+    # Deleting a flight recomputes its whole day anyway.
+    if isinstance(origin, Flight) or getattr(origin, "model", None) is Flight:
+        return
+
+    key = route_stats.stored_stats_key(instance.flight_id)
+    if key is not None:
+        transaction.on_commit(lambda: route_stats.tickets_changed(key, -1))
+
+
+@receiver(post_delete, sender=AirplaneType)
+@receiver(post_delete, sender=Airplane)
+@receiver(post_delete, sender=Airport)
+@receiver(post_delete, sender=Crew)
+@receiver(post_delete, sender=Flight)
+@receiver(post_delete, sender=Route)
+def record_sync_tombstone(sender, instance, **kwargs):
+    record_deletion(instance)
+
+
+@receiver(m2m_changed, sender=Flight.crew.through)
+def touch_flight_on_crew_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Crew changes do not save the flight, so bump ``updated_at`` here."""
+    if action in ("post_add", "post_remove"):
+        flights = Flight.objects.filter(pk__in=pk_set if reverse else [instance.pk])
+    elif action == "pre_clear":
+        flights = Flight.objects.filter(
+            **({"crew": instance} if reverse else {"pk": instance.pk})
+        )
+    else:
+        return
+
+    flights.update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Order)
+def touch_flights_of_deleted_order(sender, instance, **kwargs):
+    """
+    Flights render ``tickets_available``. Bookings touch their flights
+    in ``OrderSerializer.create``; a deleted order does it here, once
+    per flight rather than per ticket.
+    """
+    touch_flights(instance.tickets.values_list("flight_id", flat=True))
+
+
+@receiver(post_delete, sender=Ticket)
+def touch_flight_on_ticket_delete(sender, instance, origin=None, **kwargs):
+    """A ticket deleted on its own; orders and flights are handled whole."""
+    if isinstance(origin, (Flight, Order)):
+        return
+    if getattr(origin, "model", None) in (Flight, Order):
+        return
+
+    touch_flights([instance.flight_id])
+
+
+@receiver(pre_save, sender=Airport)
+def remember_airport_names(sender, instance, **kwargs):
+    instance._stored_names = (
+        Airport.objects.filter(pk=instance.pk)
+        .values_list("name", "closest_big_city")
+        .first()
+        if instance.pk else None
+    )
+
+
+@receiver(post_save, sender=Airport)
+def touch_rows_showing_airport(sender, instance, created, **kwargs):
+    """
+    Routes and flights render airport names, and so does ``routes_to``
+    of the airports with a route here. Only a rename touches them, and
+    only flights yet to depart: departed ones are no longer synced for
+    display.
+    """
+    names = (instance.name, instance.closest_big_city)
+    if created or instance._stored_names in (None, names):
+        return
+
+    now = timezone.now()
+    routes = Route.objects.filter(Q(source=instance) | Q(destination=instance))
+    routes.update(updated_at=now)
+    Flight.objects.filter(route__in=routes, departure_time__gte=now).update(
+        updated_at=now
+    )
+    Airport.objects.filter(routes_from__destination=instance).exclude(
+        pk=instance.pk
+    ).update(updated_at=now)
+
+
+@receiver(post_save, sender=Route)
+@receiver(post_delete, sender=Route)
+def touch_airport_on_route_change(sender, instance, **kwargs):
+    """``routes_to`` of the source airport lists its routes."""
+    Airport.objects.filter(pk=instance.source_id).update(updated_at=timezone.now())
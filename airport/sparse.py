@@ -0,0 +1,132 @@
+"""
+Sparse fieldsets: ``?fields=`` and ``?expand=`` on the read endpoints.
+
+``?fields=id,departure_time,route.destination`` keeps only the listed
+fields (dotted names narrow nested objects) and ``?expand=crew`` adds
+fields a serializer leaves out by default. The queryset follows the
+fields: serializers declare in ``Meta`` which joins, prefetches and
+annotations each field needs, and only those of the fields actually
+returned are applied, so a narrow request runs a narrow query. Only
+reads are narrowed: a create or update validates every field whatever
+its query string says.
+"""
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+SPARSE_FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        type=OpenApiTypes.STR,
+        description=(
+            "Comma separated fields to return, dotted for nested ones "
+            "(ex. ?fields=id,departure_time,route.destination)"
+        ),
+    ),
+    OpenApiParameter(
+        "expand",
+        type=OpenApiTypes.STR,
+        description="Comma separated optional fields to add (ex. ?expand=crew)",
+    ),
+]
+
+SPARSE_ACTIONS = ("list", "retrieve")
+
+
+def parse_fields(value):
+    """Turn ``"id,route.source"`` into ``{"id": {}, "route": {"source": {}}}``."""
+    if value is None:
+        return None
+
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for name in path.strip().split("."):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def parse_expand(value):
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def restrict_fields(serializer, tree):
+    unknown = set(tree) - set(serializer.fields)
+    if unknown:
+        raise ValidationError(
+            {"fields": f"Unknown fields: {', '.join(sorted(unknown))}."}
+        )
+
+    for name in list(serializer.fields):
+        if name not in tree:
+            serializer.fields.pop(name)
+        elif tree[name]:
+            field = serializer.fields[name]
+            field = getattr(field, "child", field)
+            if isinstance(field, serializers.Serializer):
+                restrict_fields(field, tree[name])
+
+
+class SparseFieldsSerializerMixin:
+    """
+    Serializer narrowed by ``fields`` and widened by ``expand``.
+
+    ``Meta`` may declare, all keyed by field name:
+    ``expandable_fields`` as ``(serializer class, kwargs)``,
+    ``select_related`` and ``prefetch_related`` as tuples of lookups,
+    ``annotations`` as ``{alias: expression}``.
+    """
+
+    def __init__(self, *args, fields=None, expand=(), **kwargs):
+        super().__init__(*args, **kwargs)
+
+        expandable_fields = getattr(self.Meta, "expandable_fields", {})
+        for name in expand:
+            if name not in expandable_fields:
+                raise ValidationError({"expand": f"Unknown field: {name}."})
+            serializer_class, field_kwargs = expandable_fields[name]
+            self.fields[name] = serializer_class(**field_kwargs)
+
+        if fields is not None:
+            restrict_fields(self, fields)
+
+    def prepare_queryset(self, queryset):
+        """Apply what the returned fields need to ``queryset``."""
+        select_related, prefetch_related, annotations = [], [], {}
+        for name in self.fields:
+            select_related += getattr(self.Meta, "select_related", {}).get(name, ())
+            prefetch_related += getattr(self.Meta, "prefetch_related", {}).get(name, ())
+            annotations.update(getattr(self.Meta, "annotations", {}).get(name, {}))
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+
+class SparseFieldsViewSetMixin:
+    """
+    Pass ``?fields=``/``?expand=`` to the serializer of read actions and
+    prune their queryset.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in SPARSE_ACTIONS and issubclass(
+            self.get_serializer_class(), SparseFieldsSerializerMixin
+        ):
+            query_params = self.request.query_params
+            kwargs.setdefault("fields", parse_fields(query_params.get("fields")))
+            kwargs.setdefault("expand", parse_expand(query_params.get("expand")))
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer()
+        if isinstance(serializer, SparseFieldsSerializerMixin):
+            queryset = serializer.prepare_queryset(queryset)
+        return queryset
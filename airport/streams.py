@@ -0,0 +1,164 @@
+"""
+Server-sent events stream of seat-map changes, served by the ASGI app.
+
+``GET /api/airport/flight/<id>/seats/stream/`` (JWT in the
+``Authorization`` header) first sends a ``snapshot`` event with the whole
+seat map and then only ``booked``, ``released`` and ``held`` deltas. The
+stream is handled directly at the ASGI level, before Django's middleware
+stack, so an idle watcher costs a coroutine rather than a worker thread.
+Outside that stack no request signals close stale database connections,
+so every database call of a stream does it itself, see ``_query``.
+"""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from airport.seatmap import seat_map_broadcaster, seat_map_snapshot
+
+STREAM_PATH = re.compile(r"^/api/airport/flight/(?P<flight_id>\d+)/seats/stream/$")
+KEEP_ALIVE_SECONDS = 15
+
+
+async def _query(function, *args):
+    """
+    Run ``function`` in a worker thread, closing that thread's unusable
+    or expired connections before and after, as a request would.
+    """
+    def run():
+        close_old_connections()
+        try:
+            return function(*args)
+        finally:
+            close_old_connections()
+
+    return await sync_to_async(run)()
+
+
+def _authenticate(authorization):
+    request = SimpleNamespace(META={"HTTP_AUTHORIZATION": authorization})
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except (AuthenticationFailed, InvalidToken):
+        return None
+    return result[0] if result else None
+
+
+def _event(event_type, data):
+    return f"event: {event_type}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+async def _wait_for_disconnect(receive):
+    """
+    Consume the request body, then return once the client disconnects.
+
+    An ASGI server first delivers the body as ``http.request`` messages,
+    the last one with ``more_body`` false, and only then the
+    ``http.disconnect`` that ends the stream.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+        if message["type"] == "http.request" and not message.get("more_body"):
+            break
+
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _respond(send, status, detail):
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json")],
+    })
+    await send({
+        "type": "http.response.body",
+        "body": json.dumps({"detail": detail}).encode(),
+    })
+
+
+class SeatMapStreamApp:
+    """Serve seat-map streams and pass every other request to ``application``."""
+
+    def __init__(self, application):
+        self.application = application
+
+    async def __call__(self, scope, receive, send):
+        match = scope["type"] == "http" and STREAM_PATH.match(scope["path"])
+        if not match:
+            return await self.application(scope, receive, send)
+
+        await self.stream(int(match["flight_id"]), scope, receive, send)
+
+    async def stream(self, flight_id, scope, receive, send):
+        if scope["method"] != "GET":
+            return await _respond(send, 405, "Method not allowed.")
+
+        headers = dict(scope["headers"])
+        authorization = headers.get(b"authorization", b"").decode("latin-1")
+        user = await _query(_authenticate, authorization)
+        if user is None:
+            return await _respond(
+                send, 401, "Authentication credentials were not provided."
+            )
+
+        subscription = seat_map_broadcaster.subscribe(flight_id)
+        disconnected = asyncio.ensure_future(_wait_for_disconnect(receive))
+        try:
+            snapshot = await _query(seat_map_snapshot, flight_id)
+            if snapshot is None:
+                return await _respond(send, 404, "Not found.")
+
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                ],
+            })
+            await self.send_body(send, _event("snapshot", snapshot))
+
+            while not disconnected.done():
+                waiting = asyncio.ensure_future(
+                    subscription.next_events(KEEP_ALIVE_SECONDS)
+                )
+                await asyncio.wait(
+                    {waiting, disconnected},
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected.done():
+                    waiting.cancel()
+                    break
+
+                events, overflowed = waiting.result()
+                if overflowed:
+                    snapshot = await _query(seat_map_snapshot, flight_id)
+                    body = _event("snapshot", snapshot)
+                elif events:
+                    body = b"".join(
+                        _event(event["type"], event) for event in events
+                    )
+                else:
+                    body = b": keep-alive\n\n"
+                await self.send_body(send, body)
+
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            seat_map_broadcaster.unsubscribe(subscription)
+            disconnected.cancel()
+
+    async def send_body(self, send, body):
+        await send({
+            "type": "http.response.body",
+            "body": body,
+            "more_body": True,
+        })
@@ -0,0 +1,115 @@
+"""
+Delta sync of the reference lists.
+
+``GET /api/airport/<resource>/?updated_since=<token>`` returns the rows
+changed after ``token`` (by their indexed ``updated_at``), the ids deleted
+since then (from ``Tombstone``) and the token for the next call. Start
+with ``updated_since=0``.
+
+The token lags ``SYNC_LAG_SECONDS`` behind the clock, so a row saved just
+before a slow transaction commits is still reported on the next call
+instead of slipping behind the token. Tombstones are kept for
+``TOMBSTONE_RETENTION_DAYS``; an older token has to start over from 0.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import OpenApiParameter
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from airport.models import Flight, Tombstone
+
+SYNC_LAG_SECONDS = 5
+TOMBSTONE_RETENTION_DAYS = 30
+
+EPOCH = datetime.fromtimestamp(0, dt_timezone.utc)
+
+UPDATED_SINCE_PARAMETER = OpenApiParameter(
+    "updated_since",
+    type=OpenApiTypes.STR,
+    description=(
+        "Return only rows changed after this token, the ids deleted "
+        "since then and a new token (ex. ?updated_since=0)"
+    ),
+)
+
+
+def make_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def parse_token(token):
+    try:
+        microseconds = int(token)
+    except ValueError:
+        raise ValidationError({"updated_since": "Invalid sync token."})
+
+    if microseconds < 0:
+        raise ValidationError({"updated_since": "Invalid sync token."})
+
+    return EPOCH + timedelta(microseconds=microseconds)
+
+
+def record_deletion(instance):
+    Tombstone.objects.create(
+        model=instance._meta.model_name, object_id=instance.pk
+    )
+
+
+def touch_flights(flight_ids):
+    """
+    Bump ``updated_at`` of the flights once, after commit: booking must
+    not write, and so lock, the flight row for every ticket.
+    """
+    flight_ids = set(flight_ids)
+    if flight_ids:
+        transaction.on_commit(
+            lambda: Flight.objects.filter(pk__in=flight_ids).update(
+                updated_at=timezone.now()
+            )
+        )
+
+
+def purge_tombstones(deleted_before):
+    """Delete tombstones older than ``deleted_before``; return the count."""
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=deleted_before).delete()
+    return deleted
+
+
+class DeltaSyncMixin:
+    """Add the ``?updated_since=`` mode to a viewset's ``list`` action."""
+
+    def list(self, request, *args, **kwargs):
+        token = request.query_params.get("updated_since")
+        if token is None:
+            return super().list(request, *args, **kwargs)
+
+        since = parse_token(token)
+        now = timezone.now()
+        if EPOCH < since < now - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+            raise ValidationError(
+                {"updated_since": "Sync token expired, start over from 0."}
+            )
+        until = max(since, now - timedelta(seconds=SYNC_LAG_SECONDS))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        changed = queryset.filter(
+            updated_at__gt=since, updated_at__lte=until
+        ).order_by("updated_at", "id")
+
+        deleted = []
+        if since > EPOCH:
+            deleted = Tombstone.objects.filter(
+                model=queryset.model._meta.model_name,
+                deleted_at__gt=since,
+                deleted_at__lte=until,
+            ).order_by("deleted_at").values_list("object_id", flat=True)
+
+        return Response({
+            "token": make_token(until),
+            "results": self.get_serializer(changed, many=True).data,
+            "deleted": list(deleted),
+        })
@@ -0,0 +1,65 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+
+from airport.models import Order, Ticket
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+
+class AdminChangelistTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            "admin@admin.com", "testpass"
+        )
+        self.client.force_login(self.admin)
+        self.route = sample_route()
+
+    def add_tickets(self, count):
+        for _ in range(count):
+            flight = sample_flight(route=self.route, airplane=sample_airplane())
+            Ticket.objects.create(
+                order=Order.objects.create(user=self.admin),
+                flight=flight,
+                row=1,
+                seat=1,
+            )
+
+    def changelist_queries(self, model_name):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(reverse(f"admin:airport_{model_name}_changelist"))
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for model_name in ("ticket", "flight", "order"):
+            self.add_tickets(1)
+            few = self.changelist_queries(model_name)
+            self.add_tickets(5)
+            many = self.changelist_queries(model_name)
+
+            self.assertEqual(few, many, model_name)
+
+    def test_changelists_order_by_primary_key_only(self):
+        self.add_tickets(1)
+        for model_name in ("ticket", "flight", "order"):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse(f"admin:airport_{model_name}_changelist"))
+            orderings = [
+                query["sql"].split(" ORDER BY ")[1]
+                for query in queries.captured_queries
+                if f'FROM "airport_{model_name}"' in query["sql"]
+                and " ORDER BY " in query["sql"]
+            ]
+
+            self.assertEqual(orderings, [f'"airport_{model_name}"."id" DESC'], model_name)
+
+    def test_flight_form_does_not_list_related_tables(self):
+        airplane = sample_airplane(name="Needle")
+
+        res = self.client.get(reverse("admin:airport_flight_add"))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotContains(res, f'<option value="{airplane.id}">')
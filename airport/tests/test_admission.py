@@ -0,0 +1,107 @@
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport_service.admission import AdmissionControlMiddleware, Limiter
+
+ADMISSION_CONTROL = {
+    "orders-write": {
+        "methods": ["POST"],
+        "path": r"^/api/airport/orders/",
+        "concurrency": 1,
+        "queue": 0,
+        "retry_after": 3,
+    },
+}
+
+
+class LimiterTests(SimpleTestCase):
+    def test_queued_request_gets_released_slot(self):
+        limiter = Limiter("test", concurrency=1, queue_size=1, timeout=5)
+        self.assertTrue(limiter.acquire())
+        results = []
+        waiting = threading.Thread(target=lambda: results.append(limiter.acquire()))
+        waiting.start()
+        while limiter.metrics()["queue_depth"] == 0:
+            time.sleep(0.001)
+
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        waiting.join()
+
+        self.assertEqual(results, [True])
+        metrics = limiter.metrics()
+        self.assertEqual(
+            (metrics["in_flight"], metrics["admitted"], metrics["shed"]), (1, 2, 1)
+        )
+
+    def test_wait_times_out(self):
+        limiter = Limiter("test", concurrency=1, queue_size=1, timeout=0.05)
+        limiter.acquire()
+
+        self.assertFalse(limiter.acquire())
+        self.assertFalse(async_to_sync(limiter.acquire_async)())
+        self.assertEqual(limiter.metrics()["queue_depth"], 0)
+
+    def test_async_waiter_gets_released_slot(self):
+        limiter = Limiter("test", concurrency=1, queue_size=1, timeout=5)
+        limiter.acquire()
+        threading.Timer(0.05, limiter.release).start()
+
+        self.assertTrue(async_to_sync(limiter.acquire_async)())
+
+
+@override_settings(ADMISSION_CONTROL=ADMISSION_CONTROL)
+class AdmissionControlMiddlewareTests(SimpleTestCase):
+    def test_sheds_requests_over_the_limit(self):
+        entered, finish = threading.Event(), threading.Event()
+
+        def slow_view(request):
+            entered.set()
+            finish.wait(5)
+            return HttpResponse()
+
+        middleware = AdmissionControlMiddleware(slow_view)
+        factory = RequestFactory()
+        first = threading.Thread(
+            target=middleware, args=[factory.post("/api/airport/orders/")]
+        )
+        first.start()
+        entered.wait(5)
+
+        shed = middleware(factory.post("/api/airport/orders/"))
+        other_class = AdmissionControlMiddleware(lambda request: HttpResponse())(
+            factory.get("/api/airport/orders/")
+        )
+        finish.set()
+        first.join()
+
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed["Retry-After"], "3")
+        self.assertEqual(other_class.status_code, 200)
+
+
+class AdmissionMetricsApiTests(TestCase):
+    def test_metrics_for_admins_only(self):
+        client = APIClient()
+        url = reverse("admission-metrics")
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        self.assertEqual(client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        client.force_authenticate(
+            get_user_model().objects.create_superuser("admin@admin.com", "testpass")
+        )
+        res = client.get(url)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("shed", res.data["orders-write"])
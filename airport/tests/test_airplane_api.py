@@ -3,6 +3,7 @@ import os
 
 from PIL import Image
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -55,6 +56,25 @@ class UnauthenticatedAirplaneApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class ThrottledAirplaneApiTests(TestCase):
+    def setUp(self):
+        # Throttle counters live in the cache, which rollbacks do not reset.
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+    def test_user_requests_are_throttled(self):
+        for _ in range(30):
+            res = self.client.get(AIRPLANE_URL)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(AIRPLANE_URL)
+        self.assertEqual(res.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
 class AuthenticatedAirplaneApiTests(TestCase):
     def setUp(self):
         self.client = APIClient()
@@ -0,0 +1,142 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport import board
+from airport.board import DEPARTURES, airport_board
+from airport.models import Airport, Order, Route, Ticket
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight
+
+
+def board_url(airport_id):
+    return reverse("airport:airport-board", args=[airport_id])
+
+
+class AirportBoardApiTests(TestCase):
+    def setUp(self):
+        airport_board.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.kyiv = Airport.objects.create(name="Boryspil", closest_big_city="Kyiv")
+        self.warsaw = Airport.objects.create(name="Chopin", closest_big_city="Warsaw")
+        self.outbound = Route.objects.create(
+            source=self.kyiv, destination=self.warsaw, distance=690
+        )
+        self.inbound = Route.objects.create(
+            source=self.warsaw, destination=self.kyiv, distance=690
+        )
+
+    def flight(self, route, departs_in):
+        departure_time = timezone.now() + departs_in
+        return sample_flight(
+            route=route,
+            airplane=sample_airplane(),
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+
+    def get_board(self, airport, **params):
+        res = self.client.get(board_url(airport.id), params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_board_splits_departures_and_arrivals(self):
+        departure = self.flight(self.outbound, timedelta(hours=1))
+        arrival = self.flight(self.inbound, timedelta(hours=1))
+
+        board = self.get_board(self.kyiv)
+
+        self.assertEqual([row["id"] for row in board["departures"]], [departure.id])
+        self.assertEqual([row["id"] for row in board["arrivals"]], [arrival.id])
+        self.assertEqual(board["departures"][0]["destination"], "Chopin")
+
+    def test_board_respects_window_and_limit(self):
+        soon = self.flight(self.outbound, timedelta(hours=1))
+        later = self.flight(self.outbound, timedelta(hours=2))
+        self.flight(self.outbound, timedelta(hours=10))
+        self.flight(self.outbound, -timedelta(hours=1))
+
+        board = self.get_board(self.kyiv, hours=6)
+        self.assertEqual(
+            [row["id"] for row in board["departures"]], [soon.id, later.id]
+        )
+
+        board = self.get_board(self.kyiv, hours=6, limit=1)
+        self.assertEqual([row["id"] for row in board["departures"]], [soon.id])
+
+    def test_cached_board_follows_flight_and_ticket_changes(self):
+        flight = self.flight(self.outbound, timedelta(hours=1))
+        self.get_board(self.kyiv)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(
+                order=Order.objects.create(user=self.user),
+                flight=flight,
+                row=1,
+                seat=1,
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            added = self.flight(self.outbound, timedelta(minutes=30))
+
+        with self.assertNumQueries(1):
+            board = self.get_board(self.kyiv)
+
+        self.assertEqual(
+            [row["id"] for row in board["departures"]], [added.id, flight.id]
+        )
+        self.assertEqual(
+            board["departures"][1]["tickets_available"],
+            flight.airplane.capacity - 1,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            flight.delete()
+        board = self.get_board(self.kyiv)
+        self.assertEqual([row["id"] for row in board["departures"]], [added.id])
+
+    def test_window_is_queried_without_the_lock_and_copied(self):
+        flight = self.flight(self.outbound, timedelta(hours=1))
+        locked = []
+
+        def board_rows(queryset):
+            locked.append(airport_board._lock.locked())
+            return original(queryset)
+
+        original = board.board_rows
+        with mock.patch("airport.board.board_rows", board_rows):
+            rows = airport_board.get(self.kyiv.id, DEPARTURES)
+        rows[0]["tickets_available"] = 0
+
+        self.assertEqual(locked, [False])
+        with self.assertNumQueries(0):
+            rows = airport_board.get(self.kyiv.id, DEPARTURES)
+        self.assertEqual(rows[0]["tickets_available"], flight.airplane.capacity)
+
+    def test_window_missing_a_change_is_not_cached(self):
+        self.flight(self.outbound, timedelta(hours=1))
+
+        def board_rows(queryset):
+            rows = original(queryset)
+            # A booking committed after the query read the tickets.
+            airport_board.tickets_changed(rows[0]["id"], -1)
+            return rows
+
+        original = board.board_rows
+        with mock.patch("airport.board.board_rows", board_rows):
+            airport_board.get(self.kyiv.id, DEPARTURES)
+
+        with self.assertNumQueries(1):
+            airport_board.get(self.kyiv.id, DEPARTURES)
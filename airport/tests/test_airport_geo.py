@@ -0,0 +1,191 @@
+import random
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.geo import (
+    airport_geo_index,
+    great_circle_km,
+    haversine_km,
+    update_route_distances,
+)
+from airport.models import Airport, Route
+
+AIRPORT_NEAREST_URL = reverse("airport:airport-nearest")
+AIRPORT_URL = reverse("airport:airport-list")
+ROUTE_URL = reverse("airport:route-list")
+
+
+class GreatCircleTests(TestCase):
+    def test_known_distance(self):
+        self.assertAlmostEqual(haversine_km(50.345, 30.8947, 52.1657, 20.9671), 719, delta=5)
+
+    def test_batch_matches_scalar(self):
+        rng = random.Random(1)
+        points = [
+            (rng.uniform(-90, 90), rng.uniform(-180, 180), rng.uniform(-90, 90), rng.uniform(-180, 180))
+            for _ in range(100)
+        ]
+
+        np.testing.assert_allclose(
+            great_circle_km(*np.array(points).T),
+            [haversine_km(*point) for point in points],
+        )
+
+    def test_update_route_distances(self):
+        kyiv = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", latitude=50.345, longitude=30.8947
+        )
+        warsaw = Airport.objects.create(
+            name="Chopin", closest_big_city="Warsaw", latitude=52.1657, longitude=20.9671
+        )
+        nowhere = Airport.objects.create(name="Nowhere", closest_big_city="Nowhere")
+        route = Route.objects.create(source=kyiv, destination=warsaw, distance=1)
+        manual = Route.objects.create(source=kyiv, destination=nowhere, distance=123)
+
+        self.assertEqual(update_route_distances(), 1)
+        self.assertEqual(update_route_distances(), 0)
+
+        route.refresh_from_db()
+        manual.refresh_from_db()
+        self.assertEqual(route.distance, round(haversine_km(50.345, 30.8947, 52.1657, 20.9671)))
+        self.assertEqual(manual.distance, 123)
+
+    def test_moving_airport_updates_its_routes(self):
+        kyiv = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", latitude=50.345, longitude=30.8947
+        )
+        warsaw = Airport.objects.create(
+            name="Chopin", closest_big_city="Warsaw", latitude=52.1657, longitude=20.9671
+        )
+        route = Route.objects.create(source=kyiv, destination=warsaw, distance=690)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            warsaw.latitude, warsaw.longitude = 51.47, -0.4543
+            warsaw.save()
+
+        route.refresh_from_db()
+        self.assertEqual(route.distance, round(haversine_km(50.345, 30.8947, 51.47, -0.4543)))
+
+
+class AirportNearestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        airport_geo_index.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+
+    def nearest(self, **params):
+        response = self.client.get(AIRPORT_NEAREST_URL, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_matches_full_scan(self):
+        rng = random.Random(7)
+        airports = Airport.objects.bulk_create([
+            Airport(
+                name=f"Airport {index}",
+                closest_big_city="City",
+                latitude=rng.uniform(-90, 90),
+                longitude=rng.uniform(-180, 180),
+            )
+            for index in range(300)
+        ])
+        Airport.objects.create(name="No coordinates", closest_big_city="City")
+
+        for latitude, longitude in [(89.9, 0), (0, 179.9), (-45, -179.9)] + [
+            (rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(20)
+        ]:
+            expected = sorted(
+                airports,
+                key=lambda airport: haversine_km(
+                    latitude, longitude, airport.latitude, airport.longitude
+                ),
+            )[:5]
+            found = airport_geo_index.nearest(latitude, longitude, limit=5)
+
+            self.assertEqual(
+                [airport.id for airport, _ in found], [airport.id for airport in expected]
+            )
+            for airport, distance in found:
+                self.assertAlmostEqual(
+                    distance,
+                    haversine_km(latitude, longitude, airport.latitude, airport.longitude),
+                    places=6,
+                )
+
+    def test_endpoint_and_index_follow_changes(self):
+        kyiv = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", latitude=50.345, longitude=30.8947
+        )
+        Airport.objects.create(
+            name="Chopin", closest_big_city="Warsaw", latitude=52.1657, longitude=20.9671
+        )
+
+        result = self.nearest(lat=50.45, lon=30.52, limit=1)
+        self.assertEqual([airport["name"] for airport in result], ["Boryspil"])
+        self.assertAlmostEqual(result[0]["distance_km"], 29.1, delta=1)
+        self.assertEqual(
+            [airport["name"] for airport in self.nearest(lat=50.45, lon=30.52, radius_km=100)],
+            ["Boryspil"],
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Airport.objects.create(
+                name="Zhuliany", closest_big_city="Kyiv", latitude=50.4017, longitude=30.4497
+            )
+        self.assertEqual(self.nearest(lat=50.45, lon=30.52, limit=1)[0]["name"], "Zhuliany")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            kyiv.delete()
+        self.assertEqual(
+            [airport["name"] for airport in self.nearest(lat=50.45, lon=30.52)],
+            ["Zhuliany", "Chopin"],
+        )
+
+    def test_invalid_point(self):
+        for params in ({"lon": 30}, {"lat": 91, "lon": 30}, {"lat": "north", "lon": 30}):
+            response = self.client.get(AIRPORT_NEAREST_URL, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CoordinatesApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = get_user_model().objects.create_superuser("admin@admin.com", "testpass")
+        self.client.force_authenticate(self.admin)
+
+    def test_airport_needs_both_coordinates(self):
+        response = self.client.post(
+            AIRPORT_URL, {"name": "Chopin", "closest_big_city": "Warsaw", "latitude": 52.1}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_route_distance_is_computed(self):
+        kyiv = Airport.objects.create(
+            name="Boryspil", closest_big_city="Kyiv", latitude=50.345, longitude=30.8947
+        )
+        warsaw = Airport.objects.create(
+            name="Chopin", closest_big_city="Warsaw", latitude=52.1657, longitude=20.9671
+        )
+        nowhere = Airport.objects.create(name="Nowhere", closest_big_city="Nowhere")
+
+        computed = self.client.post(
+            ROUTE_URL, {"source": kyiv.id, "destination": warsaw.id, "distance": 5}
+        )
+        missing = self.client.post(ROUTE_URL, {"source": kyiv.id, "destination": nowhere.id})
+
+        self.assertEqual(computed.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            computed.data["distance"], round(haversine_km(50.345, 30.8947, 52.1657, 20.9671))
+        )
+        self.assertEqual(missing.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("distance", missing.data)
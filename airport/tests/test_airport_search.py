@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Airport
+from airport.search import airport_index
+
+AIRPORT_SEARCH_URL = reverse("airport:airport-search")
+
+
+class AirportSearchApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        airport_index.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        Airport.objects.create(name="Boryspil International", closest_big_city="Kyiv")
+        Airport.objects.create(name="Chopin", closest_big_city="Warsaw")
+        Airport.objects.create(name="Modlin", closest_big_city="Warsaw")
+        Airport.objects.create(name="Heathrow", closest_big_city="London")
+
+    def search(self, query, **params):
+        res = self.client.get(AIRPORT_SEARCH_URL, {"q": query, **params})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [airport["name"] for airport in res.data]
+
+    def test_prefix_of_name(self):
+        self.assertEqual(self.search("bory"), ["Boryspil International"])
+
+    def test_prefix_of_city(self):
+        self.assertEqual(self.search("wars"), ["Chopin", "Modlin"])
+
+    def test_typo_tolerance(self):
+        self.assertEqual(self.search("heatrow"), ["Heathrow"])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search("chopin warsaw"), ["Chopin"])
+
+    def test_limit(self):
+        self.assertEqual(len(self.search("warsaw", limit=1)), 1)
+
+    def test_empty_query(self):
+        self.assertEqual(self.search(""), [])
+
+    def test_index_follows_airport_changes(self):
+        self.search("heathrow")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gatwick = Airport.objects.create(name="Gatwick", closest_big_city="London")
+        self.assertEqual(self.search("gatwick"), ["Gatwick"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gatwick.name = "Stansted"
+            gatwick.save()
+        self.assertEqual(self.search("gatwick"), [])
+        self.assertEqual(self.search("stansted"), ["Stansted"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            gatwick.delete()
+        self.assertEqual(self.search("stansted"), [])
@@ -0,0 +1,218 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.analytics import (
+    airplane_utilization,
+    flight_time_report,
+    group_quantiles,
+    seat_heatmap,
+)
+from airport.archive import archive_flights
+from airport.route_stats import day_range
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_order, sample_route
+
+FLIGHT_TIMES_URL = reverse("airport:analytics-flight-times")
+SEAT_HEATMAP_URL = reverse("airport:analytics-seat-heatmap")
+DAY = date(2030, 1, 1)
+START, END = day_range(DAY, DAY + timedelta(days=1))
+
+
+def departure(hour, day=DAY):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.route = sample_route()
+
+    def flight(self, hour, minutes, airplane=None, route=None):
+        return sample_flight(
+            route=route or self.route,
+            airplane=airplane or sample_airplane(),
+            departure_time=departure(hour),
+            arrival_time=departure(hour) + timedelta(minutes=minutes),
+        )
+
+    def test_group_quantiles_match_numpy(self):
+        keys = np.array([3, 1, 3, 1, 3, 3, 1])
+        values = np.array([10.0, 4.0, 30.0, 8.0, 20.0, 40.0, 6.0])
+
+        unique_keys, counts, means, table = group_quantiles(keys, values, (0.5, 0.9))
+
+        self.assertEqual(unique_keys.tolist(), [1, 3])
+        self.assertEqual(counts.tolist(), [3, 4])
+        self.assertEqual(means.tolist(), [6.0, 25.0])
+        for row, key in zip(table, unique_keys):
+            np.testing.assert_allclose(row, np.quantile(values[keys == key], (0.5, 0.9)))
+
+    def test_flight_time_report(self):
+        other_route = sample_route()
+        for minutes in (60, 90, 120):
+            self.flight(8, minutes)
+        self.flight(9, 45, route=other_route)
+        self.flight(8, 500).delete()
+        archive_flights(departure(23))
+
+        report = flight_time_report(START, END, bins=4)
+
+        self.assertEqual(
+            report["routes"],
+            [
+                {
+                    "route": self.route.id,
+                    "flights": 3,
+                    "mean_minutes": 90.0,
+                    "p50_minutes": 90.0,
+                    "p90_minutes": 114.0,
+                    "p99_minutes": 119.4,
+                },
+                {
+                    "route": other_route.id,
+                    "flights": 1,
+                    "mean_minutes": 45.0,
+                    "p50_minutes": 45.0,
+                    "p90_minutes": 45.0,
+                    "p99_minutes": 45.0,
+                },
+            ],
+        )
+        self.assertEqual(report["histogram"]["counts"], [2, 0, 1, 1])
+        self.assertEqual(report["histogram"]["edges"], [45.0, 63.75, 82.5, 101.25, 120.0])
+
+    def test_seat_heatmap_divides_by_offered_seats(self):
+        small = self.flight(8, 60, airplane=sample_airplane(rows=2, seats_in_row=2))
+        big = self.flight(9, 60, airplane=sample_airplane(rows=3, seats_in_row=2))
+        sample_order(self.user, small, seats=((1, 1), (2, 2)))
+        sample_order(self.user, big, seats=((1, 1), (3, 1)))
+
+        report = seat_heatmap(START, END)
+
+        self.assertEqual(report["rows"], 3)
+        self.assertEqual(report["seats_in_row"], 2)
+        self.assertEqual(report["flights"], 2)
+        self.assertEqual(report["sold"], [[2, 0], [0, 1], [1, 0]])
+        self.assertEqual(report["occupancy"], [[1.0, 0.0], [0.0, 0.5], [1.0, 0.0]])
+
+    def test_airplane_utilization_clips_to_period(self):
+        airplane = sample_airplane(rows=2, seats_in_row=2)
+        flight = self.flight(8, 120, airplane=airplane)
+        sample_order(self.user, flight, seats=((1, 1), (1, 2)))
+        sample_flight(
+            route=self.route,
+            airplane=airplane,
+            departure_time=START - timedelta(hours=1),
+            arrival_time=START + timedelta(hours=2),
+        )
+
+        self.assertEqual(
+            airplane_utilization(START, END),
+            [
+                {
+                    "airplane": airplane.id,
+                    "flights": 2,
+                    "hours": 4.0,
+                    "utilization": round(4 / 48, 4),
+                    "seats": 8,
+                    "tickets_sold": 2,
+                    "load_factor": 0.25,
+                }
+            ],
+        )
+
+    def test_empty_period(self):
+        self.assertEqual(flight_time_report(START, END)["routes"], [])
+        self.assertEqual(seat_heatmap(START, END)["flights"], 0)
+        self.assertEqual(airplane_utilization(START, END), [])
+
+    def test_command_prints_report(self):
+        self.flight(8, 60)
+        out = StringIO()
+
+        call_command(
+            "flight_analytics", "flight_times", "--from", "2030-01-01", "--to", "2030-01-01",
+            stdout=out,
+        )
+
+        self.assertEqual(json.loads(out.getvalue())["routes"][0]["flights"], 1)
+
+    def test_benchmark_agrees_with_orm_loops(self):
+        flight = self.flight(8, 95)
+        self.flight(9, 50)
+        sample_order(self.user, flight, seats=((1, 1), (2, 3)))
+        out = StringIO()
+
+        call_command("benchmark_analytics", "--rounds", "1", stdout=out)
+
+        self.assertEqual(out.getvalue().count("results=match"), 3)
+
+
+class AnalyticsApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.admin = get_user_model().objects.create_superuser("admin@admin.com", "testpass")
+
+    def test_admin_only(self):
+        self.client.force_authenticate(self.user)
+
+        response = self.client.get(FLIGHT_TIMES_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports(self):
+        flight = sample_flight(departure_time=departure(8), arrival_time=departure(10))
+        sample_order(self.user, flight, seats=((1, 1),))
+        self.client.force_authenticate(self.admin)
+
+        flight_times = self.client.get(
+            FLIGHT_TIMES_URL, {"date_from": "2030-01-01", "date_to": "2030-01-01", "bins": 2}
+        )
+        heatmap = self.client.get(
+            SEAT_HEATMAP_URL,
+            {"date_to": "2030-01-01", "airplane_type": flight.airplane.airplane_type_id},
+        )
+
+        self.assertEqual(flight_times.status_code, status.HTTP_200_OK)
+        self.assertEqual(flight_times.data["routes"][0]["p50_minutes"], 120.0)
+        self.assertEqual(flight_times.data["histogram"]["counts"], [0, 1])
+        self.assertEqual(heatmap.status_code, status.HTTP_200_OK)
+        self.assertEqual(heatmap.data["sold"][0][0], 1)
+        self.assertEqual(heatmap.data["rows"], flight.airplane.rows)
+
+    def test_rejects_malformed_parameters(self):
+        self.client.force_authenticate(self.admin)
+
+        for url, params in (
+            (FLIGHT_TIMES_URL, {"route": "abc"}),
+            (SEAT_HEATMAP_URL, {"airplane_type": "x"}),
+            (SEAT_HEATMAP_URL, {"airplane_type": str(2**63)}),
+            (FLIGHT_TIMES_URL, {"bins": "0"}),
+            (FLIGHT_TIMES_URL, {"date_to": "31.01.2030"}),
+        ):
+            response = self.client.get(url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn(next(iter(params)), response.data)
+
+    def test_rejects_reversed_period(self):
+        self.client.force_authenticate(self.admin)
+
+        response = self.client.get(
+            FLIGHT_TIMES_URL, {"date_from": "2030-01-02", "date_to": "2030-01-01"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from airport.archive import archive_batch
+from airport.models import (
+    ArchivedFlight,
+    ArchivedTicket,
+    Crew,
+    Flight,
+    Ticket,
+    Tombstone,
+)
+from airport.tests.test_order_api import sample_flight, sample_order
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class ArchiveFlightsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        departed = timezone.now() - timedelta(days=120)
+        self.old_flight = sample_flight(
+            departure_time=departed,
+            arrival_time=departed + timedelta(hours=2),
+        )
+        self.old_flight.crew.add(
+            Crew.objects.create(first_name="Anna", last_name="Melnyk")
+        )
+        self.recent_flight = sample_flight(
+            departure_time=timezone.now() + timedelta(days=1),
+            arrival_time=timezone.now() + timedelta(days=1, hours=2),
+        )
+        self.order = sample_order(self.user, self.old_flight, seats=((1, 1), (1, 2)))
+        sample_order(self.user, self.recent_flight)
+
+    def archive(self, **options):
+        call_command("archive_flights", stdout=StringIO(), **options)
+
+    def test_moves_departed_flights_with_tickets_and_crew(self):
+        self.archive(days=90, batch_size=1)
+
+        self.assertEqual(list(Flight.objects.all()), [self.recent_flight])
+        self.assertEqual(Ticket.objects.count(), 1)
+        self.assertFalse(Flight.crew.through.objects.exists())
+
+        archived = ArchivedFlight.objects.get(id=self.old_flight.id)
+        self.assertEqual(archived.departure_time, self.old_flight.departure_time)
+        self.assertEqual(archived.crew.count(), 1)
+        self.assertEqual(
+            set(ArchivedTicket.objects.values_list("order_id", flat=True)),
+            {self.order.id},
+        )
+
+    def test_archived_orders_stay_in_history(self):
+        before = self.client.get(ORDER_URL).data
+
+        self.archive(days=90)
+
+        after = self.client.get(ORDER_URL).data
+        self.assertEqual(after, before)
+
+    def test_archives_in_bulk_with_tombstones_and_one_refresh_per_day(self):
+        second = sample_flight(
+            route=self.old_flight.route,
+            airplane=self.old_flight.airplane,
+            departure_time=self.old_flight.departure_time + timedelta(hours=3),
+            arrival_time=self.old_flight.arrival_time + timedelta(hours=3),
+        )
+        flight_ids = [self.old_flight.id, second.id]
+
+        with mock.patch("airport.signals.seat_map_broadcaster") as broadcaster, \
+                mock.patch("airport.route_stats.refresh_day") as refresh_day:
+            with self.captureOnCommitCallbacks(execute=True):
+                archive_batch(flight_ids)
+
+        broadcaster.publish.assert_not_called()
+        refresh_day.assert_called_once()
+        self.assertEqual(
+            sorted(Tombstone.objects.values_list("model", "object_id")),
+            [("flight", flight_id) for flight_id in sorted(flight_ids)],
+        )
@@ -0,0 +1,110 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+BATCH_URL = reverse("airport:batch")
+
+
+class BatchApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.flights = [
+            sample_flight(route=self.route, airplane=sample_airplane())
+            for _ in range(3)
+        ]
+
+    def batch(self, paths):
+        res = self.client.post(BATCH_URL, {"requests": paths}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [(item["status"], item["body"]) for item in res.data["responses"]]
+
+    def test_merges_detail_lookups(self):
+        paths = [f"flight/{flight.id}/" for flight in self.flights]
+        single = self.client.get(reverse("airport:flight-detail", args=[self.flights[0].id]))
+
+        with CaptureQueriesContext(connection) as queries:
+            responses = self.batch(paths)
+
+        flight_queries = [
+            query for query in queries.captured_queries
+            if 'FROM "airport_flight" ' in query["sql"]
+        ]
+        self.assertEqual(len(flight_queries), 1)
+
+        self.assertEqual(
+            [body["id"] for _, body in responses],
+            [flight.id for flight in self.flights],
+        )
+        self.assertEqual(responses[0], (200, single.data))
+
+    def test_mixed_requests_keep_order(self):
+        responses = self.batch([
+            f"route/?source={self.route.source_id}",
+            "flight/999/",
+            f"airplane/{self.flights[0].airplane_id}",
+            "unknown/1/",
+            "batch/",
+        ])
+
+        self.assertEqual(
+            [status_code for status_code, _ in responses], [200, 404, 200, 404, 404]
+        )
+        self.assertEqual(responses[0][1][0]["id"], self.route.id)
+        self.assertEqual(responses[2][1]["name"], self.flights[0].airplane.name)
+
+    def test_sub_requests_keep_permissions(self):
+        res = self.client.post(
+            BATCH_URL, {"requests": ["orders/"]}, format="json"
+        )
+        self.assertEqual(res.data["responses"][0]["status"], 200)
+
+        self.client.force_authenticate(None)
+        res = self.client.post(
+            BATCH_URL, {"requests": ["orders/"]}, format="json"
+        )
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_sub_requests_reuse_the_batch_token(self):
+        self.client.force_authenticate(None)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}"
+        )
+        authenticate = mock.patch.object(
+            JWTAuthentication,
+            "authenticate",
+            autospec=True,
+            side_effect=JWTAuthentication.authenticate,
+        )
+
+        with authenticate as jwt_authenticate:
+            responses = self.batch(
+                ["orders/", f"flight/{self.flights[0].id}/", f"flight/{self.flights[1].id}/"]
+            )
+
+        self.assertEqual([status_code for status_code, _ in responses], [200, 200, 200])
+        self.assertEqual(jwt_authenticate.call_count, 1)
+
+    def test_too_many_requests(self):
+        res = self.client.post(
+            BATCH_URL, {"requests": ["flight/1/"] * 21}, format="json"
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
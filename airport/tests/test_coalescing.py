@@ -0,0 +1,60 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import SimpleTestCase
+
+from airport.coalescing import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def herd(self, single_flight, compute, key=lambda index: "flight:1", clients=20):
+        barrier = threading.Barrier(clients)
+
+        def client(index):
+            barrier.wait()
+            try:
+                return single_flight.do(key(index), compute)
+            except ValueError as error:
+                return error
+
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            return list(executor.map(client, range(clients)))
+
+    def test_concurrent_callers_share_one_computation(self):
+        single_flight = SingleFlight()
+        runs = []
+
+        def compute():
+            runs.append(1)
+            time.sleep(0.2)
+            return {"id": 1}
+
+        results = self.herd(single_flight, compute)
+
+        self.assertEqual(len(runs), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight.followers, 19)
+
+    def test_different_keys_run_separately(self):
+        single_flight = SingleFlight()
+
+        self.herd(
+            single_flight,
+            lambda: time.sleep(0.1),
+            key=lambda index: f"flight:{index % 2}",
+        )
+
+        self.assertEqual(single_flight.leaders, 2)
+
+    def test_error_reaches_every_caller_and_is_not_kept(self):
+        single_flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        results = self.herd(single_flight, fail)
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+        self.assertEqual(single_flight.do("flight:1", lambda: "fresh"), "fresh")
@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.geo import airport_geo_index
+from airport.models import Flight
+from airport.reference import reference_cache
+from airport.search import airport_index
+from airport.tests.test_order_api import sample_flight
+from airport_service.db_router import (
+    STICKY_COOKIE,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+)
+
+AIRPORT_NEAREST_URL = reverse("airport:airport-nearest")
+AIRPORT_SEARCH_URL = reverse("airport:airport-search")
+BATCH_URL = reverse("airport:batch")
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def read_database(request):
+    """Stand-in view answering with the database a read would be routed to."""
+    return HttpResponse(ReplicaRouter().db_for_read(Flight))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_STICKY_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(read_database)
+        self.cookies = {}
+
+    def request(self, method, token="Bearer first"):
+        request = getattr(self.factory, method)(
+            "/api/airport/flight/", HTTP_AUTHORIZATION=token
+        )
+        request.COOKIES.update(self.cookies)
+        response = self.middleware(request)
+        self.cookies.update(
+            (name, morsel.value) for name, morsel in response.cookies.items()
+        )
+        return response.content.decode()
+
+    def test_safe_requests_read_from_replica(self):
+        self.assertEqual(self.request("get"), "replica")
+
+    def test_unsafe_requests_read_from_primary(self):
+        self.assertEqual(self.request("post"), "default")
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.request("post")
+        self.cookies.clear()
+
+        self.assertEqual(self.request("get"), "default")
+        self.assertEqual(self.request("get", token="Bearer other"), "replica")
+
+    def test_signed_cookie_pins_without_the_cache(self):
+        self.request("post", token="")
+        cache.clear()
+
+        self.assertEqual(self.request("get", token="Bearer other"), "default")
+        self.cookies[STICKY_COOKIE] = "1"
+        self.assertEqual(self.request("get", token="Bearer other"), "replica")
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_stickiness_expires(self):
+        self.request("post")
+
+        self.assertEqual(self.request("get"), "replica")
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_read(Flight), "default")
+
+    def test_writes_always_use_primary(self):
+        self.assertEqual(ReplicaRouter().db_for_write(Flight), "default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_primary(self):
+        self.assertEqual(self.request("get"), "default")
+
+
+@override_settings(DATABASE_REPLICAS=["replica"], REPLICA_STICKY_SECONDS=60)
+class ReplicaQueriesTests(TransactionTestCase):
+    """
+    The ``replica`` alias mirrors the test database. It is a separate
+    connection, so it only sees committed rows.
+    """
+
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+        self.flight = sample_flight()
+
+    def test_reads_run_on_replica_until_a_write(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(replica.captured_queries)
+
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"flight": self.flight.id, "row": 1, "seat": 1}]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn(STICKY_COOKIE, res.cookies)
+
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.get(FLIGHT_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(replica.captured_queries, [])
+
+    def test_batch_of_gets_reads_from_replica_without_pinning(self):
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            res = self.client.post(
+                BATCH_URL,
+                {"requests": ["flight/", f"flight/{self.flight.id}/"]},
+                format="json",
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["status"] for item in res.data["responses"]], [200, 200]
+        )
+        self.assertTrue(replica.captured_queries)
+        self.assertNotIn(STICKY_COOKIE, res.cookies)
+
+    def test_in_process_caches_load_from_primary(self):
+        reference_cache.clear()
+        airport_index.clear()
+        airport_geo_index.clear()
+
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            self.client.get(FLIGHT_URL)
+            self.client.get(AIRPORT_SEARCH_URL, {"q": "bory"})
+            self.client.get(AIRPORT_NEAREST_URL, {"lat": 50.45, "lon": 30.52})
+            tables = [
+                table
+                for query in replica.captured_queries
+                for table in ("airport_airport", "airport_airplane")
+                if f'"{table}"' in query["sql"]
+            ]
+
+        self.assertTrue(replica.captured_queries)
+        self.assertEqual(tables, [])
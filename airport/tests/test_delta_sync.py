@@ -0,0 +1,209 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Airport, Crew, Flight, Route, Tombstone
+from airport.serializers import OrderSerializer
+from airport.sync import SYNC_LAG_SECONDS, make_token
+from airport.tests.test_order_api import sample_flight, sample_route
+
+AIRPORT_URL = reverse("airport:airport-list")
+FLIGHT_URL = reverse("airport:flight-list")
+ROUTE_URL = reverse("airport:route-list")
+
+
+class DeltaSyncApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+
+    def sync(self, url, token, at):
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            res = self.client.get(url, {"updated_since": token})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def at(self, seconds):
+        return self.now + timedelta(seconds=seconds)
+
+    def create_airport(self, name, at):
+        with mock.patch("django.utils.timezone.now", return_value=at):
+            return Airport.objects.create(name=name, closest_big_city="Kyiv")
+
+    def test_returns_only_changes_since_token(self):
+        boryspil = self.create_airport("Boryspil", self.at(0))
+        zhuliany = self.create_airport("Zhuliany", self.at(0))
+
+        first = self.sync(AIRPORT_URL, "0", self.at(60))
+        self.assertEqual(
+            [airport["id"] for airport in first["results"]],
+            [boryspil.id, zhuliany.id],
+        )
+        self.assertEqual(first["token"], make_token(self.at(60 - SYNC_LAG_SECONDS)))
+
+        self.create_airport("Lviv", self.at(100))
+        boryspil_id = boryspil.id
+        with mock.patch("django.utils.timezone.now", return_value=self.at(100)):
+            zhuliany.name = "Igor Sikorsky"
+            zhuliany.save()
+            boryspil.delete()
+
+        second = self.sync(AIRPORT_URL, first["token"], self.at(200))
+        self.assertEqual(
+            [airport["name"] for airport in second["results"]],
+            ["Igor Sikorsky", "Lviv"],
+        )
+        self.assertEqual(second["deleted"], [boryspil_id])
+
+        third = self.sync(AIRPORT_URL, second["token"], self.at(300))
+        self.assertEqual(third["results"], [])
+        self.assertEqual(third["deleted"], [])
+
+    def test_recent_changes_wait_for_next_token(self):
+        self.create_airport("Boryspil", self.at(0))
+
+        data = self.sync(AIRPORT_URL, "0", self.at(1))
+
+        self.assertEqual(data["results"], [])
+        data = self.sync(AIRPORT_URL, data["token"], self.at(60))
+        self.assertEqual(len(data["results"]), 1)
+
+    def test_crew_change_marks_flight_updated(self):
+        flight = sample_flight()
+        Flight.objects.filter(pk=flight.pk).update(updated_at=self.at(-3600))
+        token = make_token(self.at(-60))
+
+        self.assertEqual(self.sync(FLIGHT_URL, token, self.now)["results"], [])
+        with mock.patch("django.utils.timezone.now", return_value=self.at(-30)):
+            flight.crew.add(Crew.objects.create(first_name="Anna", last_name="Melnyk"))
+
+        data = self.sync(FLIGHT_URL, token, self.now)
+        self.assertEqual([row["id"] for row in data["results"]], [flight.id])
+
+    def test_booking_and_release_mark_flight_updated(self):
+        flight = sample_flight()
+        Flight.objects.filter(pk=flight.pk).update(updated_at=self.at(-3600))
+        token = make_token(self.at(-60))
+        serializer = OrderSerializer(
+            data={"tickets": [
+                {"flight": flight.id, "row": 1, "seat": seat} for seat in (1, 2)
+            ]}
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with mock.patch("django.utils.timezone.now", return_value=self.at(-30)):
+            with CaptureQueriesContext(connection) as queries:
+                with self.captureOnCommitCallbacks(execute=True):
+                    order = serializer.save(user=self.user)
+        flight_updates = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "airport_flight"')
+        ]
+        self.assertEqual(len(flight_updates), 1)
+        data = self.sync(FLIGHT_URL, token, self.now)
+        self.assertEqual([row["id"] for row in data["results"]], [flight.id])
+
+        token = data["token"]
+        self.assertEqual(self.sync(FLIGHT_URL, token, self.at(60))["results"], [])
+        with mock.patch("django.utils.timezone.now", return_value=self.at(90)):
+            with self.captureOnCommitCallbacks(execute=True):
+                order.tickets.first().delete()
+        data = self.sync(FLIGHT_URL, token, self.at(200))
+        self.assertEqual([row["id"] for row in data["results"]], [flight.id])
+
+        token = data["token"]
+        with mock.patch("django.utils.timezone.now", return_value=self.at(300)):
+            with self.captureOnCommitCallbacks(execute=True):
+                order.delete()
+        data = self.sync(FLIGHT_URL, token, self.at(400))
+        self.assertEqual([row["id"] for row in data["results"]], [flight.id])
+
+    def test_airport_rename_marks_rows_showing_it_updated(self):
+        flight = sample_flight()
+        destination = flight.route.destination
+        back = sample_route(
+            source=Airport.objects.create(name="Lviv", closest_big_city="Lviv"),
+            destination=flight.route.source,
+        )
+        unrelated = self.create_airport("Odesa", self.at(-3600))
+        for model in (Airport, Route, Flight):
+            model.objects.update(updated_at=self.at(-3600))
+        token = make_token(self.at(-60))
+
+        with mock.patch("django.utils.timezone.now", return_value=self.at(-30)):
+            destination.name = "Chopin"
+            destination.save()
+
+        flights = self.sync(FLIGHT_URL, token, self.now)["results"]
+        routes = self.sync(ROUTE_URL, token, self.now)["results"]
+        airports = self.sync(AIRPORT_URL, token, self.now)["results"]
+        self.assertEqual([row["id"] for row in flights], [flight.id])
+        self.assertEqual([row["id"] for row in routes], [flight.route_id])
+        self.assertEqual(
+            sorted(row["id"] for row in airports),
+            sorted([destination.id, flight.route.source_id]),
+        )
+        self.assertNotIn(back.id, [row["id"] for row in routes])
+        self.assertNotIn(unrelated.id, [row["id"] for row in airports])
+
+    def test_only_renames_touch_rows_and_not_departed_flights(self):
+        upcoming = sample_flight(
+            departure_time=self.at(86400), arrival_time=self.at(90000)
+        )
+        departed = sample_flight(
+            route=upcoming.route,
+            departure_time=self.at(-86400),
+            arrival_time=self.at(-80000),
+        )
+        destination = upcoming.route.destination
+        for model in (Airport, Route, Flight):
+            model.objects.update(updated_at=self.at(-3600))
+        token = make_token(self.at(-60))
+
+        with mock.patch("django.utils.timezone.now", return_value=self.at(-30)):
+            destination.latitude, destination.longitude = 50.45, 30.52
+            destination.save()
+        self.assertEqual(self.sync(ROUTE_URL, token, self.now)["results"], [])
+
+        with mock.patch("django.utils.timezone.now", return_value=self.at(-30)):
+            destination.closest_big_city = "Warszawa"
+            destination.save()
+        flights = self.sync(FLIGHT_URL, token, self.now)["results"]
+        self.assertEqual([row["id"] for row in flights], [upcoming.id])
+        self.assertNotIn(departed.id, [row["id"] for row in flights])
+
+    def test_cascaded_deletes_leave_tombstones(self):
+        flight = sample_flight()
+
+        flight.route.source.delete()
+
+        self.assertEqual(
+            set(Tombstone.objects.values_list("model", "object_id")),
+            {
+                ("airport", flight.route.source_id),
+                ("route", flight.route_id),
+                ("flight", flight.id),
+            },
+        )
+
+    def test_invalid_and_expired_tokens(self):
+        res = self.client.get(AIRPORT_URL, {"updated_since": "yesterday"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        expired = make_token(self.now - timedelta(days=365))
+        res = self.client.get(AIRPORT_URL, {"updated_since": expired})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,173 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Airport, Flight
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_order, sample_route
+from airport.tests.test_recurring_flights import sample_schedule
+
+FLIGHT_URL = reverse("airport:flight-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def ids(res):
+    return sorted(flight["id"] for flight in res.data)
+
+
+class FlightFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+        self.departure = datetime(2030, 1, 1, 23, 30, tzinfo=dt_timezone.utc)
+        self.late = sample_flight(
+            departure_time=self.departure,
+            arrival_time=self.departure + timedelta(hours=2),
+        )
+        self.early = sample_flight(
+            departure_time=self.departure + timedelta(hours=1),
+            arrival_time=self.departure + timedelta(hours=3),
+        )
+        self.other = sample_flight(
+            departure_time=self.departure + timedelta(days=3),
+            arrival_time=self.departure + timedelta(days=3, hours=2),
+        )
+
+    def test_ids_list(self):
+        airplanes = f"{self.late.airplane_id},{self.other.airplane_id}"
+
+        res = self.client.get(FLIGHT_URL, {"airplane": airplanes})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids(res), [self.late.id, self.other.id])
+        res = self.client.get(FLIGHT_URL, {"route": self.early.route_id})
+        self.assertEqual(ids(res), [self.early.id])
+
+    def test_malformed_values_are_bad_requests(self):
+        for params in (
+            {"airplane": "1,x"},
+            {"route": "0"},
+            {"source": ",".join(str(i) for i in range(1, 102))},
+            {"airplane": "99999999999999999999999"},
+            {"departure_time": "01.01.2030"},
+            {"departure_after": "tomorrow"},
+        ):
+            res = self.client.get(FLIGHT_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
+            self.assertIn(next(iter(params)), res.data)
+
+    def test_departure_day_is_half_open_range(self):
+        res = self.client.get(FLIGHT_URL, {"departure_time": "2030-01-01"})
+        self.assertEqual(ids(res), [self.late.id])
+
+        res = self.client.get(FLIGHT_URL, {"departure_time": "2030-01-02"})
+        self.assertEqual(ids(res), [self.early.id])
+
+        res = self.client.get(FLIGHT_URL, {"arrival_time": "2030-01-02"})
+        self.assertEqual(ids(res), [self.late.id, self.early.id])
+
+    def test_departure_after_and_before(self):
+        res = self.client.get(
+            FLIGHT_URL,
+            {
+                "departure_after": self.departure.isoformat(),
+                "departure_before": "2030-01-03",
+            },
+        )
+        self.assertEqual(ids(res), [self.late.id, self.early.id])
+
+        res = self.client.get(
+            FLIGHT_URL,
+            {"departure_before": self.early.departure_time.isoformat()},
+        )
+        self.assertEqual(ids(res), [self.late.id])
+
+    def test_source_and_destination(self):
+        airport = Airport.objects.create(name="Heathrow", closest_big_city="London")
+        flight = sample_flight(
+            route=sample_route(destination=airport),
+            airplane=self.late.airplane,
+        )
+
+        res = self.client.get(FLIGHT_URL, {"destination": airport.id})
+        self.assertEqual(ids(res), [flight.id])
+
+        res = self.client.get(
+            FLIGHT_URL,
+            {"source": f"{self.late.route.source_id},{flight.route.source_id}"},
+        )
+        self.assertEqual(ids(res), [self.late.id, flight.id])
+
+    def test_filters_virtual_departures(self):
+        schedule = sample_schedule()
+        day = schedule.valid_from + timedelta(days=2)
+
+        res = self.client.get(
+            FLIGHT_URL,
+            {
+                "include_virtual": "true",
+                "departure_time": day.isoformat(),
+                "source": schedule.route.source_id,
+            },
+        )
+
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]["schedule"], schedule.id)
+        res = self.client.get(
+            FLIGHT_URL,
+            {"include_virtual": "true", "airplane": self.late.airplane_id},
+        )
+        self.assertEqual(ids(res), [self.late.id])
+
+    def test_departure_range_uses_index(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Checks SQLite's query plan.")
+        queryset = Flight.objects.filter(
+            departure_time__gte=self.departure,
+            departure_time__lt=self.departure + timedelta(days=1),
+        )
+
+        self.assertRegex(queryset.explain(), r"SEARCH airport_flight USING .*INDEX")
+
+
+class OrderFilterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_filter_by_flights(self):
+        airplane = sample_airplane()
+        first = sample_flight(airplane=airplane)
+        second = sample_flight(
+            airplane=airplane,
+            departure_time=first.departure_time + timedelta(days=1),
+            arrival_time=first.arrival_time + timedelta(days=1),
+        )
+        order = sample_order(self.user, first, seats=((1, 1), (1, 2)))
+        sample_order(self.user, second)
+
+        res = self.client.get(ORDER_URL, {"flight": first.id})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([o["id"] for o in res.data["results"]], [order.id])
+        res = self.client.get(ORDER_URL, {"flight": f"{first.id},{second.id}"})
+        self.assertEqual(len(res.data["results"]), 2)
@@ -0,0 +1,198 @@
+import random
+from datetime import datetime, timedelta, timezone
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, SimpleTestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.admin import FlightAdminForm
+from airport.intervals import IntervalTree
+from airport.models import Crew
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+FLIGHT_URL = reverse("airport:flight-list")
+VALIDATE_SCHEDULE_URL = reverse("airport:flight-validate-schedule")
+START = datetime(2030, 1, 1, 8, tzinfo=timezone.utc)
+
+
+def at(hours):
+    return (START + timedelta(hours=hours)).isoformat()
+
+
+class IntervalTreeTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(1)
+        intervals = []
+        for key in range(200):
+            start = rng.randint(0, 1000)
+            intervals.append((start, start + rng.randint(1, 50), key))
+        tree = IntervalTree(intervals)
+
+        for _ in range(200):
+            start = rng.randint(-10, 1010)
+            end = start + rng.randint(1, 60)
+            expected = sorted(
+                key for interval_start, interval_end, key in intervals
+                if interval_start < end and interval_end > start
+            )
+            self.assertEqual(sorted(tree.overlapping(start, end)), expected)
+
+    def test_touching_intervals_do_not_overlap(self):
+        tree = IntervalTree([(0, 10, "a")])
+
+        self.assertEqual(tree.overlapping(10, 20), [])
+        self.assertEqual(tree.overlapping(-5, 0), [])
+
+
+class FlightScheduleConflictTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "admin@admin.com", "testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.route = sample_route()
+        self.airplane = sample_airplane()
+        self.pilot = Crew.objects.create(first_name="Anna", last_name="Melnyk")
+        self.flight = sample_flight(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=START,
+            arrival_time=START + timedelta(hours=2),
+        )
+        self.flight.crew.add(self.pilot)
+
+    def payload(self, departure, arrival, **params):
+        defaults = {
+            "route": self.route.id,
+            "airplane": sample_airplane(name="Spare").id,
+            "departure_time": at(departure),
+            "arrival_time": at(arrival),
+            "crew": [],
+        }
+        defaults.update(params)
+        return defaults
+
+    def test_create_flight_with_busy_airplane(self):
+        res = self.client.post(
+            FLIGHT_URL, self.payload(1, 3, airplane=self.airplane.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("airplane", res.data)
+
+    def test_create_flight_with_busy_crew(self):
+        res = self.client.post(FLIGHT_URL, self.payload(1, 3, crew=[self.pilot.id]))
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("crew", res.data)
+
+    def test_create_back_to_back_flight(self):
+        res = self.client.post(
+            FLIGHT_URL,
+            self.payload(2, 4, airplane=self.airplane.id, crew=[self.pilot.id]),
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_update_flight_does_not_conflict_with_itself(self):
+        res = self.client.patch(
+            reverse("airport:flight-detail", args=[self.flight.id]),
+            {"arrival_time": at(3)},
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_admin_form_refuses_busy_crew(self):
+        other = sample_flight(
+            route=self.route,
+            airplane=sample_airplane(name="Spare"),
+            departure_time=START + timedelta(hours=1),
+            arrival_time=START + timedelta(hours=3),
+        )
+        data = {
+            "route": self.route.id,
+            "airplane": other.airplane_id,
+            "departure_time": other.departure_time,
+            "arrival_time": other.arrival_time,
+            "crew": [self.pilot.id],
+        }
+
+        form = FlightAdminForm(data, instance=other)
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("crew", form.errors)
+        self.assertTrue(FlightAdminForm({**data, "crew": []}, instance=other).is_valid())
+
+    def test_overlapping_flights_are_listed_before_adding_constraint(self):
+        sample_flight(
+            route=self.route,
+            airplane=self.airplane,
+            departure_time=START + timedelta(hours=1),
+            arrival_time=START + timedelta(hours=3),
+        )
+        migration = import_module("airport.migrations.0007_flight_airplane_no_overlap")
+
+        overlaps = migration.overlapping_flights(connection)
+
+        self.assertEqual(len(overlaps), 1)
+        self.assertEqual(overlaps[0][:2], (self.airplane.id, self.flight.id))
+
+    def test_validate_schedule(self):
+        res = self.client.post(
+            VALIDATE_SCHEDULE_URL,
+            {
+                "flights": [
+                    {
+                        "airplane": self.airplane.id,
+                        "departure_time": at(1),
+                        "arrival_time": at(3),
+                    },
+                    {
+                        "airplane": 999,
+                        "crew": [self.pilot.id, 998],
+                        "departure_time": at(5),
+                        "arrival_time": at(7),
+                    },
+                    {
+                        "airplane": 999,
+                        "crew": [998],
+                        "departure_time": at(6),
+                        "arrival_time": at(8),
+                    },
+                ]
+            },
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(res.data["valid"])
+        conflicts = {
+            (conflict["index"], conflict["resource"], conflict["flight"], conflict["proposal"])
+            for conflict in res.data["conflicts"]
+        }
+        self.assertEqual(
+            conflicts,
+            {
+                (0, "airplane", self.flight.id, None),
+                (1, "airplane", None, 2),
+                (1, "crew", None, 2),
+                (2, "airplane", None, 1),
+                (2, "crew", None, 1),
+            },
+        )
+
+    def test_validate_schedule_requires_admin(self):
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        res = self.client.post(VALIDATE_SCHEDULE_URL, {"flights": []}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,70 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from airport.models import Airport, Airplane, Flight, Route, Ticket
+
+
+def generate(**options):
+    defaults = {
+        "seed": 7,
+        "airports": 12,
+        "airplanes": 4,
+        "crew": 20,
+        "users": 10,
+        "days": 3,
+        "start": "2030-01-01",
+        "chunk_size": 5,
+    }
+    defaults.update(options)
+    call_command("generate_data", stdout=StringIO(), **defaults)
+
+
+class GenerateDataCommandTests(TestCase):
+    def test_generates_requested_dataset(self):
+        generate()
+
+        self.assertEqual(Airport.objects.count(), 12)
+        self.assertEqual(Airplane.objects.count(), 4)
+        self.assertTrue(Route.objects.exists())
+        self.assertTrue(Flight.objects.exists())
+        self.assertTrue(Ticket.objects.exists())
+
+    def test_airplanes_are_never_double_booked(self):
+        generate()
+
+        for airplane in Airplane.objects.all():
+            flights = list(
+                airplane.flights.order_by("departure_time")
+                .select_related("route")
+            )
+            for previous, current in zip(flights, flights[1:]):
+                self.assertGreater(
+                    current.departure_time, previous.arrival_time
+                )
+                self.assertEqual(
+                    current.route.source_id, previous.route.destination_id
+                )
+
+    def test_load_factor_limits_sold_seats(self):
+        generate(load_factor=0)
+
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_same_seed_produces_same_schedule(self):
+        def snapshot():
+            return [
+                (flight.route.distance, flight.departure_time,
+                 flight.arrival_time)
+                for flight in Flight.objects.select_related("route")
+                .order_by("id")
+            ]
+
+        generate()
+        first = snapshot()
+        Airport.objects.all().delete()
+        Airplane.objects.all().delete()
+        generate()
+
+        self.assertEqual(first, snapshot())
@@ -0,0 +1,88 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import IdempotencyKey, Order, Ticket
+from airport.tests.test_order_api import sample_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+class IdempotentOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def order(self, key, row=1, seat=1):
+        return self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": row, "seat": seat, "flight": self.flight.id}]},
+            format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.order("retry-1")
+
+        with self.assertNumQueries(1):
+            retry = self.order("retry-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_key_reused_for_different_request(self):
+        self.order("retry-1")
+
+        res = self.order("retry-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+    def test_failed_request_can_be_retried(self):
+        res = self.order("retry-1", row=999)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        res = self.order("retry-1", row=999)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keys_are_per_user(self):
+        self.order("retry-1")
+        self.client.force_authenticate(
+            get_user_model().objects.create_user("other@test.com", "testpass")
+        )
+
+        res = self.order("retry-1", seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_expire_old_keys(self):
+        self.order("old")
+        self.order("new", seat=2)
+        IdempotencyKey.objects.filter(key="old").update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        call_command("expire_idempotency_keys", stdout=StringIO())
+
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"]
+        )
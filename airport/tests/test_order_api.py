@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Airport, Crew, Flight, Order, Route, Ticket
+from airport.tests.test_airplane_api import sample_airplane
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def sample_route(**params):
+    defaults = {
+        "source": Airport.objects.create(name="Boryspil", closest_big_city="Kyiv"),
+        "destination": Airport.objects.create(name="Okecie", closest_big_city="Warsaw"),
+        "distance": 690,
+    }
+    defaults.update(params)
+
+    return Route.objects.create(**defaults)
+
+
+def sample_flight(**params):
+    departure_time = datetime(2030, 1, 1, 8, tzinfo=timezone.utc)
+    defaults = {
+        "route": sample_route(),
+        "airplane": sample_airplane(),
+        "departure_time": departure_time,
+        "arrival_time": departure_time + timedelta(hours=2),
+    }
+    defaults.update(params)
+
+    return Flight.objects.create(**defaults)
+
+
+def sample_order(user, flight, seats=((1, 1),)):
+    order = Order.objects.create(user=user)
+    for row, seat in seats:
+        Ticket.objects.create(order=order, flight=flight, row=row, seat=seat)
+    return order
+
+
+class OrderHistoryApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_list_contains_only_own_orders(self):
+        flight = sample_flight()
+        sample_order(self.user, flight)
+        other = get_user_model().objects.create_user("other@test.com", "testpass")
+        sample_order(other, flight, seats=((2, 2),))
+
+        res = self.client.get(ORDER_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["count"], 1)
+
+    def test_list_reports_flight_availability(self):
+        flight = sample_flight()
+        flight.crew.add(
+            Crew.objects.create(first_name="Anna", last_name="Melnyk"),
+            Crew.objects.create(first_name="Ivan", last_name="Boyko"),
+        )
+        sample_order(self.user, flight, seats=((1, 1), (1, 2)))
+        sample_order(self.user, flight, seats=((3, 1),))
+
+        res = self.client.get(ORDER_URL)
+
+        for order in res.data["results"]:
+            for ticket in order["tickets"]:
+                self.assertEqual(
+                    ticket["flight"]["tickets_available"],
+                    flight.airplane.capacity - 3,
+                )
+                self.assertEqual(ticket["flight"]["number_of_crew"], 2)
+
+    def test_query_count_does_not_grow_with_history(self):
+        route = sample_route()
+        for index in range(2):
+            sample_order(self.user, sample_flight(route=route))
+
+        # The first request loads the new airports and airplanes into the
+        # reference cache.
+        self.client.get(ORDER_URL)
+        with self.assertNumQueries(5):
+            self.client.get(ORDER_URL)
+
+        for index in range(8):
+            sample_order(
+                self.user,
+                sample_flight(route=route),
+                seats=((1, 1), (2, 2)),
+            )
+
+        self.client.get(ORDER_URL)
+        with self.assertNumQueries(5):
+            self.client.get(ORDER_URL)
@@ -0,0 +1,189 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Flight, FlightSchedule
+from airport.recurring import VIRTUAL_DAYS
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+FLIGHT_URL = reverse("airport:flight-list")
+FLIGHT_SCHEDULE_URL = reverse("airport:flightschedule-list")
+ORDER_URL = reverse("airport:order-list")
+
+
+def materialize_url(schedule_id):
+    return reverse("airport:flightschedule-materialize", args=[schedule_id])
+
+
+def sample_schedule(**params):
+    today = timezone.now().date()
+    defaults = {
+        "route": sample_route(),
+        "airplane": sample_airplane(),
+        "departure_time": time(8, 15),
+        "duration": timedelta(hours=2),
+        "weekdays": "1234567",
+        "valid_from": today + timedelta(days=1),
+        "valid_until": today + timedelta(days=60),
+    }
+    defaults.update(params)
+
+    return FlightSchedule.objects.create(**defaults)
+
+
+def materialize(days):
+    call_command("materialize_flights", days=days, stdout=StringIO())
+
+
+class MaterializeFlightsCommandTests(TestCase):
+    def test_materializes_rolling_horizon_once(self):
+        schedule = sample_schedule()
+
+        materialize(7)
+        materialize(7)
+
+        self.assertEqual(schedule.flights.count(), 7)
+        schedule.refresh_from_db()
+        self.assertEqual(
+            schedule.materialized_until, timezone.now().date() + timedelta(days=7)
+        )
+
+    def test_respects_weekdays(self):
+        schedule = sample_schedule(weekdays="1")
+
+        materialize(14)
+
+        self.assertEqual(schedule.flights.count(), 2)
+        for flight in schedule.flights.all():
+            self.assertEqual(flight.departure_time.isoweekday(), 1)
+
+    def test_skips_departures_with_busy_airplane(self):
+        schedule = sample_schedule()
+        departure_time = datetime.combine(
+            schedule.valid_from, time(8), tzinfo=dt_timezone.utc
+        )
+        sample_flight(
+            airplane=schedule.airplane,
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=1),
+        )
+
+        materialize(3)
+
+        self.assertEqual(schedule.flights.count(), 2)
+
+
+class FlightScheduleApiTests(TestCase):
+    def setUp(self):
+        # Throttle counters live in the cache and outlive each test's
+        # rollback, while the user ids they are keyed by get reused.
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.schedule = sample_schedule()
+
+    def test_create_schedule_forbidden(self):
+        res = self.client.post(FLIGHT_SCHEDULE_URL, {})
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_flight_list_includes_virtual_departures(self):
+        materialize(7)
+
+        res = self.client.get(FLIGHT_URL, {"include_virtual": "true"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        concrete = [flight for flight in res.data if flight["id"]]
+        virtual = [flight for flight in res.data if flight["id"] is None]
+        self.assertEqual(len(concrete), 7)
+        self.assertEqual(len(virtual), 53)
+        self.assertTrue(
+            all(flight["schedule"] == self.schedule.id for flight in res.data)
+        )
+        self.assertEqual(len(self.client.get(FLIGHT_URL).data), 7)
+
+    def book(self, day, seat=1):
+        ticket = {
+            "row": 1,
+            "seat": seat,
+            "schedule": self.schedule.id,
+            "departure_date": day,
+        }
+        return self.client.post(ORDER_URL, {"tickets": [ticket]}, format="json")
+
+    def test_materialize_departure_on_first_booking(self):
+        day = self.schedule.valid_from + timedelta(days=30)
+
+        res = self.book(day)
+        again = self.book(day, seat=2)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(again.status_code, status.HTTP_201_CREATED)
+        flight = Flight.objects.get()
+        self.assertEqual(flight.departure_time.date(), day)
+        self.assertEqual(flight.tickets.count(), 2)
+
+        res = self.client.get(FLIGHT_URL, {"include_virtual": "true"})
+        self.assertEqual(len(res.data), 60)
+        res = self.book(day)
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat", res.data)
+
+    def test_booking_needs_flight_or_departure(self):
+        res = self.client.post(
+            ORDER_URL,
+            {"tickets": [{"row": 1, "seat": 1, "schedule": self.schedule.id}]},
+            format="json",
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_booking_day_outside_schedule_or_window(self):
+        today = timezone.now().date()
+        sample_schedule(
+            route=self.schedule.route,
+            airplane=self.schedule.airplane,
+            valid_from=today - timedelta(days=30),
+            valid_until=today + timedelta(days=400),
+        )
+        for day in (
+            self.schedule.valid_until + timedelta(days=1),
+            today - timedelta(days=1),
+            today + timedelta(days=VIRTUAL_DAYS + 1),
+        ):
+            res = self.book(day)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, day)
+        self.assertFalse(Flight.objects.exists())
+
+    def test_materialize_is_admin_only_and_bounded(self):
+        day = self.schedule.valid_from + timedelta(days=30)
+        res = self.client.post(materialize_url(self.schedule.id), {"date": day})
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.post(materialize_url(self.schedule.id), {"date": day})
+        again = self.client.post(materialize_url(self.schedule.id), {"date": day})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["id"], again.data["id"])
+
+        far = timezone.now().date() + timedelta(days=VIRTUAL_DAYS + 1)
+        res = self.client.post(materialize_url(self.schedule.id), {"date": far})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Flight.objects.count(), 1)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.checks import check_shared_cache
+from airport.models import Airport, AirplaneType, Crew
+from airport.reference import VERSION_CACHE_KEY, reference_cache
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight
+
+FLIGHT_URL = reverse("airport:flight-list")
+
+
+def flight_detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+class ReferenceCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reference_cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user("test@test.com", "testpass")
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane(name="Boeing #1"))
+        self.flight.crew.add(Crew.objects.create(first_name="Anna", last_name="Melnyk"))
+
+    def test_flight_queries_do_not_join_reference_tables(self):
+        self.client.get(FLIGHT_URL)
+        self.client.get(flight_detail_url(self.flight.id))
+
+        with CaptureQueriesContext(connection) as queries:
+            flights = self.client.get(FLIGHT_URL)
+            detail = self.client.get(flight_detail_url(self.flight.id))
+
+        self.assertEqual(flights.data[0]["route"]["source"], "Boryspil")
+        self.assertEqual(flights.data[0]["airplane_name"], "Boeing #1")
+        self.assertEqual(flights.data[0]["tickets_available"], 40)
+        self.assertEqual(detail.data["airplane"]["airplane_type"], "Sample airplane type")
+        self.assertEqual(detail.data["crew"][0]["full_name"], "Anna Melnyk")
+        for query in queries.captured_queries:
+            self.assertNotIn('"airport_airport"', query["sql"])
+            self.assertNotIn('"airport_airplane"', query["sql"])
+            self.assertNotIn('"airport_airplanetype"', query["sql"])
+
+    def test_local_changes_are_visible_at_once(self):
+        self.client.get(FLIGHT_URL)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            source = Airport.objects.get(id=self.flight.route.source_id)
+            source.name = "Kyiv International"
+            source.save()
+
+        self.assertEqual(
+            self.client.get(FLIGHT_URL).data[0]["route"]["source"], "Kyiv International"
+        )
+
+    def test_other_processes_changes_reload_after_version_bump(self):
+        self.client.get(FLIGHT_URL)
+        AirplaneType.objects.filter(id=self.flight.airplane.airplane_type_id).update(
+            name="Renamed elsewhere"
+        )
+
+        # What reference_cache.changed() does in the other process.
+        cache.set(VERSION_CACHE_KEY, cache.get(VERSION_CACHE_KEY, 0) + 1)
+        reference_cache._checked_at = 0.0
+        response = self.client.get(flight_detail_url(self.flight.id))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["airplane"]["airplane_type"], "Renamed elsewhere")
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    def test_warns_about_process_local_cache(self):
+        local = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+        shared = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache"}}
+
+        with override_settings(CACHES=local):
+            self.assertEqual([w.id for w in check_shared_cache(None)], ["airport.W001"])
+        with override_settings(CACHES=shared):
+            self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,152 @@
+from datetime import date, datetime, timedelta, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.archive import archive_flights
+from airport.models import RouteDailyStats
+from airport.serializers import OrderSerializer
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+ROUTE_STATS_URL = reverse("airport:routedailystats-list")
+DAY = date(2030, 1, 1)
+
+
+def stats_rows():
+    return list(
+        RouteDailyStats.objects.order_by("date", "route_id").values_list(
+            "route_id", "date", "flights", "capacity", "tickets_sold"
+        )
+    )
+
+
+class RouteStatsTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            "admin@admin.com", "testpass"
+        )
+        self.route = sample_route()
+
+    def flight(self, day=DAY, hour=8):
+        departure_time = datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc)
+        with self.captureOnCommitCallbacks(execute=True):
+            return sample_flight(
+                route=self.route,
+                airplane=sample_airplane(),
+                departure_time=departure_time,
+                arrival_time=departure_time + timedelta(hours=2),
+            )
+
+    def book(self, flight, *seats):
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"flight": flight.id, "row": 1, "seat": seat} for seat in seats
+                ]
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            return serializer.save(user=self.user)
+
+    def test_incremental_updates(self):
+        first = self.flight()
+        second = self.flight(hour=12)
+        self.book(first, 1, 2)
+        order = self.book(second, 1)
+        capacity = first.airplane.capacity
+
+        self.assertEqual(
+            stats_rows(), [(self.route.id, DAY, 2, 2 * capacity, 3)]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            order.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            first.departure_time += timedelta(days=1)
+            first.arrival_time += timedelta(days=1)
+            first.save()
+
+        self.assertEqual(
+            stats_rows(),
+            [
+                (self.route.id, DAY, 1, capacity, 0),
+                (self.route.id, DAY + timedelta(days=1), 1, capacity, 2),
+            ],
+        )
+
+    def test_order_counts_tickets_with_one_update_per_row(self):
+        first = self.flight()
+        second = self.flight(hour=12)
+        serializer = OrderSerializer(
+            data={
+                "tickets": [
+                    {"flight": flight.id, "row": 1, "seat": seat}
+                    for flight in (first, second)
+                    for seat in (1, 2)
+                ]
+            }
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                serializer.save(user=self.user)
+
+        updates = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "airport_routedailystats"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(stats_rows()[0][-1], 4)
+
+    def test_backfill_matches_incremental_and_keeps_archived_flights(self):
+        self.book(self.flight(), 1, 2, 3)
+        self.book(self.flight(DAY + timedelta(days=3)), 1)
+        incremental = stats_rows()
+
+        archive_flights(datetime(2030, 1, 2, tzinfo=timezone.utc))
+        RouteDailyStats.objects.all().delete()
+        call_command("backfill_route_stats", stdout=StringIO())
+
+        self.assertEqual(stats_rows(), incremental)
+
+    def test_stats_endpoint(self):
+        self.book(self.flight(), 1)
+        self.book(self.flight(DAY + timedelta(days=10)), 1, 2)
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        with self.assertNumQueries(2):
+            res = client.get(
+                ROUTE_STATS_URL,
+                {"date_from": "2030-01-05", "date_to": "2030-01-31"},
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 1)
+        row = res.data["results"][0]
+        self.assertEqual(row["tickets_sold"], 2)
+        self.assertAlmostEqual(row["load_factor"], 2 / row["capacity"])
+
+        res = client.get(ROUTE_STATS_URL, {"date_from": "tomorrow"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_stats_endpoint_for_admins_only(self):
+        client = APIClient()
+        client.force_authenticate(
+            get_user_model().objects.create_user("test@test.com", "testpass")
+        )
+
+        res = client.get(ROUTE_STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,91 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from airport_service.schema import code_version, schema_store
+
+SCHEMA_URL = reverse("schema")
+
+
+class PrecomputedSchemaTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+
+        overridden = override_settings(OPENAPI_SCHEMA_DIR=self.directory)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        schema_store.clear()
+        self.addCleanup(schema_store.clear)
+
+    def test_serves_stored_schema_with_etag(self):
+        response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/vnd.oai.openapi+json; charset=utf-8")
+        self.assertIn("/api/airport/flight/", json.loads(response.content)["paths"])
+        self.assertEqual(
+            (self.directory / code_version() / "schema.json").read_bytes(), response.content
+        )
+
+        cached = self.client.get(
+            SCHEMA_URL, {"format": "json"}, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+        yaml = self.client.get(SCHEMA_URL)
+        self.assertTrue(yaml.content.startswith(b"openapi: 3"))
+        self.assertNotEqual(yaml["ETag"], response["ETag"])
+
+    def test_gzip_for_clients_that_accept_it(self):
+        plain = self.client.get(SCHEMA_URL)
+        compressed = self.client.get(SCHEMA_URL, HTTP_ACCEPT_ENCODING="br, gzip")
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+        self.assertNotEqual(compressed["ETag"], plain["ETag"])
+
+    def test_reads_stored_files_instead_of_generating(self):
+        built = self.client.get(SCHEMA_URL).content
+        schema_store.clear()
+
+        with mock.patch("drf_spectacular.generators.SchemaGenerator") as generator:
+            self.assertEqual(self.client.get(SCHEMA_URL).content, built)
+
+        generator.assert_not_called()
+
+    def test_rebuilds_for_new_code_version(self):
+        self.client.get(SCHEMA_URL)
+        old_version = code_version()
+        schema_store.clear()
+
+        with override_settings(OPENAPI_SCHEMA_VERSION="release-2"):
+            new_version = code_version()
+            with mock.patch(
+                "drf_spectacular.generators.SchemaGenerator.get_schema",
+                return_value={"openapi": "3.0.3", "paths": {}},
+            ):
+                response = self.client.get(SCHEMA_URL, {"format": "json"})
+
+        self.assertEqual(json.loads(response.content)["paths"], {})
+        self.assertNotEqual(new_version, old_version)
+        self.assertEqual([path.name for path in self.directory.iterdir()], [new_version])
+
+    def test_documentation_points_at_stored_schema(self):
+        for name in ("swagger-ui", "redoc"):
+            response = self.client.get(reverse(name))
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertContains(response, SCHEMA_URL)
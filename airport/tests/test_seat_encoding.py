@@ -0,0 +1,102 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.seat_encoding import encode_bitmap, encode_rle
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_order
+
+PLACES = [(2, 4), (1, 1), (3, 6), (2, 3)]
+
+
+def detail_url(flight_id):
+    return reverse("airport:flight-detail", args=[flight_id])
+
+
+def decode_bitmap(seat_map):
+    taken = base64.b64decode(seat_map["data"])
+    return [
+        bool(taken[index // 8] >> (7 - index % 8) & 1)
+        for index in range(seat_map["rows"] * seat_map["seats_in_row"])
+    ]
+
+
+def decode_rle(seat_map):
+    is_taken = []
+    for position, length in enumerate(seat_map["data"]):
+        is_taken += [position % 2 == 1] * length
+    return is_taken
+
+
+def expected(rows, seats_in_row, places):
+    indexes = {(row - 1) * seats_in_row + seat - 1 for row, seat in places}
+    return [index in indexes for index in range(rows * seats_in_row)]
+
+
+class SeatEncodingTests(SimpleTestCase):
+    def test_bitmap(self):
+        self.assertEqual(encode_bitmap(3, 6, PLACES), "gMBA")
+        self.assertEqual(encode_bitmap(1, 3, []), "AA==")
+
+    def test_rle(self):
+        self.assertEqual(encode_rle(3, 6, PLACES), [0, 1, 7, 2, 7, 1])
+        self.assertEqual(encode_rle(3, 6, []), [18])
+        self.assertEqual(encode_rle(2, 2, [(1, 2), (2, 1)]), [1, 2, 1])
+
+    def test_round_trip(self):
+        for rows, seats_in_row, places in (
+            (3, 6, PLACES),
+            (2, 2, [(1, 1), (1, 2), (2, 1), (2, 2)]),
+            (80, 10, [(row, seat) for row in range(1, 81, 3) for seat in (1, 2, 10)]),
+        ):
+            seat_map = {"rows": rows, "seats_in_row": seats_in_row}
+            want = expected(rows, seats_in_row, places)
+
+            bitmap = decode_bitmap({**seat_map, "data": encode_bitmap(rows, seats_in_row, places)})
+            self.assertEqual(bitmap, want)
+            rle = decode_rle({**seat_map, "data": encode_rle(rows, seats_in_row, places)})
+            self.assertEqual(rle, want)
+
+
+class FlightSeatMapApiTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(airplane=sample_airplane(rows=3, seats_in_row=6))
+        sample_order(self.user, self.flight, seats=PLACES)
+
+    def test_taken_places_by_default(self):
+        res = self.client.get(detail_url(self.flight.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["taken_places"]), 4)
+        self.assertNotIn("seat_map", res.data)
+
+    def test_compact_seat_map(self):
+        for encoding, data in (("bitmap", "gMBA"), ("rle", [0, 1, 7, 2, 7, 1])):
+            res = self.client.get(detail_url(self.flight.id), {"seat_map": encoding})
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertNotIn("taken_places", res.data)
+            self.assertEqual(
+                res.data["seat_map"],
+                {"encoding": encoding, "rows": 3, "seats_in_row": 6, "data": data},
+            )
+            self.assertEqual(res.data["id"], self.flight.id)
+
+    def test_unknown_encoding(self):
+        res = self.client.get(detail_url(self.flight.id), {"seat_map": "png"})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("seat_map", res.data)
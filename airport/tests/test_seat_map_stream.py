@@ -0,0 +1,277 @@
+import asyncio
+import json
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from airport.models import Order, Ticket
+from airport.seatmap import (
+    MAX_SEAT_HOLDS_PER_USER,
+    SeatMapBroadcaster,
+    seat_map_broadcaster,
+)
+from airport.streams import SeatMapStreamApp
+from airport.tests.test_order_api import sample_flight
+
+ORDER_URL = reverse("airport:order-list")
+
+
+def hold_url(flight_id):
+    return reverse("airport:flight-hold", args=[flight_id])
+
+
+def stream_path(flight_id):
+    return f"/api/airport/flight/{flight_id}/seats/stream/"
+
+
+async def not_found_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 404, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def parse_events(body):
+    events = []
+    for chunk in body.decode().split("\n\n"):
+        lines = dict(
+            line.split(": ", 1) for line in chunk.splitlines() if ": " in line
+        )
+        if "event" in lines:
+            events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class SeatMapBroadcasterTests(TestCase):
+    def test_slow_subscriber_overflows_to_snapshot(self):
+        broadcaster = SeatMapBroadcaster(buffer_size=2)
+
+        async def watch():
+            subscription = broadcaster.subscribe(1)
+            broadcaster.publish(1, "booked", 1, 1)
+            first = await subscription.next_events(1)
+            for seat in range(3):
+                broadcaster.publish(1, "booked", 2, seat)
+            second = await subscription.next_events(1)
+            broadcaster.unsubscribe(subscription)
+            return first, second
+
+        first, second = async_to_sync(watch)()
+
+        self.assertEqual(first, ([{"type": "booked", "row": 1, "seat": 1}], False))
+        self.assertTrue(second[1])
+        self.assertEqual(broadcaster.subscriber_count(1), 0)
+
+
+class SeatMapStreamTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight()
+
+    def test_booking_publishes_delta(self):
+        def book():
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.objects.create(
+                    order=Order.objects.create(user=self.user),
+                    flight=self.flight,
+                    row=2,
+                    seat=3,
+                )
+
+        async def watch():
+            subscription = seat_map_broadcaster.subscribe(self.flight.id)
+            try:
+                await sync_to_async(book)()
+                return await subscription.next_events(1)
+            finally:
+                seat_map_broadcaster.unsubscribe(subscription)
+
+        events, overflowed = async_to_sync(watch)()
+
+        self.assertFalse(overflowed)
+        self.assertEqual(events, [{"type": "booked", "row": 2, "seat": 3}])
+
+    def test_held_seat_cannot_be_booked_by_another_user(self):
+        res = self.client.post(hold_url(self.flight.id), {"row": 1, "seat": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        other = get_user_model().objects.create_user("other@test.com", "testpass")
+        self.client.force_authenticate(other)
+        payload = {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]}
+
+        res = self.client.post(hold_url(self.flight.id), {"row": 1, "seat": 1})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.user)
+        res = self.client.post(ORDER_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_hold_on_departed_flight(self):
+        departure_time = timezone.now() - timedelta(hours=1)
+        flight = sample_flight(
+            departure_time=departure_time,
+            arrival_time=departure_time + timedelta(hours=2),
+        )
+
+        res = self.client.post(hold_url(flight.id), {"row": 1, "seat": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("flight", res.data)
+
+    def test_holds_per_user_are_capped(self):
+        for index in range(MAX_SEAT_HOLDS_PER_USER):
+            row, seat = divmod(index, 4)
+            res = self.client.post(
+                hold_url(self.flight.id), {"row": row + 1, "seat": seat + 1}
+            )
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.post(hold_url(self.flight.id), {"row": 1, "seat": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        res = self.client.post(hold_url(self.flight.id), {"row": 9, "seat": 1})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            res = self.client.post(
+                ORDER_URL,
+                {"tickets": [{"row": 1, "seat": 1, "flight": self.flight.id}]},
+                format="json",
+            )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        res = self.client.post(hold_url(self.flight.id), {"row": 9, "seat": 1})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_hold_out_of_range_seat(self):
+        res = self.client.post(hold_url(self.flight.id), {"row": 999, "seat": 1})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def request_stream(self, flight_id, token=None, publish=(), request_messages=None):
+        """
+        Run the stream like an ASGI server: ``receive`` returns the
+        ``http.request`` messages first and ``http.disconnect`` only once
+        the client goes away.
+        """
+        if request_messages is None:
+            request_messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        app = SeatMapStreamApp(not_found_app)
+        headers = []
+        if token:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": stream_path(flight_id),
+            "headers": headers,
+        }
+
+        async def run():
+            messages = []
+            disconnect = asyncio.Event()
+            body_sent = asyncio.Event()
+
+            pending = list(request_messages)
+
+            async def receive():
+                if pending:
+                    return pending.pop(0)
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                messages.append(message)
+                if message["type"] == "http.response.body":
+                    body_sent.set()
+
+            task = asyncio.ensure_future(app(scope, receive, send))
+            await asyncio.wait_for(body_sent.wait(), 5)
+            for event in publish:
+                body_sent.clear()
+                seat_map_broadcaster.publish(flight_id, *event)
+                await asyncio.wait_for(body_sent.wait(), 5)
+            disconnect.set()
+            await asyncio.wait_for(task, 5)
+            return messages
+
+        return async_to_sync(run)()
+
+    def test_stream_sends_snapshot_then_deltas(self):
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            flight=self.flight,
+            row=1,
+            seat=1,
+        )
+        token = RefreshToken.for_user(self.user).access_token
+
+        messages = self.request_stream(
+            self.flight.id, token, publish=[("released", 1, 1)]
+        )
+
+        self.assertEqual(messages[0]["status"], 200)
+        body = b"".join(message.get("body", b"") for message in messages)
+        (snapshot_type, snapshot), delta = parse_events(body)
+        self.assertEqual(snapshot_type, "snapshot")
+        self.assertEqual(snapshot["taken_places"], [{"row": 1, "seat": 1}])
+        self.assertEqual(delta, ("released", {"type": "released", "row": 1, "seat": 1}))
+        self.assertEqual(messages[-1], {"type": "http.response.body", "body": b"", "more_body": False})
+        self.assertEqual(seat_map_broadcaster.subscriber_count(self.flight.id), 0)
+
+    def test_stream_outlives_request_body(self):
+        token = RefreshToken.for_user(self.user).access_token
+
+        messages = self.request_stream(
+            self.flight.id,
+            token,
+            publish=[("held", 1, 2), ("booked", 1, 2)],
+            request_messages=[
+                {"type": "http.request", "body": b"{", "more_body": True},
+                {"type": "http.request", "body": b"}", "more_body": False},
+            ],
+        )
+
+        body = b"".join(message.get("body", b"") for message in messages)
+        self.assertEqual(
+            [event_type for event_type, _ in parse_events(body)],
+            ["snapshot", "held", "booked"],
+        )
+        self.assertFalse(messages[-1]["more_body"])
+        self.assertEqual(seat_map_broadcaster.subscriber_count(self.flight.id), 0)
+
+    def test_stream_closes_stale_connections_around_queries(self):
+        token = RefreshToken.for_user(self.user).access_token
+
+        with mock.patch("airport.streams.close_old_connections") as close:
+            messages = self.request_stream(self.flight.id, token)
+
+        self.assertEqual(messages[0]["status"], 200)
+        # Before and after authentication and the snapshot.
+        self.assertEqual(close.call_count, 4)
+
+    def test_stream_requires_authentication(self):
+        messages = self.request_stream(self.flight.id)
+
+        self.assertEqual(messages[0]["status"], 401)
+
+    def test_stream_of_unknown_flight(self):
+        token = RefreshToken.for_user(self.user).access_token
+
+        messages = self.request_stream(999, token)
+
+        self.assertEqual(messages[0]["status"], 404)
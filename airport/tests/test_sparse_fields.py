@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from airport.models import Crew, Order, Ticket
+from airport.tests.test_airplane_api import sample_airplane
+from airport.tests.test_order_api import sample_flight, sample_route
+
+FLIGHT_URL = reverse("airport:flight-list")
+AIRPORT_URL = reverse("airport:airport-list")
+
+
+class SparseFieldsApiTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@test.com",
+            "testpass",
+        )
+        self.client.force_authenticate(self.user)
+        self.flight = sample_flight(route=sample_route(), airplane=sample_airplane())
+        self.pilot = Crew.objects.create(first_name="Anna", last_name="Melnyk")
+        self.flight.crew.add(self.pilot)
+        Ticket.objects.create(
+            order=Order.objects.create(user=self.user),
+            flight=self.flight,
+            row=1,
+            seat=1,
+        )
+
+    def get(self, url, **params):
+        # Warm the reference cache, so only the queries of the response
+        # itself are captured.
+        self.client.get(url, params)
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data, [query["sql"] for query in queries.captured_queries]
+
+    def test_narrow_fields_run_narrow_query(self):
+        data, queries = self.get(
+            FLIGHT_URL, fields="id,departure_time,route.destination"
+        )
+
+        self.assertEqual(
+            data[0],
+            {
+                "id": self.flight.id,
+                "departure_time": data[0]["departure_time"],
+                "route": {"destination": self.flight.route.destination.name},
+            },
+        )
+        flight_query = queries[-1]
+        self.assertIn("airport_route", flight_query)
+        self.assertNotIn("airport_airplane", flight_query)
+        self.assertNotIn("airport_ticket", flight_query)
+        self.assertNotIn("COUNT", flight_query)
+
+    def test_default_fields_are_unchanged(self):
+        data, _ = self.get(FLIGHT_URL)
+
+        self.assertEqual(data[0]["tickets_available"], self.flight.airplane.capacity - 1)
+        self.assertEqual(data[0]["number_of_crew"], 1)
+        self.assertNotIn("crew", data[0])
+
+    def test_expand(self):
+        data, queries = self.get(FLIGHT_URL, fields="id,crew", expand="crew")
+
+        self.assertEqual(
+            data[0],
+            {"id": self.flight.id, "crew": [{
+                "id": self.pilot.id,
+                "first_name": "Anna",
+                "last_name": "Melnyk",
+                "full_name": "Anna Melnyk",
+            }]},
+        )
+        self.assertEqual(len(queries), 2)
+
+    def test_airport_routes_are_prefetched_only_when_returned(self):
+        _, queries = self.get(AIRPORT_URL)
+        self.assertEqual(len(queries), 2)
+
+        _, queries = self.get(AIRPORT_URL, fields="id,name")
+        self.assertEqual(len(queries), 1)
+
+    def test_unknown_fields(self):
+        for params in ({"fields": "id,nope"}, {"expand": "nope"}):
+            res = self.client.get(FLIGHT_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        admin = get_user_model().objects.create_superuser("admin@admin.com", "testpass")
+        self.client.force_authenticate(admin)
+
+        res = self.client.post(f"{AIRPORT_URL}?fields=id", {}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("name", res.data)
+        self.assertIn("closest_big_city", res.data)
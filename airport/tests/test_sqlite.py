@@ -0,0 +1,69 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+
+from airport_service.sqlite import immediate_atomic
+
+PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": 2500,
+    "mmap_size": 1024 * 1024,
+}
+
+
+class HighConcurrencySqliteTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "db.sqlite3"
+
+        connections.settings["tuned"] = {
+            **connections.settings["default"],
+            "ENGINE": "airport_service.sqlite",
+            "NAME": str(self.path),
+            "OPTIONS": {"pragmas": PRAGMAS},
+        }
+        self.addCleanup(connections.settings.pop, "tuned")
+        self.connection = connections["tuned"]
+        self.addCleanup(connections.__delitem__, "tuned")
+        self.addCleanup(self.connection.close)
+        with self.connection.cursor() as cursor:
+            cursor.execute("CREATE TABLE seat (id INTEGER PRIMARY KEY)")
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_new_connections_run_pragmas(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)
+        self.assertEqual(self.pragma("busy_timeout"), 2500)
+        self.assertEqual(self.pragma("mmap_size"), 1024 * 1024)
+
+    def write_lock_is_free(self):
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        try:
+            other.execute("BEGIN IMMEDIATE")
+            other.execute("ROLLBACK")
+            return True
+        except sqlite3.OperationalError:
+            return False
+        finally:
+            other.close()
+
+    def test_immediate_atomic_takes_write_lock_up_front(self):
+        with transaction.atomic(using="tuned"):
+            self.assertTrue(self.write_lock_is_free())
+
+        with immediate_atomic(using="tuned"):
+            self.assertFalse(self.write_lock_is_free())
+            with immediate_atomic(using="tuned"):
+                self.assertFalse(self.write_lock_is_free())
+
+        self.assertTrue(self.write_lock_is_free())
+        self.assertFalse(self.connection.begin_immediate)
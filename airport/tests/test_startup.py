@@ -0,0 +1,31 @@
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from airport_service.schema import schema_store
+
+
+class ColdStartTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overridden = override_settings(OPENAPI_SCHEMA_DIR=directory.name)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+        schema_store.clear()
+        self.addCleanup(schema_store.clear)
+
+    def test_heavy_modules_are_deferred(self):
+        out = StringIO()
+
+        call_command("benchmark_startup", "--runs", "1", "--max-ms", "60000", stdout=out)
+
+        self.assertIn("401 Unauthorized", out.getvalue())
+        self.assertIn("Median cold start", out.getvalue())
+
+    def test_fails_over_target(self):
+        with self.assertRaisesMessage(CommandError, "exceeds the target of 1ms"):
+            call_command("benchmark_startup", "--runs", "1", "--max-ms", "1", stdout=StringIO())
@@ -8,7 +8,11 @@ from airport.views import (
     AirportViewSet,
     RouteViewSet,
     FlightViewSet,
+    FlightScheduleViewSet,
     OrderViewSet,
+    RouteStatsViewSet,
+    AnalyticsViewSet,
+    BatchView,
 )
 
 router = routers.DefaultRouter()
@@ -18,8 +22,14 @@ router.register("airplane", AirplaneViewSet)
 router.register("airport", AirportViewSet)
 router.register("route", RouteViewSet)
 router.register("flight", FlightViewSet)
+router.register("flight_schedule", FlightScheduleViewSet)
 router.register("orders", OrderViewSet)
+router.register("route_stats", RouteStatsViewSet)
+router.register("analytics", AnalyticsViewSet, basename="analytics")
 
-urlpatterns = [path("", include(router.urls))]
+urlpatterns = [
+    path("batch/", BatchView.as_view(), name="batch"),
+    path("", include(router.urls)),
+]
 
 app_name = "airport"
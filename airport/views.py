@@ -1,15 +1,44 @@
-from datetime import datetime
+import math
+from datetime import timedelta
 
-from django.db.models import F, Count
+from django.utils import timezone
 from drf_spectacular.types import OpenApiTypes
-from drf_spectacular.utils import extend_schema, OpenApiParameter
+from drf_spectacular.utils import (
+    extend_schema,
+    OpenApiExample,
+    OpenApiParameter,
+    PolymorphicProxySerializer,
+)
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
-
+from rest_framework.views import APIView
+
+from airport.analytics import airplane_utilization, flight_time_report, seat_heatmap
+from airport.batch import run_batch
+from airport.board import (
+    ARRIVALS,
+    BOARD_WINDOW_HOURS,
+    DEPARTURES,
+    airport_board,
+)
+from airport.coalescing import coalesced
+from airport.conflicts import find_schedule_conflicts
+from airport.filters import (
+    DateFilter,
+    DayFilter,
+    IdsFilter,
+    IntFilter,
+    QueryFilters,
+    RelatedIdsFilter,
+    TimeFilter,
+)
+from airport.geo import EARTH_RADIUS_KM, airport_geo_index
+from airport.idempotency import IDEMPOTENCY_HEADER, idempotent
 from airport.models import (
     Airport,
     Airplane,
@@ -17,9 +46,24 @@ from airport.models import (
     Crew,
     Order,
     Flight,
-    Route
+    FlightSchedule,
+    Route,
+    RouteDailyStats,
+    Ticket,
 )
+from airport.order_history import attach_flight_stats, order_history_queryset
 from airport.permissions import IsAdminOrIfAuthenticatedReadOnly
+from airport.recurring import (
+    VIRTUAL_DAYS,
+    materialize_occurrence,
+    virtual_departures,
+)
+from airport.route_stats import day_range
+from airport.search import airport_index
+from airport.seat_encoding import LIST, SEAT_MAP_ENCODINGS
+from airport.seatmap import hold_seat
+from airport.sparse import SPARSE_FIELDS_PARAMETERS, SparseFieldsViewSetMixin
+from airport.sync import UPDATED_SINCE_PARAMETER, DeltaSyncMixin
 from airport.serializers import (
     AirportSerializer,
     AirplaneSerializer,
@@ -33,11 +77,166 @@ from airport.serializers import (
     RouteReadSerializer,
     FlightListSerializer,
     FlightDetailSerializer,
+    FlightSeatMapDetailSerializer,
     AirplaneImageSerializer,
+    AirportSearchSerializer,
+    AirportNearestSerializer,
+    AirportBoardSerializer,
+    ScheduleValidationSerializer,
+    ScheduleValidationResultSerializer,
+    FlightScheduleSerializer,
+    FlightScheduleOccurrenceSerializer,
+    SeatHoldSerializer,
+    RouteDailyStatsSerializer,
+    FlightTimeReportSerializer,
+    SeatHeatmapSerializer,
+    AirplaneUtilizationSerializer,
+    BatchRequestSerializer,
+    BatchResponseSerializer,
+)
+
+AIRPORT_SEARCH_MAX_LIMIT = 50
+AIRPORT_NEAREST_MAX_LIMIT = 50
+AIRPORT_BOARD_MAX_LIMIT = 50
+ANALYTICS_DEFAULT_DAYS = 30
+ANALYTICS_MAX_BINS = 200
+
+AIRPLANE_FILTERS = QueryFilters(
+    airplane_type=IdsFilter(
+        "airplane_type_id", "Filter by airplane_type ids (ex. ?airplane_type=2,3)"
+    ),
+)
+ROUTE_FILTERS = QueryFilters(
+    source=IdsFilter("source_id", "Filter by source (Airport) ids (ex. ?source=2,5)"),
+    destination=IdsFilter(
+        "destination_id", "Filter by destination (Airport) ids (ex. ?destination=2,5)"
+    ),
+)
+FLIGHT_FILTERS = QueryFilters(
+    airplane=IdsFilter("airplane_id", "Filter by airplane ids (ex. ?airplane=1,2,3)"),
+    route=IdsFilter("route_id", "Filter by route ids (ex. ?route=2,7)"),
+    source=IdsFilter(
+        "route__source_id", "Filter by source (Airport) ids (ex. ?source=2,5)"
+    ),
+    destination=IdsFilter(
+        "route__destination_id",
+        "Filter by destination (Airport) ids (ex. ?destination=2,5)",
+    ),
+    departure_time=DayFilter(
+        "departure_time",
+        "Filter by departure day of Flight (ex. ?departure_time=2022-10-23)",
+    ),
+    arrival_time=DayFilter(
+        "arrival_time",
+        "Filter by arrival day of Flight (ex. ?arrival_time=2022-10-23)",
+    ),
+    departure_after=TimeFilter(
+        "departure_time",
+        "gte",
+        "Departing at or after (ex. ?departure_after=2022-10-23T06:00:00Z)",
+    ),
+    departure_before=TimeFilter(
+        "departure_time",
+        "lt",
+        "Departing before (ex. ?departure_before=2022-10-24)",
+    ),
+)
+# Flight filters that also narrow the recurring schedules.
+SCHEDULE_FILTERS = ("airplane", "route", "source", "destination")
+ROUTE_STATS_FILTERS = QueryFilters(
+    route=IdsFilter("route_id", "Filter by route ids (ex. ?route=2,7)"),
+    airplane_type=IdsFilter(
+        "airplane_type_id", "Filter by airplane_type ids (ex. ?airplane_type=2,3)"
+    ),
+    date_from=DateFilter(
+        "date", "gte", "First departure day (ex. ?date_from=2022-10-01)"
+    ),
+    date_to=DateFilter("date", "lte", "Last departure day (ex. ?date_to=2022-10-31)"),
+)
+SEAT_MAP_PARAMETER = OpenApiParameter(
+    "seat_map",
+    type=OpenApiTypes.STR,
+    enum=SEAT_MAP_ENCODINGS,
+    description=(
+        "Send the taken seats as a compact seat_map instead of "
+        "taken_places: a base64 bitmap or run lengths over the seats "
+        "in row-major order (ex. ?seat_map=bitmap)"
+    ),
+)
+SEAT_MAP_EXAMPLE_DESCRIPTION = """\
+Seats (1, 1), (2, 3), (2, 4) and (3, 6) of a 3 × 6 airplane are taken.
+Seat `s` of row `r` has index `i = (r - 1) * seats_in_row + (s - 1)`.
+
+```js
+// bitmap
+const bytes = Uint8Array.from(atob(seat_map.data), c => c.charCodeAt(0));
+const isTaken = i => (bytes[i >> 3] >> (7 - (i & 7))) & 1;
+// rle: alternating free and taken run lengths, free first
+const taken = seat_map.data.flatMap((n, k) => Array(n).fill(k % 2 === 1));
+```
+"""
+FLIGHT_DETAIL_EXAMPLES = [
+    OpenApiExample(
+        name,
+        value={"seat_map": {"encoding": name, "rows": 3, "seats_in_row": 6, "data": data}},
+        description=SEAT_MAP_EXAMPLE_DESCRIPTION,
+        response_only=True,
+    )
+    for name, data in (("bitmap", "gMBA"), ("rle", [0, 1, 7, 2, 7, 1]))
+]
+ORDER_FILTERS = QueryFilters(
+    flight=RelatedIdsFilter(
+        Ticket,
+        "order",
+        "flight_id",
+        "Orders with a ticket on one of the flights (ex. ?flight=12,19)",
+    ),
 )
 
 
+def positive_int_param(request, name, default, maximum):
+    """Read an integer query parameter clamped to ``1..maximum``."""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: "A valid integer is required."})
+
+    return max(1, min(value, maximum))
+
+
+def float_param(request, name, minimum, maximum, required=False):
+    """Read a float query parameter within ``minimum..maximum``."""
+    value = request.query_params.get(name)
+    if value is None:
+        if required:
+            raise ValidationError({name: "This parameter is required."})
+        return None
+
+    try:
+        value = float(value)
+    except ValueError:
+        raise ValidationError({name: "A valid number is required."})
+
+    if not minimum <= value <= maximum:
+        raise ValidationError({name: f"Must be between {minimum} and {maximum}."})
+    return value
+
+
+def choice_param(request, name, choices):
+    """Read a query parameter that is one of ``choices``, the first by default."""
+    value = request.query_params.get(name, choices[0])
+    if value not in choices:
+        raise ValidationError({name: f"Must be one of: {', '.join(choices)}."})
+    return value
+
+
 class CrewViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -46,8 +245,14 @@ class CrewViewSet(
     serializer_class = CrewSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(parameters=[UPDATED_SINCE_PARAMETER, *SPARSE_FIELDS_PARAMETERS])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class AirplaneTypeViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -56,13 +261,19 @@ class AirplaneTypeViewSet(
     serializer_class = AirplaneTypeSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
+    @extend_schema(parameters=[UPDATED_SINCE_PARAMETER, *SPARSE_FIELDS_PARAMETERS])
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
 
 class AirplaneViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     mixins.CreateModelMixin,
     ReadOnlyModelViewSet,
     GenericViewSet,
 ):
-    queryset = Airplane.objects.select_related("airplane_type")
+    queryset = Airplane.objects.all()
     serializer_class = AirplaneSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
@@ -93,21 +304,13 @@ class AirplaneViewSet(
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def get_queryset(self):
-        airplane_type = self.request.query_params.get("airplane_type")
-        queryset = self.queryset
-
-        if airplane_type:
-            queryset = queryset.filter(airplane_type_id=int(airplane_type))
-
-        return queryset.distinct()
+        return AIRPLANE_FILTERS.apply(self.queryset, self.request).distinct()
 
     @extend_schema(
         parameters=[
-            OpenApiParameter(
-                "airplane_type",
-                type=OpenApiTypes.INT,
-                description="Filter by airplane_type id (ex. ?airplane_type=2)",
-            ),
+            *AIRPLANE_FILTERS.parameters,
+            UPDATED_SINCE_PARAMETER,
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -115,6 +318,8 @@ class AirplaneViewSet(
 
 
 class AirportViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
@@ -132,6 +337,18 @@ class AirportViewSet(
 
         return queryset.distinct()
 
+    def get_serializer_class(self):
+        if self.action == "search":
+            return AirportSearchSerializer
+
+        if self.action == "nearest":
+            return AirportNearestSerializer
+
+        if self.action == "board":
+            return AirportBoardSerializer
+
+        return AirportSerializer
+
     @extend_schema(
         parameters=[
             OpenApiParameter(
@@ -139,18 +356,149 @@ class AirportViewSet(
                 type=OpenApiTypes.STR,
                 description="Filter by closest_big_city (ex. ?closest_big_city=LA)",
             ),
+            UPDATED_SINCE_PARAMETER,
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "q",
+                type=OpenApiTypes.STR,
+                description=(
+                    "Prefix or misspelled airport name or city "
+                    "(ex. ?q=bory)"
+                ),
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=(
+                    f"Number of results, at most {AIRPORT_SEARCH_MAX_LIMIT} "
+                    "(ex. ?limit=5)"
+                ),
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False)
+    def search(self, request):
+        """Endpoint for ranked airport autocomplete by name and city"""
+        limit = positive_int_param(
+            request, "limit", 10, AIRPORT_SEARCH_MAX_LIMIT
+        )
+        airports = airport_index.search(
+            request.query_params.get("q", ""), limit=limit
+        )
+        serializer = self.get_serializer(airports, many=True)
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "lat",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Latitude in degrees (ex. ?lat=50.45)",
+            ),
+            OpenApiParameter(
+                "lon",
+                type=OpenApiTypes.FLOAT,
+                required=True,
+                description="Longitude in degrees (ex. ?lon=30.52)",
+            ),
+            OpenApiParameter(
+                "radius_km",
+                type=OpenApiTypes.FLOAT,
+                description="Only airports within this distance (ex. ?radius_km=300)",
+            ),
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=(
+                    f"Number of results, at most {AIRPORT_NEAREST_MAX_LIMIT} "
+                    "(ex. ?limit=5)"
+                ),
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=False)
+    def nearest(self, request):
+        """Endpoint for the airports nearest to a point, closest first"""
+        latitude = float_param(request, "lat", -90, 90, required=True)
+        longitude = float_param(request, "lon", -180, 180, required=True)
+        radius_km = float_param(
+            request, "radius_km", 0, math.pi * EARTH_RADIUS_KM
+        )
+        limit = positive_int_param(
+            request, "limit", 10, AIRPORT_NEAREST_MAX_LIMIT
+        )
+        serializer = self.get_serializer(
+            [
+                {
+                    "id": airport.id,
+                    "name": airport.name,
+                    "closest_big_city": airport.closest_big_city,
+                    "latitude": airport.latitude,
+                    "longitude": airport.longitude,
+                    "distance_km": round(distance, 1),
+                }
+                for airport, distance in airport_geo_index.nearest(
+                    latitude, longitude, limit=limit, radius_km=radius_km
+                )
+            ],
+            many=True,
+        )
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                "limit",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Flights per direction, at most "
+                    f"{AIRPORT_BOARD_MAX_LIMIT} (ex. ?limit=20)"
+                ),
+            ),
+            OpenApiParameter(
+                "hours",
+                type=OpenApiTypes.INT,
+                description=(
+                    "Time window from now, at most "
+                    f"{BOARD_WINDOW_HOURS} hours (ex. ?hours=3)"
+                ),
+            ),
+        ]
+    )
+    @action(methods=["GET"], detail=True)
+    def board(self, request, pk=None):
+        """Endpoint for the next departures and arrivals of an airport"""
+        airport = self.get_object()
+        limit = positive_int_param(
+            request, "limit", 10, AIRPORT_BOARD_MAX_LIMIT
+        )
+        hours = positive_int_param(request, "hours", 6, BOARD_WINDOW_HOURS)
+
+        serializer = self.get_serializer({
+            direction: airport_board.get(
+                airport.id, direction, hours=hours, limit=limit
+            )
+            for direction in (DEPARTURES, ARRIVALS)
+        })
+        return Response(serializer.data)
+
 
 class RouteViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     GenericViewSet,
 ):
-    queryset = Route.objects.select_related("source", "destination")
+    queryset = Route.objects.all()
     serializer_class = RouteSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
@@ -161,29 +509,13 @@ class RouteViewSet(
         return RouteSerializer
 
     def get_queryset(self):
-        source = self.request.query_params.get("source")
-        destination = self.request.query_params.get("destination")
-        queryset = self.queryset
-
-        if source:
-            queryset = queryset.filter(source_id=int(source))
-        if destination:
-            queryset = queryset.filter(destination_id=int(destination))
-
-        return queryset.distinct()
+        return ROUTE_FILTERS.apply(self.queryset, self.request).distinct()
 
     @extend_schema(
         parameters=[
-            OpenApiParameter(
-                "source",
-                type=OpenApiTypes.INT,
-                description="Filter by source (Airport) id (ex. ?source=2)",
-            ),
-            OpenApiParameter(
-                "destination",
-                type=OpenApiTypes.INT,
-                description="Filter by destination (Airport) id (ex. ?destination=2)",
-            ),
+            *ROUTE_FILTERS.parameters,
+            UPDATED_SINCE_PARAMETER,
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
@@ -191,16 +523,11 @@ class RouteViewSet(
 
 
 class FlightViewSet(
+    DeltaSyncMixin,
+    SparseFieldsViewSetMixin,
     viewsets.ModelViewSet,
 ):
-    queryset = (Flight.objects
-                .select_related("route", "airplane")
-                .annotate(
-                    tickets_available=F("airplane__rows") * F("airplane__seats_in_row") - Count("tickets"),
-                    number_of_crew=Count("crew", distinct=True)
-                )
-                .prefetch_related("crew")
-    )
+    queryset = Flight.objects.all()
     serializer_class = FlightSerializer
     permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
 
@@ -208,62 +535,171 @@ class FlightViewSet(
         if self.action == "list":
             return FlightListSerializer
         elif self.action == "retrieve":
+            if self.get_seat_map_encoding() != LIST:
+                return FlightSeatMapDetailSerializer
             return FlightDetailSerializer
+        elif self.action == "validate_schedule":
+            return ScheduleValidationSerializer
+        elif self.action == "hold":
+            return SeatHoldSerializer
 
         return FlightSerializer
 
-    def get_queryset(self):
-        airplane = self.request.query_params.get("airplane")
-        route = self.request.query_params.get("route")
-        arrival_time = self.request.query_params.get("arrival_time")
-        departure_time = self.request.query_params.get("departure_time")
-        queryset = self.queryset
+    @extend_schema(responses=ScheduleValidationResultSerializer)
+    @action(
+        methods=["POST"],
+        detail=False,
+        url_path="validate-schedule",
+        permission_classes=[IsAdminUser],
+    )
+    def validate_schedule(self, request):
+        """Endpoint for checking proposed flights for airplane and crew double-booking"""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        if airplane:
-            queryset = queryset.filter(airplane_id=int(airplane))
-        if route:
-            queryset = queryset.filter(route_id=int(route))
-        if arrival_time:
-            arrival_time = datetime.strptime(arrival_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(arrival_time__date=arrival_time)
-        if departure_time:
-            departure_time = datetime.strptime(departure_time, "%Y-%m-%d").date()
-            queryset = queryset.filter(departure_time__date=departure_time)
+        conflicts = find_schedule_conflicts(serializer.validated_data["flights"])
+        result = ScheduleValidationResultSerializer(
+            {"valid": not conflicts, "conflicts": conflicts}
+        )
+        return Response(result.data)
 
-        return queryset.distinct()
+    @action(
+        methods=["POST"],
+        detail=True,
+        permission_classes=[IsAuthenticated],
+    )
+    def hold(self, request, pk=None):
+        """Endpoint for holding a seat while the order is being filled in"""
+        flight = self.get_object()
+        serializer = self.get_serializer(
+            data=request.data,
+            context={**self.get_serializer_context(), "flight": flight},
+        )
+        serializer.is_valid(raise_exception=True)
+
+        row = serializer.validated_data["row"]
+        seat = serializer.validated_data["seat"]
+        if not hold_seat(flight.id, row, seat, request.user.id):
+            raise ValidationError(
+                {"seat": "This seat is held by another passenger."}
+            )
+        return Response(serializer.data)
+
+    def get_queryset(self):
+        return FLIGHT_FILTERS.apply(self.queryset, self.request).distinct()
 
     @extend_schema(
         parameters=[
+            *FLIGHT_FILTERS.parameters,
             OpenApiParameter(
-                "airplane",
-                type=OpenApiTypes.INT,
-                description="Filter by airplane id (ex. ?airplane=2)",
-            ),
-            OpenApiParameter(
-                "route",
-                type=OpenApiTypes.INT,
-                description="Filter by route id (ex. ?route=2)",
-            ),
-            OpenApiParameter(
-                "arrival_time",
-                type=OpenApiTypes.DATE,
+                "include_virtual",
+                type=OpenApiTypes.BOOL,
                 description=(
-                        "Filter by arrival_time of Flight"
-                        "(ex. ?arrival_time=2022-10-23)"
-                ),
-            ),
-            OpenApiParameter(
-                "departure_time",
-                type=OpenApiTypes.DATE,
-                description=(
-                        "Filter by departure_time of Flight"
-                        "(ex. ?departure_time=2022-10-23)"
+                    "Also list future departures of recurring schedules "
+                    "that have no flight yet; they have no id "
+                    "(ex. ?include_virtual=true)"
                 ),
             ),
+            UPDATED_SINCE_PARAMETER,
+            *SPARSE_FIELDS_PARAMETERS,
         ]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        return Response(coalesced(request, self.list_data))
+
+    def list_data(self):
+        if self.request.query_params.get("include_virtual") != "true":
+            return super().list(self.request, *self.args, **self.kwargs).data
+
+        flights = list(self.filter_queryset(self.get_queryset()))
+        flights += self.get_virtual_departures()
+        flights.sort(key=lambda flight: flight.departure_time, reverse=True)
+
+        serializer = self.get_serializer(flights, many=True)
+        return serializer.data
+
+    def get_seat_map_encoding(self):
+        return choice_param(self.request, "seat_map", SEAT_MAP_ENCODINGS)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == "retrieve":
+            context["seat_map"] = self.get_seat_map_encoding()
+        return context
+
+    @extend_schema(
+        parameters=[SEAT_MAP_PARAMETER],
+        responses=PolymorphicProxySerializer(
+            component_name="FlightDetailResponse",
+            serializers=[FlightDetailSerializer, FlightSeatMapDetailSerializer],
+            resource_type_field_name=None,
+        ),
+        examples=FLIGHT_DETAIL_EXAMPLES,
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return Response(coalesced(
+            request,
+            lambda: super(FlightViewSet, self).retrieve(request, *args, **kwargs).data,
+        ))
+
+    def get_virtual_departures(self):
+        start = timezone.now()
+        end = start + timedelta(days=VIRTUAL_DAYS)
+        schedules = (
+            FlightSchedule.objects
+            .filter(valid_until__gte=start.date(), valid_from__lte=end.date())
+            .select_related("route", "airplane")
+            .prefetch_related("crew")
+        )
+
+        schedules = FLIGHT_FILTERS.apply(schedules, self.request, SCHEDULE_FILTERS)
+
+        predicates = FLIGHT_FILTERS.predicates(self.request)
+        return [
+            flight for flight in virtual_departures(schedules, start, end)
+            if all(predicate.matches(flight) for predicate in predicates)
+        ]
+
+
+class FlightScheduleViewSet(
+    mixins.CreateModelMixin,
+    mixins.ListModelMixin,
+    mixins.RetrieveModelMixin,
+    GenericViewSet,
+):
+    queryset = FlightSchedule.objects.prefetch_related("crew")
+    serializer_class = FlightScheduleSerializer
+    permission_classes = (IsAdminOrIfAuthenticatedReadOnly,)
+
+    def get_serializer_class(self):
+        if self.action == "materialize":
+            return FlightScheduleOccurrenceSerializer
+
+        return FlightScheduleSerializer
+
+    @extend_schema(responses=FlightDetailSerializer)
+    @action(
+        methods=["POST"],
+        detail=True,
+        permission_classes=[IsAdminUser],
+    )
+    def materialize(self, request, pk=None):
+        """
+        Endpoint for turning a scheduled departure into a flight ahead of
+        booking, e.g. to assign crew; tickets that name the schedule and
+        departure_date materialize it themselves
+        """
+        schedule = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        flight = materialize_occurrence(
+            schedule, serializer.validated_data["date"], ValidationError
+        )
+        flight = FlightViewSet.queryset.get(pk=flight.pk)
+        return Response(
+            FlightDetailSerializer(flight, context=self.get_serializer_context()).data
+        )
 
 
 class OrderPagination(PageNumberPagination):
@@ -271,21 +707,130 @@ class OrderPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class RouteStatsPagination(PageNumberPagination):
+    page_size = 100
+    max_page_size = 1000
+
+
+class RouteStatsViewSet(
+    mixins.ListModelMixin,
+    GenericViewSet,
+):
+    queryset = RouteDailyStats.objects.all()
+    serializer_class = RouteDailyStatsSerializer
+    pagination_class = RouteStatsPagination
+    permission_classes = (IsAdminUser,)
+
+    def get_queryset(self):
+        return ROUTE_STATS_FILTERS.apply(self.queryset, self.request)
+
+    @extend_schema(parameters=ROUTE_STATS_FILTERS.parameters)
+    def list(self, request, *args, **kwargs):
+        """Seats sold and load factor per route, airplane type and day"""
+        return super().list(request, *args, **kwargs)
+
+
+ANALYTICS_PERIOD_FILTERS = QueryFilters(
+    date_from=DateFilter(
+        None,
+        "gte",
+        "First departure day, default 30 days before date_to (ex. ?date_from=2022-10-01)",
+    ),
+    date_to=DateFilter(
+        None, "lte", "Last departure day, default today (ex. ?date_to=2022-10-31)"
+    ),
+)
+FLIGHT_TIME_FILTERS = QueryFilters(
+    **ANALYTICS_PERIOD_FILTERS.filters,
+    route=IdsFilter("route_id", "Filter by route ids (ex. ?route=2,7)"),
+    bins=IntFilter(
+        None,
+        "Histogram bins, 1-200, default 20 (ex. ?bins=30)",
+        maximum=ANALYTICS_MAX_BINS,
+    ),
+)
+SEAT_HEATMAP_FILTERS = QueryFilters(
+    **ANALYTICS_PERIOD_FILTERS.filters,
+    airplane_type=IdsFilter(
+        "airplane_type_id", "Filter by airplane_type ids (ex. ?airplane_type=2,3)"
+    ),
+)
+
+
+class AnalyticsViewSet(GenericViewSet):
+    permission_classes = (IsAdminUser,)
+
+    def get_period(self, values):
+        """``[start, end)`` of the departure days in the parsed ``values``."""
+        date_to = values.get("date_to") or timezone.now().date()
+        date_from = values.get("date_from") or (
+            date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+        )
+        if date_from > date_to:
+            raise ValidationError({"date_from": "Must not be later than date_to."})
+        return day_range(date_from, date_to)
+
+    @extend_schema(
+        parameters=FLIGHT_TIME_FILTERS.parameters,
+        responses=FlightTimeReportSerializer,
+    )
+    @action(detail=False, methods=["GET"])
+    def flight_times(self, request):
+        """Flight time quantiles per route and a histogram of all flight times"""
+        values = FLIGHT_TIME_FILTERS.values(request)
+        report = flight_time_report(
+            *self.get_period(values),
+            route_ids=values.get("route"),
+            bins=values.get("bins", 20),
+        )
+        return Response(FlightTimeReportSerializer(report).data)
+
+    @extend_schema(
+        parameters=SEAT_HEATMAP_FILTERS.parameters,
+        responses=SeatHeatmapSerializer,
+    )
+    @action(detail=False, methods=["GET"])
+    def seat_heatmap(self, request):
+        """Tickets sold and occupancy per seat position"""
+        values = SEAT_HEATMAP_FILTERS.values(request)
+        report = seat_heatmap(
+            *self.get_period(values),
+            airplane_type_ids=values.get("airplane_type"),
+        )
+        return Response(SeatHeatmapSerializer(report).data)
+
+    @extend_schema(
+        parameters=ANALYTICS_PERIOD_FILTERS.parameters,
+        responses=AirplaneUtilizationSerializer(many=True),
+    )
+    @action(detail=False, methods=["GET"])
+    def utilization(self, request):
+        """Block hours, utilization and load factor per airplane"""
+        report = airplane_utilization(
+            *self.get_period(ANALYTICS_PERIOD_FILTERS.values(request))
+        )
+        return Response(AirplaneUtilizationSerializer(report, many=True).data)
+
+
 class OrderViewSet(
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     GenericViewSet,
 ):
-    queryset = Order.objects.prefetch_related(
-        "tickets__flight__route",
-        "tickets__flight__airplane"
-    )
+    queryset = Order.objects.all()
     serializer_class = OrderSerializer
     pagination_class = OrderPagination
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+
+        if self.action == "list":
+            queryset = order_history_queryset(
+                ORDER_FILTERS.apply(queryset, self.request)
+            )
+
+        return queryset
 
     def get_serializer_class(self):
         if self.action == "list":
@@ -293,5 +838,60 @@ class OrderViewSet(
 
         return OrderSerializer
 
+    @extend_schema(parameters=ORDER_FILTERS.parameters)
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        orders = list(queryset) if page is None else page
+        attach_flight_stats(orders)
+
+        serializer = self.get_serializer(orders, many=True)
+        if page is None:
+            return Response(serializer.data)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                IDEMPOTENCY_HEADER,
+                type=OpenApiTypes.STR,
+                location=OpenApiParameter.HEADER,
+                description=(
+                    "Unique key of this order; a retry with the same key "
+                    "returns the first response instead of booking again"
+                ),
+            ),
+        ]
+    )
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+
+class BatchView(APIView):
+    permission_classes = (IsAuthenticated,)
+    # Only runs GET sub-requests, so it is routed like them.
+    read_only_request = True
+
+    @extend_schema(
+        request=BatchRequestSerializer,
+        responses=BatchResponseSerializer,
+    )
+    def post(self, request):
+        """Endpoint for running several GET requests in one round trip"""
+        serializer = BatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        paths = serializer.validated_data["requests"]
+        result = BatchResponseSerializer({
+            "responses": [
+                {"path": path, "status": status_code, "body": body}
+                for path, (status_code, body) in zip(
+                    paths, run_batch(paths, request)
+                )
+            ]
+        })
+        return Response(result.data)
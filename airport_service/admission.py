@@ -0,0 +1,236 @@
+"""
+Admission control.
+
+Requests are sorted into endpoint classes (``ADMISSION_CONTROL`` in the
+settings), each with its own limit of requests in progress. A request
+over the limit waits in a short FIFO queue for at most ``timeout``
+seconds; when the queue is full, or the wait runs out, it is shed at once
+with ``503 Service Unavailable`` and ``Retry-After``. A slow booking spike
+then fills only the orders class, while cheap reads keep their own slots
+and a bounded latency.
+
+Runs under WSGI (threads wait on an event) and ASGI (coroutines wait on a
+future); queue depth and shed counts are served to admins by
+``AdmissionMetricsView``.
+"""
+import asyncio
+import re
+import threading
+from collections import deque
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import JsonResponse
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class _ThreadWaiter:
+    def __init__(self):
+        self.event = threading.Event()
+
+    def grant(self):
+        self.event.set()
+
+
+class _FutureWaiter:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+
+    def grant(self):
+        def resolve():
+            if not self.future.done():
+                self.future.set_result(True)
+
+        self.loop.call_soon_threadsafe(resolve)
+
+
+class Limiter:
+    """Concurrency limit with a bounded FIFO wait queue for one endpoint class."""
+
+    def __init__(self, name, concurrency, queue_size, timeout, retry_after=1):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def _enter(self, waiter):
+        """Take a slot (True), queue ``waiter`` (False) or refuse (None)."""
+        with self._lock:
+            if self.in_flight < self.concurrency:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if len(self._queue) < self.queue_size:
+                self._queue.append(waiter)
+                self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+                return False
+            self.shed += 1
+            return None
+
+    def _abandon(self, waiter):
+        """Stop waiting; True if the slot was handed over in the meantime."""
+        with self._lock:
+            try:
+                self._queue.remove(waiter)
+            except ValueError:
+                return True
+            self.shed += 1
+            return False
+
+    def acquire(self):
+        waiter = _ThreadWaiter()
+        entered = self._enter(waiter)
+        if entered is not None and not entered:
+            entered = waiter.event.wait(self.timeout) or self._abandon(waiter)
+        return bool(entered)
+
+    async def acquire_async(self):
+        waiter = _FutureWaiter()
+        entered = self._enter(waiter)
+        if entered is not None and not entered:
+            try:
+                entered = await asyncio.wait_for(
+                    asyncio.shield(waiter.future), self.timeout
+                )
+            except asyncio.TimeoutError:
+                entered = self._abandon(waiter)
+        return bool(entered)
+
+    def release(self):
+        """Free a slot, handing it straight to the longest waiting request."""
+        with self._lock:
+            if not self._queue:
+                self.in_flight -= 1
+                return
+            waiter = self._queue.popleft()
+            self.admitted += 1
+        waiter.grant()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue_size": self.queue_size,
+                "in_flight": self.in_flight,
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self.max_queue_depth,
+                "admitted": self.admitted,
+                "shed": self.shed,
+            }
+
+
+_limiters = None
+_limiters_lock = threading.Lock()
+
+
+def get_limiters():
+    """``[(methods, path pattern, Limiter)]`` built from the settings."""
+    global _limiters
+    with _limiters_lock:
+        if _limiters is None:
+            _limiters = [
+                (
+                    {method.upper() for method in config.get("methods", ())},
+                    re.compile(config["path"]),
+                    Limiter(
+                        name,
+                        config["concurrency"],
+                        config.get("queue", 0),
+                        config.get("timeout", 0),
+                        config.get("retry_after", 1),
+                    ),
+                )
+                for name, config in getattr(settings, "ADMISSION_CONTROL", {}).items()
+            ]
+        return _limiters
+
+
+@receiver(setting_changed)
+def reset_limiters(setting, **kwargs):
+    global _limiters
+    if setting == "ADMISSION_CONTROL":
+        with _limiters_lock:
+            _limiters = None
+
+
+def limiter_for(request):
+    for methods, path, limiter in get_limiters():
+        if (not methods or request.method in methods) and path.match(request.path_info):
+            return limiter
+    return None
+
+
+def admission_metrics():
+    return {limiter.name: limiter.metrics() for _, _, limiter in get_limiters()}
+
+
+def shed_response(limiter):
+    response = JsonResponse(
+        {"detail": "The service is overloaded, retry later."}, status=503
+    )
+    response["Retry-After"] = str(limiter.retry_after)
+    return response
+
+
+class AdmissionControlMiddleware:
+    """Should be placed first, so shed requests cost as little as possible."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        limiter = limiter_for(request)
+        if limiter is None:
+            return self.get_response(request)
+        if not limiter.acquire():
+            return shed_response(limiter)
+
+        try:
+            return self.get_response(request)
+        finally:
+            limiter.release()
+
+    async def __acall__(self, request):
+        limiter = limiter_for(request)
+        if limiter is None:
+            return await self.get_response(request)
+        if not await limiter.acquire_async():
+            return shed_response(limiter)
+
+        try:
+            return await self.get_response(request)
+        finally:
+            limiter.release()
+
+
+class AdmissionMetricsView(APIView):
+    """Queue depth and shed counts of every endpoint class."""
+
+    permission_classes = (IsAdminUser,)
+
+    @extend_schema(responses=OpenApiTypes.OBJECT)
+    def get(self, request):
+        return Response(admission_metrics())
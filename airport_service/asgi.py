@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "airport_service.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, because it loads models.
+from airport.streams import SeatMapStreamApp  # noqa: E402
+
+application = SeatMapStreamApp(django_application)
@@ -0,0 +1,155 @@
+"""
+Read-replica routing.
+
+Replicas are extra ``DATABASES`` entries listed in ``DATABASE_REPLICAS``.
+``ReplicaRoutingMiddleware`` decides per request whether reads may go to a
+replica: only safe-method requests may, and a client that has just written
+stays pinned to the primary for ``REPLICA_STICKY_SECONDS`` so it always
+reads its own writes. A view whose class sets ``read_only_request = True``
+(e.g. the batch endpoint, a POST of GETs) counts as safe whatever its
+method, so it neither reads from nor pins to the primary. ``ReplicaRouter`` applies that decision to every
+query made while the request is being handled.
+
+The pin has to reach whichever worker serves the client next, so it is
+kept in two places no worker owns: a signed cookie that expires with
+the pin, and the default cache, keyed by the client's credentials, for
+API clients that drop cookies. The cache is only shared between
+workers when it is Redis (``REDIS_URL``), see ``airport.checks``.
+"""
+import hashlib
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import Resolver404, resolve
+from rest_framework.permissions import SAFE_METHODS
+
+PRIMARY_DATABASE = "default"
+STICKY_CACHE_PREFIX = "db-router:primary:"
+STICKY_COOKIE = "primary_reads"
+STICKY_COOKIE_SALT = "airport_service.db_router"
+
+_reads_from_replica = ContextVar("reads_from_replica", default=False)
+
+
+def get_replicas():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+def _sticky_key(request):
+    """Identify the client that made ``request``, or return None."""
+    authorization = request.META.get("HTTP_AUTHORIZATION")
+    if authorization:
+        digest = hashlib.sha256(authorization.encode()).hexdigest()
+        return f"{STICKY_CACHE_PREFIX}token:{digest}"
+
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"{STICKY_CACHE_PREFIX}user:{user.pk}"
+
+    return None
+
+
+def _sticky_seconds():
+    return getattr(settings, "REPLICA_STICKY_SECONDS", 5)
+
+
+def pin_to_primary(request, response):
+    """Send reads of the client behind ``request`` to the primary for a while."""
+    response.set_signed_cookie(
+        STICKY_COOKIE,
+        "1",
+        salt=STICKY_COOKIE_SALT,
+        max_age=_sticky_seconds(),
+        secure=request.is_secure(),
+        httponly=True,
+        samesite="Lax",
+    )
+    key = _sticky_key(request)
+    if key:
+        cache.set(key, True, _sticky_seconds())
+
+
+def reads_from_replica():
+    """Whether reads of the current request may go to a replica."""
+    return bool(get_replicas()) and _reads_from_replica.get()
+
+
+def is_read_only(request):
+    """Whether ``request`` cannot write: a safe method or a read-only view."""
+    if request.method in SAFE_METHODS:
+        return True
+    try:
+        match = resolve(request.path_info, getattr(request, "urlconf", None))
+    except Resolver404:
+        return False
+    view_class = getattr(match.func, "cls", None)
+    return getattr(view_class, "read_only_request", False)
+
+
+def is_pinned_to_primary(request):
+    # The signature's timestamp bounds the pin, whatever the client does
+    # with the cookie's max-age.
+    if request.get_signed_cookie(
+        STICKY_COOKIE,
+        default=None,
+        salt=STICKY_COOKIE_SALT,
+        max_age=_sticky_seconds(),
+    ):
+        return True
+    key = _sticky_key(request)
+    return bool(key and cache.get(key))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe requests of clients that did not write
+    recently, and pin clients to the primary after every write.
+
+    Must be placed after ``AuthenticationMiddleware``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_replicas():
+            return self.get_response(request)
+
+        safe = is_read_only(request)
+        token = _reads_from_replica.set(
+            safe and not is_pinned_to_primary(request)
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            _reads_from_replica.reset(token)
+
+        if not safe:
+            pin_to_primary(request, response)
+
+        return response
+
+
+class ReplicaRouter:
+    """Route reads to a random replica when the current request allows it."""
+
+    def db_for_read(self, model, **hints):
+        if reads_from_replica():
+            return random.choice(get_replicas())
+        return PRIMARY_DATABASE
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DATABASE, *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,275 @@
+"""
+Precomputed OpenAPI schema.
+
+Generating the schema walks every view and serializer, which costs far
+more than an ordinary API request. ``schema_store`` generates it once per
+code version, renders it as YAML and JSON, gzips both and writes the
+files under ``OPENAPI_SCHEMA_DIR``; ``PrecomputedSchemaView`` then serves
+the stored bytes like a static file, with a strong ETag for
+``304 Not Modified`` and the gzipped copy for clients that accept it.
+
+The code version is a hash of ``OPENAPI_SCHEMA_VERSION`` when it is set
+(e.g. the commit being deployed), otherwise of the project's Python
+sources and the Django, DRF and drf-spectacular versions. Each version
+gets its own directory, so files written by older code are never served;
+a process whose version has no files yet builds them on first use.
+``build_schema`` builds them ahead of time; the Docker image runs it
+while building. Nothing is read at import, so starting a worker costs
+neither hashing the sources nor generating.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.module_loading import import_string
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from rest_framework.renderers import BaseRenderer
+from rest_framework.views import APIView
+
+SCHEMA_MEDIA_TYPES = {
+    "yaml": "application/vnd.oai.openapi",
+    "json": "application/vnd.oai.openapi+json",
+}
+ACCEPTS_GZIP = re.compile(r"\bgzip\b")
+
+SchemaDocument = namedtuple("SchemaDocument", ["media_type", "body", "gzipped", "etag"])
+
+
+def source_files():
+    """Python files of the project's own apps and of this package."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    packages = {Path(__file__).resolve().parent}
+    for config in apps.get_app_configs():
+        path = Path(config.path).resolve()
+        if path.is_relative_to(base_dir):
+            packages.add(path)
+    return sorted(
+        (path.relative_to(base_dir).as_posix(), path)
+        for package in packages
+        for path in package.rglob("*.py")
+    )
+
+
+def code_version():
+    digest = hashlib.sha256()
+    if settings.OPENAPI_SCHEMA_VERSION:
+        digest.update(settings.OPENAPI_SCHEMA_VERSION.encode())
+    else:
+        for package in (django, rest_framework, drf_spectacular):
+            digest.update(f"{package.__name__}=={package.__version__}\n".encode())
+        for name, path in source_files():
+            digest.update(name.encode() + b"\0" + path.read_bytes() + b"\0")
+    return digest.hexdigest()[:32]
+
+
+def document(schema_format, body, gzipped):
+    return SchemaDocument(
+        media_type=SCHEMA_MEDIA_TYPES[schema_format],
+        body=body,
+        gzipped=gzipped,
+        etag=hashlib.sha256(body).hexdigest()[:32],
+    )
+
+
+class SchemaStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._documents = None
+
+    def directory(self, version):
+        return Path(settings.OPENAPI_SCHEMA_DIR) / version
+
+    def get(self, schema_format):
+        """The stored ``SchemaDocument`` in ``schema_format``."""
+        documents = self._documents
+        if documents is None:
+            with self._lock:
+                if self._documents is None:
+                    self._documents = self._read() or self._build()
+                documents = self._documents
+        return documents[schema_format]
+
+    def _read(self):
+        directory = self.directory(code_version())
+        try:
+            return {
+                schema_format: document(
+                    schema_format,
+                    (directory / f"schema.{schema_format}").read_bytes(),
+                    (directory / f"schema.{schema_format}.gz").read_bytes(),
+                )
+                for schema_format in SCHEMA_MEDIA_TYPES
+            }
+        except OSError:
+            return None
+
+    def _build(self):
+        # Generating pulls in the schema generator and PyYAML, which a
+        # process serving stored files never needs.
+        from drf_spectacular.generators import SchemaGenerator
+        from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+
+        version = code_version()
+        schema = SchemaGenerator().get_schema(request=None, public=True)
+        documents = {}
+        for schema_format, renderer_class in (
+            ("yaml", OpenApiYamlRenderer),
+            ("json", OpenApiJsonRenderer),
+        ):
+            body = renderer_class().render(schema, renderer_class.media_type, {})
+            documents[schema_format] = document(
+                schema_format, body, gzip.compress(body, compresslevel=9, mtime=0)
+            )
+
+        try:
+            self._write(version, documents)
+        except OSError:
+            # A read-only deployment still serves the schema from memory.
+            pass
+        return documents
+
+    def _write(self, version, documents):
+        """
+        Write the files into a scratch directory and rename it into place,
+        so that a concurrent reader sees all of them or none.
+        """
+        root = Path(settings.OPENAPI_SCHEMA_DIR)
+        root.mkdir(parents=True, exist_ok=True)
+        scratch = Path(tempfile.mkdtemp(dir=root, prefix=".build-"))
+        try:
+            for schema_format, stored in documents.items():
+                (scratch / f"schema.{schema_format}").write_bytes(stored.body)
+                (scratch / f"schema.{schema_format}.gz").write_bytes(stored.gzipped)
+            os.chmod(scratch, 0o755)
+            try:
+                scratch.rename(root / version)
+            except OSError:
+                # Another process has just built the same version.
+                shutil.rmtree(scratch, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(scratch, ignore_errors=True)
+            raise
+
+        for stale in root.iterdir():
+            if stale.name != version and not stale.name.startswith("."):
+                shutil.rmtree(stale, ignore_errors=True)
+
+    def rebuild(self):
+        """Generate and store the schema of the running code."""
+        with self._lock:
+            self._documents = self._build()
+        return self._documents
+
+
+schema_store = SchemaStore()
+
+
+class StoredSchemaRenderer(BaseRenderer):
+    """
+    Content negotiation for ``PrecomputedSchemaView``, with the media
+    types of drf-spectacular's renderers. The stored bytes need no
+    rendering; errors, e.g. throttling, are rendered as JSON, which is
+    valid YAML too.
+    """
+
+    media_type = SCHEMA_MEDIA_TYPES["yaml"]
+    format = "yaml"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class StoredSchemaYamlRenderer(StoredSchemaRenderer):
+    media_type = "application/yaml"
+
+
+class StoredSchemaJsonRenderer(StoredSchemaRenderer):
+    media_type = SCHEMA_MEDIA_TYPES["json"]
+    format = "json"
+
+
+class StoredSchemaJsonRenderer2(StoredSchemaJsonRenderer):
+    media_type = "application/json"
+
+
+class PrecomputedSchemaView(APIView):
+    """
+    Serves ``schema_store`` in place of ``SpectacularAPIView``, which
+    generates the schema on every request. Format is chosen by content
+    negotiation or ``?format=json``, as there.
+    """
+
+    renderer_classes = [
+        StoredSchemaRenderer,
+        StoredSchemaYamlRenderer,
+        StoredSchemaJsonRenderer,
+        StoredSchemaJsonRenderer2,
+    ]
+    permission_classes = spectacular_settings.SERVE_PERMISSIONS
+    if spectacular_settings.SERVE_AUTHENTICATION is not None:
+        authentication_classes = spectacular_settings.SERVE_AUTHENTICATION
+
+    @extend_schema(exclude=True)
+    def get(self, request, *args, **kwargs):
+        schema_format = request.accepted_renderer.format
+        stored = schema_store.get(schema_format)
+
+        compressed = bool(ACCEPTS_GZIP.search(request.META.get("HTTP_ACCEPT_ENCODING", "")))
+        etag = f'"{stored.etag}-gzip"' if compressed else f'"{stored.etag}"'
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                stored.gzipped if compressed else stored.body,
+                content_type=f"{stored.media_type}; charset=utf-8",
+            )
+            response["Content-Disposition"] = (
+                f'inline; filename="{spectacular_settings.TITLE or "schema"}.{schema_format}"'
+            )
+            if compressed:
+                response["Content-Encoding"] = "gzip"
+            response["Content-Length"] = str(len(response.content))
+
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
+
+
+def documentation_view(view_path, **initkwargs):
+    """
+    A drf-spectacular documentation view (Swagger UI, Redoc) that is
+    imported on its first request, since ``drf_spectacular.views`` loads
+    the schema generator and PyYAML.
+    """
+    view = None
+
+    def documentation(request, *args, **kwargs):
+        nonlocal view
+        if view is None:
+            view = import_string(view_path).as_view(**initkwargs)
+        return view(request, *args, **kwargs)
+
+    return documentation
@@ -49,11 +49,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "airport_service.admission.AdmissionControlMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "airport_service.db_router.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -89,6 +91,64 @@ DATABASES = {
     }
 }
 
+# Read replicas are extra DATABASES entries listed here. Safe-method
+# requests read from them, except for clients that wrote within the last
+# REPLICA_STICKY_SECONDS, whose reads stay on the primary.
+DATABASE_ROUTERS = ["airport_service.db_router.ReplicaRouter"]
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+# The default cache carries state every process must agree on: version
+# stamps of the in-process reference, search and geo caches, seat holds,
+# read-your-writes stickiness and throttle counters. A local-memory cache
+# is only enough for a single process (runserver, tests); deployments
+# with several workers set REDIS_URL, see ``check --deploy``.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Limits of requests in progress per endpoint class, matched in order by
+# method and path; see airport_service.admission. ``timeout`` is how long
+# a request may wait in the queue before it is shed with a 503.
+ADMISSION_CONTROL = {
+    "orders-write": {
+        "methods": ["POST"],
+        "path": r"^/api/airport/orders/",
+        "concurrency": 8,
+        "queue": 16,
+        "timeout": 1.0,
+        "retry_after": 2,
+    },
+    "flight-read": {
+        "methods": ["GET", "HEAD"],
+        "path": r"^/api/airport/flight/",
+        "concurrency": 32,
+        "queue": 64,
+        "timeout": 0.5,
+    },
+    "user-token": {
+        "path": r"^/api/user/token/",
+        "concurrency": 4,
+        "queue": 8,
+        "timeout": 1.0,
+        "retry_after": 2,
+    },
+}
+
+# Concurrent identical flight reads share one computation, see
+# airport.coalescing.
+REQUEST_COALESCING = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -161,6 +221,12 @@ SPECTACULAR_SETTINGS = {
     },
 }
 
+# Where the precomputed schema is stored, see airport_service.schema.
+# OPENAPI_SCHEMA_VERSION (e.g. the deployed commit) replaces hashing the
+# sources to tell whether the stored schema is current.
+OPENAPI_SCHEMA_DIR = Path(os.getenv("OPENAPI_SCHEMA_DIR", BASE_DIR / "var" / "schema"))
+OPENAPI_SCHEMA_VERSION = os.getenv("OPENAPI_SCHEMA_VERSION", "")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
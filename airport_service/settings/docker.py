@@ -11,5 +11,25 @@ DATABASES = {
     }
 }
 
+for index, host in enumerate(
+    filter(None, os.getenv("POSTGRES_REPLICA_HOSTS", "").split(","))
+):
+    alias = f"replica_{index + 1}"
+    DATABASES[alias] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("REDIS_URL", "redis://redis:6379/0"),
+    }
+}
+
+OPENAPI_SCHEMA_DIR = Path(os.getenv("OPENAPI_SCHEMA_DIR", "/files/schema"))
+
 DEBUG = False
 ALLOWED_HOSTS = ["*"]
@@ -7,4 +7,27 @@ DATABASES = {
     }
 }
 
+# Opt-in tuning for concurrent bookings, see airport_service.sqlite.
+SQLITE_HIGH_CONCURRENCY_PRAGMAS = {
+    "journal_mode": "wal",
+    "synchronous": "normal",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "mmap_size": 256 * 1024 * 1024,
+}
+
+if os.getenv("SQLITE_HIGH_CONCURRENCY") == "True":
+    DATABASES["default"]["ENGINE"] = "airport_service.sqlite"
+    DATABASES["default"]["OPTIONS"] = {"pragmas": SQLITE_HIGH_CONCURRENCY_PRAGMAS}
+
+# Reads go to the replica only when SQLITE_REPLICA_NAME is set. The alias
+# always exists, mirroring "default" in tests, so routing tests run real
+# queries on it.
+DATABASES["replica"] = {
+    "ENGINE": "django.db.backends.sqlite3",
+    "NAME": BASE_DIR / os.getenv("SQLITE_REPLICA_NAME", "db.sqlite3"),
+    "TEST": {"MIRROR": "default"},
+}
+if os.getenv("SQLITE_REPLICA_NAME"):
+    DATABASE_REPLICAS = ["replica"]
+
 DEBUG = True
@@ -0,0 +1,36 @@
+"""
+Opt-in SQLite backend for concurrent writers.
+
+Set ``ENGINE`` to ``"airport_service.sqlite"`` and list PRAGMAs under
+``OPTIONS["pragmas"]``, e.g. WAL journaling, ``synchronous = NORMAL``, a
+``busy_timeout`` and ``mmap_size``; ``settings/local.py`` does so when
+``SQLITE_HIGH_CONCURRENCY=True``. Every new connection runs them before
+its first query.
+
+SQLite starts a transaction (``BEGIN``) without any lock and takes the
+write lock at its first write. Two transactions that both read before
+writing can then deadlock, and one of them fails at once with "database
+is locked" whatever the busy timeout. ``immediate_atomic`` starts the
+outermost block with ``BEGIN IMMEDIATE`` instead, so the write lock is
+taken, or waited for, up front. It is a plain ``transaction.atomic``
+on other backends.
+"""
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+@contextmanager
+def immediate_atomic(using=None):
+    connection = transaction.get_connection(using)
+    if not hasattr(connection, "begin_immediate") or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    connection.begin_immediate = True
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        connection.begin_immediate = False
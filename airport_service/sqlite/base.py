@@ -0,0 +1,23 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.begin_immediate = False
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop("pragmas", None)
+        return params
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        for name, value in self.settings_dict["OPTIONS"].get("pragmas", {}).items():
+            self.connection.execute(f"PRAGMA {name} = {value}")
+
+    def _start_transaction_under_autocommit(self):
+        if self.begin_immediate:
+            self.cursor().execute("BEGIN IMMEDIATE")
+        else:
+            super()._start_transaction_under_autocommit()
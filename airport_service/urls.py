@@ -19,25 +19,32 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView,
-    SpectacularRedocView,
-)
+
+from airport_service.admission import AdmissionMetricsView
+from airport_service.schema import PrecomputedSchemaView, documentation_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/airport/", include("airport.urls", namespace="airport")),
     path("api/user/", include("user.urls", namespace="user")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+    path(
+        "api/admission/metrics/",
+        AdmissionMetricsView.as_view(),
+        name="admission-metrics",
+    ),
+    path("api/schema/", PrecomputedSchemaView.as_view(), name="schema"),
     path(
         "api/doc/swagger/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
+        documentation_view(
+            "drf_spectacular.views.SpectacularSwaggerView", url_name="schema"
+        ),
         name="swagger-ui",
     ),
     path(
         "api/doc/redoc/",
-        SpectacularRedocView.as_view(url_name="schema"),
+        documentation_view(
+            "drf_spectacular.views.SpectacularRedocView", url_name="schema"
+        ),
         name="redoc",
     ),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)